@@ -20,6 +20,8 @@ if use_db == "no":
     )
     db_path = os.path.join(app_path, 'db')
     models_path = os.path.join(app_path, 'models')
+    tests_path = os.path.join(app_path, 'tests')
+    benchmarks_path = os.path.join(app_path, 'benchmarks')
 
     try:
         shutil.rmtree(db_path)
@@ -33,6 +35,12 @@ if use_db == "no":
         print("ERROR: cannot delete models path %s" % models_path)
         sys.exit(1)
 
+    # Tests and benchmarks for the db package are prefixed with 'db_'
+    for module_path in (tests_path, benchmarks_path):
+        for module_file in os.listdir(module_path):
+            if module_file.startswith('db_'):
+                os.remove(os.path.join(module_path, module_file))
+
 
 def write_secret_key(env_file):
     secret_key = generate_secret_key()
@@ -2,58 +2,100 @@ import json
 import uuid
 from flask import Flask, jsonify, g, request
 from flask_jwt_extended import JWTManager
-from flask_marshmallow import Marshmallow
-{%- if cookiecutter.use_db == "yes" %}
-from flask_migrate import Migrate
-{%- endif %}
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
+from core.admission import init_admission_control
 from core.config import APP_CONFIG, init_sentry
+from core.http_client import init_http_client
+from core.idempotency import init_idempotency
+from core.profiling import init_profiling
+from core.ratelimit import init_rate_limiting
+from core.sampling import init_trace_sampling
+from core.tasks import init_tasks
+from core.timing import StartupTimings, init_phase_timing, phase, snapshot_timings_ms
+from core.watchdog import init_watchdog
 from logs import logs_config
 from routers import routes
 {%- if cookiecutter.use_db == "yes" %}
-from db.database import db, test_connection
+from db.async_database import async_db
+from db.cache import init_query_cache
+from db.database import db, init_driver_options, test_connection
+from db.instrumentation import init_query_instrumentation
 {%- endif %}
 
 
-ma = Marshmallow()
-
-
 def create_app():
     """
     Create and configure Flask application instance.
     
     This factory function:
+    - Configures logging sinks
     - Initializes Sentry (production only)
     - Configures Flask app with environment settings
     - Configures JWT authentication
+    - Creates the shared outbound HTTP client and background task executor
+    - Enables admission control (load shedding under overload)
+    - Enables per-principal / per-IP rate limiting
+    - Enables per-request phase timing (Server-Timing header)
+    - Enables opt-in per-request profiling
+    - Starts the slow-request watchdog
     - Registers health check endpoint
     
+    Each step is timed in app.extensions['startup_timings'] (see
+    benchmarks/startup_report.py). Integrations that are not needed to
+    serve requests (Sentry outside production, Flask-Migrate under
+    gunicorn) are not imported.
+    
     Returns:
         Configured Flask application instance.
     """
+    startup = StartupTimings()
+
+    with startup.step("logging"):
+        logs_config.init_logging()
+
     # Initialize Sentry first (will only run in production)
-    init_sentry(APP_CONFIG)
+    with startup.step("sentry"):
+        init_sentry(APP_CONFIG)
 
-    app = Flask(__name__)
-    app.config.from_object(APP_CONFIG)
-    app.json.sort_keys = False
+    with startup.step("flask"):
+        app = Flask(__name__)
+        app.config.from_object(APP_CONFIG)
+        app.json.sort_keys = False
     
     # Initialize extensions
     {%- if cookiecutter.use_db == "yes" %}
-    db.init_app(app)
-    Migrate(app, db)
+    with startup.step("db"):
+        db.init_app(app)
+        init_driver_options(app)
+        async_db.init_app(app)
+        init_query_cache(app)
+        if APP_CONFIG.DB_MIGRATIONS_ENABLED:
+            # Only the 'flask db' commands need it; gunicorn workers skip alembic
+            from flask_migrate import Migrate
+            Migrate(app, db)
     {%- endif %}
-    JWTManager(app)
-    ma.init_app(app)
+    with startup.step("extensions"):
+        JWTManager(app)
+        init_http_client(app)
+        init_tasks(app)
+        init_idempotency(app)
 
-    app.register_blueprint(routes.bp)
+    with startup.step("routes"):
+        app.register_blueprint(routes.bp)
     
-    # Configure URL prefix for API
-    script_name = APP_CONFIG.API_BASE_URL
-    app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {
-        script_name: app
-    })
+    with startup.step("middleware"):
+        # Configure URL prefix for API
+        script_name = APP_CONFIG.API_BASE_URL
+        app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {
+            script_name: app
+        })
+
+        # Outermost middleware: overload is shed before any other work
+        init_admission_control(app)
+
+        # Registered before the logging hooks so the timings exist for them
+        init_phase_timing(app)
 
     @app.before_request
     def log_request_info():
@@ -70,17 +112,18 @@ def create_app():
         """
         g.request_id = str(uuid.uuid4())
         
-        # Build raw log data
-        log_data = {
-            "request_id": g.request_id,
-            "method": request.method,
-            "url": request.url,
-            "headers": dict(request.headers),
-            "args": request.args.to_dict(),
-            "json_data": request.get_json(silent=True)
-        }
-        
-        logs_config.logger.info(f"Request: {json.dumps(log_data)}")
+        with phase("log_req"):
+            # Build raw log data
+            log_data = {
+                "request_id": g.request_id,
+                "method": request.method,
+                "url": request.url,
+                "headers": dict(request.headers),
+                "args": request.args.to_dict(),
+                "json_data": request.get_json(silent=True)
+            }
+            
+            logs_config.logger.info(f"Request: {json.dumps(log_data)}")
 
     @app.after_request
     def log_response_info(response):
@@ -91,7 +134,9 @@ def create_app():
         - Request ID (correlation with request)
         - Status code
         - Response headers (with sensitive headers filtered)
-        - Response body (with sensitive data filtered)
+        - Response body (with sensitive data filtered, omitted when streamed)
+        - SQL statement count and DB time (when SQL_INSTRUMENTATION is on)
+        - Phase timings up to this point (when PHASE_TIMING_ENABLED is on)
         
         Args:
             response: Flask response object.
@@ -99,16 +144,42 @@ def create_app():
         Returns:
             Unmodified response object.
         """
-        log_data = {
-            "request_id": g.get('request_id', 'unknown'),
-            "status_code": response.status_code,
-            "headers": dict(response.headers),
-            "response_data": response.get_data(as_text=True)
-        }
-        
-        logs_config.logger.info(f"Response: {json.dumps(log_data)}")
+        with phase("log_res"):
+            log_data = {
+                "request_id": g.get('request_id', 'unknown'),
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                # Streamed bodies are not buffered just to be logged
+                "response_data": (
+                    "<streamed>" if response.is_streamed
+                    else response.get_data(as_text=True)
+                )
+            }
+            {%- if cookiecutter.use_db == "yes" %}
+            if "sql_stats" in g:
+                log_data["db"] = g.sql_stats.summary()
+            {%- endif %}
+            timings = snapshot_timings_ms()
+            if timings is not None:
+                log_data["timings_ms"] = timings
+            
+            logs_config.logger.info(f"Response: {json.dumps(log_data)}")
         
         return response
+
+    # Registered after the logging hooks so g.request_id names the profile
+    # and identifies slow requests
+    with startup.step("hooks"):
+        init_profiling(app)
+        init_watchdog(app)
+        init_rate_limiting(app)
+        init_trace_sampling(app)
+        {%- if cookiecutter.use_db == "yes" %}
+
+        # Registered after the logging hooks so its Server-Timing header is
+        # already set when the response is logged
+        init_query_instrumentation(app)
+        {%- endif %}
     
     @app.route("/api")
     def app_info():
@@ -138,6 +209,8 @@ def create_app():
             }), status_code
     {%- endif %}
 
+    app.extensions["startup_timings"] = startup
+    logs_config.logger.debug(f"App created: {json.dumps(startup.as_ms())}")
     return app
 
 
@@ -0,0 +1,89 @@
+"""
+Compara psycopg (3) y psycopg2 contra un Postgres local.
+
+Mide:
+- point_select: la misma consulta parametrizada repetida (psycopg 3 la
+  prepara en el servidor tras DB_PREPARE_THRESHOLD ejecuciones)
+- batch_insert: inserción en lote (pipeline en psycopg 3, execute_batch
+  en psycopg2)
+- full_scan: lectura de todas las filas insertadas
+
+Uso (desde backend/, con las variables DB_* configuradas):
+    python -m benchmarks.db_drivers --rows 10000 --repeat 2000
+"""
+
+import argparse
+import os
+import time
+from urllib.parse import quote_plus
+
+from sqlalchemy import create_engine, text
+
+
+def _database_uri(driver: str) -> str:
+    return (
+        f"postgresql+{driver}://{quote_plus(os.getenv('DB_USER'))}:"
+        f"{quote_plus(os.getenv('DB_PASSWORD'))}@"
+        f"{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/"
+        f"{os.getenv('DB_NAME')}"
+    )
+
+
+def _timed(label: str, func, results: dict) -> None:
+    start = time.perf_counter()
+    func()
+    results[label] = time.perf_counter() - start
+
+
+def run(driver: str, rows: int, repeat: int) -> dict:
+    connect_args = {"prepare_threshold": int(os.getenv("DB_PREPARE_THRESHOLD", "5"))} if driver == "psycopg" else {}
+    engine = create_engine(_database_uri(driver), connect_args=connect_args)
+    insert_sql = "INSERT INTO bench_driver (id, name, amount) VALUES (%s, %s, %s)"
+    params = [(i, f"name-{i}", i * 0.5) for i in range(rows)]
+    results = {}
+
+    with engine.connect() as connection:
+        connection.execute(text(
+            "CREATE TEMPORARY TABLE bench_driver (id integer PRIMARY KEY, name text, amount numeric)"
+        ))
+        raw = connection.connection
+        cursor = raw.cursor()
+
+        def batch_insert():
+            if driver == "psycopg":
+                with raw.driver_connection.pipeline():
+                    cursor.executemany(insert_sql, params)
+            else:
+                from psycopg2.extras import execute_batch
+                execute_batch(cursor, insert_sql, params, page_size=1000)
+
+        def point_select():
+            statement = text("SELECT name, amount FROM bench_driver WHERE id = :id")
+            for i in range(repeat):
+                connection.execute(statement, {"id": i % rows}).fetchone()
+
+        def full_scan():
+            connection.execute(text("SELECT id, name, amount FROM bench_driver")).fetchall()
+
+        _timed("batch_insert", batch_insert, results)
+        _timed("point_select", point_select, results)
+        _timed("full_scan", full_scan, results)
+        cursor.close()
+        connection.rollback()
+
+    engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark psycopg vs psycopg2")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    all_results = {driver: run(driver, args.rows, args.repeat) for driver in ("psycopg2", "psycopg")}
+
+    print(f"{'benchmark':<14}{'psycopg2 (s)':>14}{'psycopg (s)':>14}{'speedup':>10}")
+    for label in all_results["psycopg2"]:
+        legacy, current = all_results["psycopg2"][label], all_results["psycopg"][label]
+        print(f"{label:<14}{legacy:>14.4f}{current:>14.4f}{legacy / current:>9.2f}x")
@@ -0,0 +1,85 @@
+"""
+Compara OFFSET/LIMIT contra paginación keyset a distintas profundidades.
+
+Usa SQLite en memoria por defecto; con --postgres usa las variables DB_*
+(y DB_DRIVER) para medir contra PostgreSQL.
+
+Uso (desde backend/):
+    python -m benchmarks.db_pagination --rows 200000 --limit 50
+"""
+
+import argparse
+import os
+import time
+from urllib.parse import quote_plus
+
+from flask import Flask
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+
+from db.database import db, insert_rows
+from db.pagination import encode_cursor, paginate_keyset
+
+
+metadata = MetaData()
+bench_page = Table(
+    "bench_page",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50)),
+)
+
+
+def _database_uri(use_postgres: bool) -> str:
+    if not use_postgres:
+        return "sqlite://"
+    return (
+        f"postgresql+{os.getenv('DB_DRIVER', 'psycopg')}://{quote_plus(os.getenv('DB_USER'))}:"
+        f"{quote_plus(os.getenv('DB_PASSWORD'))}@"
+        f"{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/"
+        f"{os.getenv('DB_NAME')}"
+    )
+
+
+def _best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OFFSET vs keyset pagination")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--postgres", action="store_true")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY="benchmark", SQLALCHEMY_DATABASE_URI=_database_uri(args.postgres))
+    db.init_app(app)
+
+    with app.app_context():
+        metadata.drop_all(db.engine)
+        metadata.create_all(db.engine)
+        insert_rows(bench_page, ((i, f"name-{i}") for i in range(args.rows)), batch_size=10000)
+        db.session.commit()
+
+        print(f"{'depth':>8}{'offset (ms)':>14}{'keyset (ms)':>14}")
+        for fraction in (0.0, 0.1, 0.5, 0.9, 0.99):
+            depth = int(args.rows * fraction)
+
+            def offset_page():
+                statement = select(bench_page).order_by(bench_page.c.id).offset(depth).limit(args.limit)
+                db.session.execute(statement).all()
+
+            cursor = encode_cursor("next", [depth - 1]) if depth else None
+
+            def keyset_page():
+                paginate_keyset(select(bench_page), [bench_page.c.id], cursor, limit=args.limit)
+
+            print(f"{depth:>8}{_best_of(offset_page) * 1000:>14.3f}{_best_of(keyset_page) * 1000:>14.3f}")
+
+        metadata.drop_all(db.engine)
+        db.session.commit()
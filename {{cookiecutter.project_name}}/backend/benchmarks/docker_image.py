@@ -0,0 +1,105 @@
+"""
+Compara imágenes Docker del backend: tamaño y tiempo hasta la primera
+respuesta, desplegadas con docker-compose-prod.yml.
+
+Por cada Dockerfile indicado construye la imagen del servicio backend con
+`docker compose build` (un override temporal cambia solo el Dockerfile y
+el tag) y, para cada una, recrea --runs veces el contenedor con
+`docker compose up` midiendo el tiempo hasta el primer 200 de GET /api.
+Así se mide el despliegue real (comando de gunicorn, entorno y volúmenes
+de compose): arranque del contenedor, import de la app y primer request.
+Las dependencias (postgres) se levantan una vez antes de medir.
+
+Para comparar con el Dockerfile anterior:
+    git show HEAD~1:backend/Dockerfile > /tmp/Dockerfile.anterior
+
+Uso (desde backend/, con Docker disponible y el .env en el directorio padre;
+usa los container_name de compose, así que no con el despliegue levantado):
+    python -m benchmarks.docker_image Dockerfile /tmp/Dockerfile.anterior --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+
+OVERRIDE = """
+services:
+  backend:
+    image: {tag}
+    build:
+      context: {context}
+      dockerfile: {dockerfile}
+"""
+
+
+def compose(files: list, *args: str) -> None:
+    command = ["docker", "compose"]
+    for file in files:
+        command += ["-f", file]
+    subprocess.run(command + list(args), check=True, stdout=subprocess.DEVNULL)
+
+
+def build(files: list, tag: str) -> float:
+    """Construye la imagen del servicio backend y devuelve su tamaño en MB."""
+    compose(files, "build", "-q", "backend")
+    inspect = subprocess.run(["docker", "image", "inspect", tag],
+                             check=True, capture_output=True, text=True)
+    return json.loads(inspect.stdout)[0]["Size"] / 1e6
+
+
+def time_to_first_request(files: list, port: int, timeout: float) -> float:
+    """Segundos desde `docker compose up` del backend hasta el primer 200 de /api."""
+    compose(files, "rm", "-sf", "backend")
+    start = time.perf_counter()
+    compose(files, "up", "-d", "--no-deps", "--no-build", "backend")
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api", timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"backend no respondió en {timeout}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tamaño de imagen y tiempo hasta el primer request")
+    parser.add_argument("dockerfiles", nargs="+")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--compose-file", default=os.path.join("..", "docker-compose-prod.yml"))
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    # ${PORT} del mapeo de puertos de compose: el entorno tiene precedencia sobre el .env
+    os.environ["PORT"] = str(args.port)
+    context = os.path.abspath(os.path.join(os.path.dirname(args.compose_file), "backend"))
+
+    print(f"{'dockerfile':<32}{'tamaño (MB)':>12}{'1er request mediana (s)':>26}{'mín (s)':>10}")
+    for index, dockerfile in enumerate(args.dockerfiles):
+        tag = f"backend-benchmark:{index}"
+        with tempfile.NamedTemporaryFile("w", suffix=".yml") as override:
+            override.write(OVERRIDE.format(tag=tag, context=context,
+                                           dockerfile=os.path.abspath(dockerfile)))
+            override.flush()
+            files = [args.compose_file, override.name]
+            try:
+                size = build(files, tag)
+                compose(files, "up", "-d", "--no-build")
+                times = [time_to_first_request(files, args.port, args.timeout)
+                         for _ in range(args.runs)]
+            finally:
+                compose(files, "down")
+        print(f"{dockerfile:<32}{size:>12.0f}{statistics.median(times):>26.2f}{min(times):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
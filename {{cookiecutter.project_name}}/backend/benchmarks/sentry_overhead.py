@@ -0,0 +1,105 @@
+"""
+Mide el costo por request de Sentry (trazas y profiling) sobre la app.
+
+Los eventos se descartan con un transporte nulo (no hay red), así que el
+resultado es solo el costo dentro del proceso: instrumentación, muestreo,
+armado de spans y, si se activa, el profiler.
+
+Escenarios:
+- sin_sentry: sin sentry_sdk.init
+- sampler_0: traces_sampler adaptativo que no muestrea (caso /health)
+- sampler: traces_sampler con la tasa de SENTRY_TRACES_SAMPLE_RATE
+- traces_100: todas las transacciones muestreadas
+- traces_profiles_100: todas muestreadas y perfiladas
+
+Cada escenario corre en un proceso nuevo (sentry_sdk.init es global).
+
+Uso (desde backend/, con el .env cargado):
+    python -m benchmarks.sentry_overhead --requests 3000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+SCENARIOS = ("sin_sentry", "sampler_0", "sampler", "traces_100", "traces_profiles_100")
+
+
+def _init_sentry(scenario: str) -> None:
+    import sentry_sdk
+    from sentry_sdk.integrations.flask import FlaskIntegration
+    from sentry_sdk.transport import Transport
+
+    from core.config import APP_CONFIG
+    from core.sampling import build_traces_sampler
+
+    class NullTransport(Transport):
+        def capture_envelope(self, envelope):
+            pass
+
+    options = {}
+    if scenario in ("sampler_0", "sampler"):
+        rate = 0.0 if scenario == "sampler_0" else APP_CONFIG.SENTRY_TRACES_SAMPLE_RATE
+        options["traces_sampler"] = build_traces_sampler(
+            rate, {}, APP_CONFIG.SENTRY_IGNORED_PATHS, APP_CONFIG.SENTRY_SLOW_THRESHOLD,
+            APP_CONFIG.SENTRY_HOT_WINDOW, APP_CONFIG.SENTRY_MAX_TRACES_PER_SECOND,
+        )
+    else:
+        options["traces_sample_rate"] = 1.0
+        if scenario == "traces_profiles_100":
+            options["profiles_sample_rate"] = 1.0
+
+    sentry_sdk.init(
+        dsn="http://public@127.0.0.1:9/1",
+        transport=NullTransport,
+        integrations=[FlaskIntegration(transaction_style="url")],
+        **options,
+    )
+
+
+def run_scenario(scenario: str, requests: int) -> float:
+    """Devuelve los microsegundos por request de un escenario."""
+    # Todas las requests salen del mismo cliente: sin límite de tasa
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if scenario != "sin_sentry":
+        _init_sentry(scenario)
+
+    from app import create_app
+
+    client = create_app().test_client()
+    for _ in range(200):
+        client.get("/api")
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/api")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Sentry overhead")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--scenario", choices=SCENARIOS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.requests)))
+        sys.exit(0)
+
+    results = {}
+    for scenario in SCENARIOS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sentry_overhead",
+             "--scenario", scenario, "--requests", str(args.requests)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[scenario] = float(output.strip().splitlines()[-1])
+
+    baseline = results["sin_sentry"]
+    print(f"{'escenario':<22}{'us/request':>12}{'overhead':>12}")
+    for scenario, micros in results.items():
+        print(f"{scenario:<22}{micros:>12.1f}{micros - baseline:>+11.1f}us")
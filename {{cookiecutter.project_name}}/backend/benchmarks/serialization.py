@@ -0,0 +1,65 @@
+"""
+Compara Schema.dump(many=True) contra el serializador compilado.
+
+Uso (desde backend/):
+    python -m benchmarks.serialization --rows 10000 100000
+"""
+
+import argparse
+import datetime
+import time
+from types import SimpleNamespace
+
+from marshmallow import Schema, fields
+
+from schemas.compiled import compile_schema
+
+
+class BenchSchema(Schema):
+    id = fields.Integer()
+    name = fields.String()
+    email = fields.String()
+    price = fields.Float()
+    active = fields.Boolean()
+    created = fields.DateTime()
+
+
+COLUMNS = ("id", "name", "email", "price", "active", "created")
+
+
+def _rows(count: int) -> list:
+    created = datetime.datetime(2024, 1, 1)
+    return [(i, f"name-{i}", f"user{i}@example.com", i * 0.5, i % 2 == 0, created) for i in range(count)]
+
+
+def _best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compiled marshmallow serialization")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    schema = BenchSchema(many=True)
+    compiled_objects = compile_schema(BenchSchema)
+    compiled_tuples = compile_schema(BenchSchema, columns=COLUMNS)
+
+    print(f"{'rows':>8}{'marshmallow (ms)':>18}{'compiled obj (ms)':>19}{'compiled tuple (ms)':>21}{'speedup':>9}")
+    for count in args.rows:
+        tuples = _rows(count)
+        objects = [SimpleNamespace(**dict(zip(COLUMNS, row))) for row in tuples]
+        assert compiled_objects.dump_many(objects) == schema.dump(objects)
+
+        baseline = _best_of(lambda: schema.dump(objects))
+        compiled = _best_of(lambda: compiled_objects.dump_many(objects))
+        positional = _best_of(lambda: compiled_tuples.dump_many(tuples))
+        print(
+            f"{count:>8}{baseline * 1000:>18.1f}{compiled * 1000:>19.1f}"
+            f"{positional * 1000:>21.1f}{baseline / compiled:>8.1f}x"
+        )
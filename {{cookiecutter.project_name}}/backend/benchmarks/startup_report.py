@@ -0,0 +1,87 @@
+"""
+Reporte de arranque: tiempos de import por paquete y de cada paso de
+create_app.
+
+Importa `app` en un proceso nuevo con `python -X importtime` (igual que
+un worker de gunicorn al arrancar) y muestra:
+- los paquetes con más tiempo de import propio (suma de sus módulos)
+- los módulos con más tiempo acumulado (incluye sus dependencias)
+- los pasos de create_app (app.extensions['startup_timings'])
+
+Se repite --runs veces y se muestra la corrida más rápida: la primera
+suele pagar la compilación de .pyc y el cache de disco.
+
+Uso (desde backend/, con el .env cargado):
+    python -m benchmarks.startup_report --top 15
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+MARKER = "STARTUP_TIMINGS "
+CHILD_CODE = (
+    "import json, app; "
+    f"print({MARKER!r} + json.dumps(app.app.extensions['startup_timings'].as_ms()))"
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Devuelve (módulo, propio_us, acumulado_us) de la salida de -X importtime."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_once() -> Tuple[List[Tuple[str, int, int]], Dict[str, float]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        capture_output=True, text=True, check=True,
+    )
+    steps = {}
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKER):
+            steps = json.loads(line[len(MARKER):])
+    return parse_importtime(result.stderr), steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tiempos de import e inicialización de la app")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    modules, steps = min(runs, key=lambda run: sum(self_us for _, self_us, _ in run[0]))
+
+    total_us = sum(self_us for _, self_us, _ in modules)
+    app_us = next((cumulative for name, _, cumulative in modules if name == "app"), 0)
+    print(f"import app: {app_us / 1000:.1f} ms (create_app incluido), "
+          f"{len(modules)} módulos, {total_us / 1000:.1f} ms en total")
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'paquete':<32}{'propio (ms)':>12}")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32}{self_us / 1000:>12.1f}")
+
+    print(f"\n{'módulo':<48}{'acumulado (ms)':>15}")
+    for name, _, cumulative in sorted(modules, key=lambda module: -module[2])[:args.top]:
+        print(f"{name:<48}{cumulative / 1000:>15.1f}")
+
+    print(f"\n{'paso de create_app':<32}{'ms':>12}")
+    for name, duration in steps.items():
+        print(f"{name:<32}{duration:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
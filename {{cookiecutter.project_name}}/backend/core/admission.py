@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from flask import Flask
+
+from core.metrics import metrics
+from logs import logs_config
+
+
+OVERLOADED_BODY = json.dumps({"msg": "Service overloaded, retry later"}).encode()
+# Set on admitted requests: the API_BASE_URL dispatcher calls the app again
+ADMITTED_ENVIRON_KEY = "admission.admitted"
+
+
+def upstream_queue_delay(environ: dict, now: float) -> float:
+    """
+    Seconds the request waited before reaching the app, from X-Request-Start.
+
+    Accepts the header set by proxies (nginx: 't=${msec}') as seconds,
+    milliseconds or microseconds since the epoch, with or without 't='.
+    Returns 0 when the header is missing or malformed.
+    """
+    value = environ.get("HTTP_X_REQUEST_START", "")
+    if value.startswith("t="):
+        value = value[2:]
+    try:
+        started = float(value)
+    except ValueError:
+        return 0.0
+    # Normalize ms / us timestamps to seconds
+    while started > now * 100:
+        started /= 1000
+    return max(now - started, 0.0)
+
+
+class AdmissionMiddleware:
+    """
+    Per-worker admission control in front of the WSGI app.
+
+    At most max_concurrency requests run at once; up to max_queue more
+    wait for a slot (never longer than max_wait). Beyond that, requests
+    are shed immediately with 503 + Retry-After instead of piling up
+    until the worker timeout.
+
+    Queueing delay (local wait, plus the upstream delay from X-Request-Start
+    when upstream_header is set) is checked CoDel-style when a request is admitted: a delay over
+    'target' is tolerated while it is a transient burst, but once it has
+    stayed over target for a whole 'interval' the worker enters the
+    shedding state and rejects every request whose delay is over target,
+    until one comes in under it. Latency stays bounded by target instead
+    of growing with the backlog.
+
+    Paths in bypass_paths (health checks) skip admission entirely.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: float,
+        target: float,
+        interval: float,
+        retry_after: int = 1,
+        bypass_paths: Iterable[str] = (),
+        upstream_header: bool = False,
+    ) -> None:
+        self.wsgi_app = wsgi_app
+        self.upstream_header = upstream_header
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.target = target
+        self.interval = interval
+        self.retry_after = retry_after
+        self.bypass_paths = frozenset(bypass_paths)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._first_above: Optional[float] = None
+        self._shedding = False
+
+    def _should_shed(self, delay: float, now: float) -> bool:
+        with self._lock:
+            if delay < self.target:
+                if self._shedding:
+                    logs_config.logger.info("Admission control: queue delay back under target")
+                self._first_above, self._shedding = None, False
+                return False
+            if self._first_above is None:
+                self._first_above = now + self.interval
+            elif not self._shedding and now >= self._first_above:
+                self._shedding = True
+                logs_config.logger.warning(
+                    f"Admission control: queue delay over {self.target * 1000:.0f}ms "
+                    f"for {self.interval * 1000:.0f}ms, shedding load"
+                )
+            return self._shedding
+
+    def _reject(self, reason: str, start_response: Callable) -> Iterable[bytes]:
+        metrics.increment("admission", reason)
+        start_response("503 SERVICE UNAVAILABLE", [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(OVERLOADED_BODY))),
+            ("Retry-After", str(self.retry_after)),
+        ])
+        return [OVERLOADED_BODY]
+
+    def _acquire(self) -> Optional[str]:
+        # Returns the shed reason, or None once a slot is held
+        if self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return "shed_queue_full"
+            self._waiting += 1
+        try:
+            if self._slots.acquire(timeout=self.max_wait):
+                return None
+            return "shed_timeout"
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        if ADMITTED_ENVIRON_KEY in environ or environ.get("PATH_INFO") in self.bypass_paths:
+            return self.wsgi_app(environ, start_response)
+
+        arrived = time.monotonic()
+        upstream_delay = upstream_queue_delay(environ, time.time()) if self.upstream_header else 0.0
+        reason = self._acquire()
+        if reason is not None:
+            return self._reject(reason, start_response)
+
+        delay = upstream_delay + time.monotonic() - arrived
+        metrics.observe("admission_delay", "queue", delay)
+        if self._should_shed(delay, time.monotonic()):
+            self._slots.release()
+            return self._reject("shed_delay", start_response)
+
+        metrics.increment("admission", "admitted")
+        environ[ADMITTED_ENVIRON_KEY] = True
+        try:
+            body = self.wsgi_app(environ, start_response)
+        except BaseException:
+            self._slots.release()
+            raise
+        return _ReleasingIterable(body, self._slots.release)
+
+
+class _ReleasingIterable:
+    """
+    Response body that frees the slot once the server has sent it.
+
+    WSGI servers call close(); clients that never do (werkzeug's test
+    client) still free the slot when the body is exhausted or dropped.
+    """
+
+    def __init__(self, body: Iterable[bytes], release: Callable[[], None]) -> None:
+        self._body = body
+        self._release = release
+        self._released = False
+
+    def _release_once(self) -> None:
+        if not self._released:
+            self._released = True
+            self._release()
+
+    def __iter__(self):
+        try:
+            yield from self._body
+        finally:
+            self._release_once()
+
+    def close(self) -> None:
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            self._release_once()
+
+    def __del__(self) -> None:
+        self._release_once()
+
+
+def init_admission_control(app: Flask) -> None:
+    """
+    Wraps app.wsgi_app with an AdmissionMiddleware.
+
+    Must run after every other WSGI middleware so requests are shed
+    before any work is done for them.
+
+    Requests only wait in the admission queue when gunicorn has more
+    threads than ADMISSION_MAX_CONCURRENCY; without that, and without the
+    proxy's X-Request-Start, there is no delay to measure and nothing is
+    ever shed, so a warning is logged.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("ADMISSION_ENABLED"):
+        return
+
+    base_url = (app.config.get("API_BASE_URL") or "").rstrip("/")
+    bypass_paths = set()
+    for path in app.config.get("ADMISSION_BYPASS_PATHS", ("/health",)):
+        bypass_paths.update((path, base_url + path))
+
+    max_concurrency = app.config["ADMISSION_MAX_CONCURRENCY"]
+    threads = app.config.get("GUNICORN_THREADS")
+    upstream_header = app.config.get("ADMISSION_UPSTREAM_HEADER", False)
+    if threads and max_concurrency >= threads and not upstream_header:
+        logs_config.logger.warning(
+            f"Admission control: ADMISSION_MAX_CONCURRENCY ({max_concurrency}) >= "
+            f"GUNICORN_THREADS ({threads}) and ADMISSION_UPSTREAM_HEADER is off; "
+            f"requests queue inside gunicorn and load is never shed"
+        )
+
+    app.wsgi_app = AdmissionMiddleware(
+        app.wsgi_app,
+        max_concurrency=max_concurrency,
+        max_queue=app.config.get("ADMISSION_MAX_QUEUE", 8),
+        max_wait=app.config.get("ADMISSION_MAX_WAIT", 1.0),
+        target=app.config.get("ADMISSION_TARGET_DELAY", 0.1),
+        interval=app.config.get("ADMISSION_INTERVAL", 0.5),
+        retry_after=app.config.get("ADMISSION_RETRY_AFTER", 1),
+        bypass_paths=bypass_paths,
+        upstream_header=upstream_header,
+    )
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Awaitable, List, Optional
+
+
+async def gather_with_timeout(
+    *aws: Awaitable[Any],
+    timeout: Optional[float],
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Runs awaitables concurrently, each bounded by its own timeout.
+
+    Unlike wrapping asyncio.gather in a single wait_for, a slow call only
+    fails itself: with return_exceptions=True the other results are still
+    returned and the slow one is an asyncio.TimeoutError in its slot.
+
+    Example:
+        profile, orders = await gather_with_timeout(
+            fetch_profile(user_id), fetch_orders(user_id), timeout=2.0
+        )
+
+    Args:
+        *aws: Coroutines or futures to run
+        timeout: Seconds allowed per call (None for no limit)
+        return_exceptions: Return exceptions in place of results instead of
+            raising the first one
+
+    Returns:
+        Results in the order of the awaitables.
+    """
+    return await asyncio.gather(
+        *(asyncio.wait_for(aw, timeout) for aw in aws),
+        return_exceptions=return_exceptions,
+    )
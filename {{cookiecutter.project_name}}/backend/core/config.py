@@ -1,16 +1,21 @@
+import json
 import os
 from typing import Optional, Type, Union
 from dotenv import load_dotenv
-import sentry_sdk
-from sentry_sdk.integrations.flask import FlaskIntegration
 from urllib.parse import quote_plus
 
+from core.sampling import build_traces_sampler
 from logs import logs_config
 
 
 load_dotenv()
 
 
+def _env_bool(name: str, default: str = 'false') -> bool:
+    """Reads a boolean flag from the environment ('1', 'true', 'yes')."""
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes')
+
+
 class BaseConfig:
     """Base configuration with common settings across all environments."""
     
@@ -23,24 +28,168 @@ class BaseConfig:
     # JWT settings
     JWT_SECRET_KEY: str = os.getenv('JWT_SECRET_KEY')
     TOKEN_API_KEY: str = os.getenv('TOKEN_API_KEY')
+    # Key rotation: kid-indexed JWKS file and extra accepted API keys (comma separated)
+    JWT_JWKS_FILE: Optional[str] = os.getenv('JWT_JWKS_FILE')
+    TOKEN_API_KEYS: frozenset = frozenset(
+        key.strip() for key in os.getenv('TOKEN_API_KEYS', '').split(',') if key.strip()
+    )
     
     {%- if cookiecutter.use_db == "yes" %}
 
     # Database settings
+    # DB_DRIVER: 'psycopg' (psycopg 3, server-side prepared statements and
+    # pipeline mode) or 'psycopg2' (fallback)
+    DB_DRIVER: str = os.getenv('DB_DRIVER', 'psycopg')
     SQLALCHEMY_DATABASE_URI: str = (
-        f"postgresql://{quote_plus(os.getenv('DB_USER'))}:"
+        f"postgresql+{DB_DRIVER}://{quote_plus(os.getenv('DB_USER'))}:"
         f"{quote_plus(os.getenv('DB_PASSWORD'))}@"
         f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT', '5432')}/"
         f"{os.getenv('DB_NAME')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Flask-Migrate ('flask db' commands); docker-compose-prod.yml turns it off
+    DB_MIGRATIONS_ENABLED: bool = _env_bool('DB_MIGRATIONS_ENABLED', 'true')
+    # psycopg 3: statements executed DB_PREPARE_THRESHOLD times on a connection
+    # are prepared server-side; DB_PREPARED_MAX bounds the per-connection cache
+    DB_PREPARE_THRESHOLD: int = int(os.getenv('DB_PREPARE_THRESHOLD', '5'))
+    DB_PREPARED_MAX: int = int(os.getenv('DB_PREPARED_MAX', '100'))
+    SQLALCHEMY_ENGINE_OPTIONS: dict = (
+        {"connect_args": {"prepare_threshold": DB_PREPARE_THRESHOLD}}
+        if DB_DRIVER == 'psycopg' else {}
+    )
+
+    # Async engine for async def views (db/async_database.py); always psycopg 3
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv('ASYNC_DB_POOL_SIZE', '10'))
+    ASYNC_DB_TIMEOUT: float = float(os.getenv('ASYNC_DB_TIMEOUT', '10'))
+    # prepare_threshold is added by db/async_database.py for psycopg URIs only
+    SQLALCHEMY_ASYNC_ENGINE_OPTIONS: dict = {"pool_size": ASYNC_DB_POOL_SIZE}
+
+    # Per-request SQL instrumentation (statement count, DB time, N+1 detection)
+    SQL_INSTRUMENTATION: bool = _env_bool('SQL_INSTRUMENTATION')
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5'))
+
+    # Opt-in query result cache, invalidated on commits to the queried tables
+    QUERY_CACHE_ENABLED: bool = _env_bool('QUERY_CACHE_ENABLED')
+    QUERY_CACHE_BACKEND: str = os.getenv('QUERY_CACHE_BACKEND', 'memory')  # memory | sqlite
+    QUERY_CACHE_PATH: str = os.getenv('QUERY_CACHE_PATH', '/tmp/query_cache.sqlite3')
+    QUERY_CACHE_MAX_ENTRIES: int = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '1024'))
+    QUERY_CACHE_TTL: float = float(os.getenv('QUERY_CACHE_TTL', '300'))
+    QUERY_CACHE_LOG_EVERY: int = int(os.getenv('QUERY_CACHE_LOG_EVERY', '1000'))
     
     {%- endif %}
 
+    # Per-request phase timing (access log) and Server-Timing header
+    PHASE_TIMING_ENABLED: bool = _env_bool('PHASE_TIMING_ENABLED', 'true')
+    SERVER_TIMING_HEADER: bool = _env_bool('SERVER_TIMING_HEADER', 'true')
+
+    # On-demand request profiling (X-Profile-Token header or sampled paths)
+    PROFILING_ENABLED: bool = _env_bool('PROFILING_ENABLED')
+    PROFILING_TOKEN: Optional[str] = os.getenv('PROFILING_TOKEN')
+    PROFILING_SAMPLE_RATE: float = float(os.getenv('PROFILING_SAMPLE_RATE', '0.0'))
+    PROFILING_PATHS: tuple = tuple(
+        path.strip() for path in os.getenv('PROFILING_PATHS', '').split(',') if path.strip()
+    )
+    PROFILING_MAX_PER_WORKER: int = int(os.getenv('PROFILING_MAX_PER_WORKER', '20'))
+    PROFILING_MIN_INTERVAL: float = float(os.getenv('PROFILING_MIN_INTERVAL', '60'))
+    PROFILING_DIR: str = os.getenv(
+        'PROFILING_DIR', os.path.join(os.getenv('LOG_DIR', 'logs'), 'profiles')
+    )
+
+    # Slow-request watchdog: stack dump before gunicorn's worker timeout
+    WATCHDOG_ENABLED: bool = _env_bool('WATCHDOG_ENABLED', 'true')
+    SLOW_REQUEST_THRESHOLD: float = float(
+        os.getenv('SLOW_REQUEST_THRESHOLD', str(int(os.getenv('GUNICORN_TIMEOUT', '60')) * 0.75))
+    )
+    WATCHDOG_INTERVAL: float = float(os.getenv('WATCHDOG_INTERVAL', '1'))
+
+    # Memory-based worker recycling (core/memory.py, gunicorn post_request hook);
+    # 0 disables each check
+    MEMORY_MAX_RSS_MB: float = float(os.getenv('MEMORY_MAX_RSS_MB', '512'))
+    MEMORY_MAX_GROWTH_MB_PER_1K: float = float(os.getenv('MEMORY_MAX_GROWTH_MB_PER_1K', '0'))
+    MEMORY_WARMUP_REQUESTS: int = int(os.getenv('MEMORY_WARMUP_REQUESTS', '100'))
+    MEMORY_CHECK_EVERY: int = int(os.getenv('MEMORY_CHECK_EVERY', '10'))
+    MEMORY_LOG_EVERY: int = int(os.getenv('MEMORY_LOG_EVERY', '1000'))
+    MEMORY_TRACEMALLOC_TOP: int = int(os.getenv('MEMORY_TRACEMALLOC_TOP', '0'))
+
+    # Admission control (core/admission.py): per-worker concurrency limit,
+    # short wait queue and CoDel-style shedding with 503 + Retry-After.
+    # Only threads beyond the concurrency limit can wait in the queue, so
+    # the defaults split GUNICORN_THREADS between running and waiting
+    GUNICORN_THREADS: int = int(os.getenv('GUNICORN_THREADS', '8'))
+    ADMISSION_ENABLED: bool = _env_bool('ADMISSION_ENABLED', 'true')
+    ADMISSION_MAX_CONCURRENCY: int = int(
+        os.getenv('ADMISSION_MAX_CONCURRENCY', str(max(GUNICORN_THREADS // 2, 1)))
+    )
+    ADMISSION_MAX_QUEUE: int = int(
+        os.getenv('ADMISSION_MAX_QUEUE', str(max(GUNICORN_THREADS - ADMISSION_MAX_CONCURRENCY, 0)))
+    )
+    # Read X-Request-Start only when the proxy sets it (clients could forge it)
+    ADMISSION_UPSTREAM_HEADER: bool = _env_bool('ADMISSION_UPSTREAM_HEADER')
+    ADMISSION_MAX_WAIT: float = float(os.getenv('ADMISSION_MAX_WAIT', '1'))
+    ADMISSION_TARGET_DELAY: float = float(os.getenv('ADMISSION_TARGET_DELAY', '0.1'))
+    ADMISSION_INTERVAL: float = float(os.getenv('ADMISSION_INTERVAL', '0.5'))
+    ADMISSION_RETRY_AFTER: int = int(os.getenv('ADMISSION_RETRY_AFTER', '1'))
+    ADMISSION_BYPASS_PATHS: tuple = tuple(
+        path.strip() for path in os.getenv('ADMISSION_BYPASS_PATHS', '/health').split(',') if path.strip()
+    )
+
+    # Rate limiting (core/ratelimit.py): token buckets shared by the workers
+    # through an mmap'd file; per principal (jti/sub) or client IP.
+    # RATE_LIMIT_ROUTES: JSON {"<endpoint>": "<count>/<second|minute|hour|day>"}
+    RATE_LIMIT_ENABLED: bool = _env_bool('RATE_LIMIT_ENABLED', 'true')
+    RATE_LIMIT_DEFAULT: Optional[str] = os.getenv('RATE_LIMIT_DEFAULT', '50/second')
+    RATE_LIMIT_ROUTES: str = os.getenv('RATE_LIMIT_ROUTES', '{}')
+    RATE_LIMIT_PATH: Optional[str] = os.getenv('RATE_LIMIT_PATH')
+    RATE_LIMIT_SLOTS: int = int(os.getenv('RATE_LIMIT_SLOTS', '65536'))
+    RATE_LIMIT_EXEMPT_PATHS: tuple = tuple(
+        path.strip() for path in os.getenv('RATE_LIMIT_EXEMPT_PATHS', '/health').split(',') if path.strip()
+    )
+
+    # @idempotent write endpoints (core/idempotency.py): responses stored per
+    # principal and Idempotency-Key in a SQLite file shared by the workers
+    IDEMPOTENCY_ENABLED: bool = _env_bool('IDEMPOTENCY_ENABLED', 'true')
+    IDEMPOTENCY_PATH: str = os.getenv('IDEMPOTENCY_PATH', '/tmp/idempotency.sqlite3')
+    IDEMPOTENCY_TTL: float = float(os.getenv('IDEMPOTENCY_TTL', '86400'))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '10000'))
+    IDEMPOTENCY_WAIT_TIMEOUT: float = float(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', '10'))
+    IDEMPOTENCY_LOCK_TIMEOUT: float = float(
+        os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', os.getenv('GUNICORN_TIMEOUT', '60'))
+    )
+
+    # Shared outbound HTTP client (core/http_client.py): keep-alive pool per
+    # host sized to the worker threads, retries with backoff, circuit breaker
+    HTTP_CLIENT_POOL_SIZE: int = int(os.getenv('HTTP_CLIENT_POOL_SIZE', str(GUNICORN_THREADS)))
+    HTTP_CLIENT_POOL_HOSTS: int = int(os.getenv('HTTP_CLIENT_POOL_HOSTS', '10'))
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = float(os.getenv('HTTP_CLIENT_CONNECT_TIMEOUT', '3.05'))
+    HTTP_CLIENT_READ_TIMEOUT: float = float(os.getenv('HTTP_CLIENT_READ_TIMEOUT', '10'))
+    HTTP_CLIENT_RETRIES: int = int(os.getenv('HTTP_CLIENT_RETRIES', '2'))
+    HTTP_CLIENT_BACKOFF: float = float(os.getenv('HTTP_CLIENT_BACKOFF', '0.3'))
+    HTTP_CIRCUIT_FAILURES: int = int(os.getenv('HTTP_CIRCUIT_FAILURES', '5'))
+    HTTP_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv('HTTP_CIRCUIT_RESET_TIMEOUT', '30'))
+
+    # In-process background tasks (core/tasks.py); queue policy when full:
+    # reject | caller_runs | drop. Drained on worker exit (gunicorn.conf.py)
+    TASKS_MAX_WORKERS: int = int(os.getenv('TASKS_MAX_WORKERS', '4'))
+    TASKS_MAX_QUEUE: int = int(os.getenv('TASKS_MAX_QUEUE', '100'))
+    TASKS_QUEUE_POLICY: str = os.getenv('TASKS_QUEUE_POLICY', 'reject')
+    TASKS_PROCESS_WORKERS: int = int(os.getenv('TASKS_PROCESS_WORKERS', '0'))
+
     # Sentry settings (loaded but not initialized in base)
     SENTRY_DSN: Optional[str] = os.getenv('SENTRY_DSN')
     SENTRY_ENVIRONMENT: str = os.getenv('SENTRY_ENVIRONMENT', 'development')
     SENTRY_TRACES_SAMPLE_RATE: float = float(os.getenv('SENTRY_TRACES_SAMPLE_RATE', '0.0'))
+    # Fraction of sampled transactions that are also profiled
+    SENTRY_PROFILES_SAMPLE_RATE: float = float(os.getenv('SENTRY_PROFILES_SAMPLE_RATE', '0.0'))
+    # Adaptive traces_sampler (core/sampling.py): per-route rates as JSON
+    # {"<path prefix>": rate}, ignored paths, always-sampled slow/failing
+    # paths and a per-worker cap of sampled transactions per second
+    SENTRY_ROUTE_SAMPLE_RATES: str = os.getenv('SENTRY_ROUTE_SAMPLE_RATES', '{}')
+    SENTRY_IGNORED_PATHS: tuple = tuple(
+        path.strip() for path in os.getenv('SENTRY_IGNORED_PATHS', '/health,/metrics').split(',') if path.strip()
+    )
+    SENTRY_SLOW_THRESHOLD: float = float(os.getenv('SENTRY_SLOW_THRESHOLD', '1.0'))
+    SENTRY_HOT_WINDOW: float = float(os.getenv('SENTRY_HOT_WINDOW', '300'))
+    SENTRY_MAX_TRACES_PER_SECOND: float = float(os.getenv('SENTRY_MAX_TRACES_PER_SECOND', '5'))
 
 
 class DevelopmentConfig(BaseConfig):
@@ -65,6 +214,8 @@ class ProductionConfig(BaseConfig):
     DEBUG: bool = False
     TESTING: bool = False
     PROPAGATE_EXCEPTIONS: bool = False
+    # Timings are still logged, but not exposed to clients by default
+    SERVER_TIMING_HEADER: bool = _env_bool('SERVER_TIMING_HEADER', 'false')
 
 
 # Environment to config class mapping
@@ -96,6 +247,12 @@ def init_sentry(config: BaseConfig) -> None:
     - Environment is 'production'
     - SENTRY_DSN is configured
     
+    sentry_sdk is imported here, so other environments never load it.
+    
+    Transactions are sampled per request path by the adaptive sampler in
+    core/sampling.py; profiling applies to SENTRY_PROFILES_SAMPLE_RATE of
+    the sampled transactions.
+    
     Args:
         config: Configuration instance containing Sentry settings.
     
@@ -112,11 +269,23 @@ def init_sentry(config: BaseConfig) -> None:
         return
     
     try:
+        import sentry_sdk
+        from sentry_sdk.integrations.flask import FlaskIntegration
+
+        traces_sampler = build_traces_sampler(
+            default_rate=config.SENTRY_TRACES_SAMPLE_RATE,
+            route_rates=json.loads(config.SENTRY_ROUTE_SAMPLE_RATES),
+            ignored_paths=config.SENTRY_IGNORED_PATHS,
+            slow_threshold=config.SENTRY_SLOW_THRESHOLD,
+            hot_window=config.SENTRY_HOT_WINDOW,
+            max_per_second=config.SENTRY_MAX_TRACES_PER_SECOND,
+            base_url=config.API_BASE_URL or "",
+        )
         sentry_sdk.init(
             dsn=config.SENTRY_DSN,
             environment=config.SENTRY_ENVIRONMENT,
-            traces_sample_rate=config.SENTRY_TRACES_SAMPLE_RATE,
-            profiles_sample_rate=config.SENTRY_TRACES_SAMPLE_RATE,  # Match traces rate
+            traces_sampler=traces_sampler,  # SENTRY_TRACES_SAMPLE_RATE is its default rate
+            profiles_sample_rate=config.SENTRY_PROFILES_SAMPLE_RATE,  # Share of sampled traces
             send_default_pii=False,  # Don't send personally identifiable information by default
             attach_stacktrace=True,
             enable_logs=True,
@@ -0,0 +1,232 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from flask import Flask, current_app, g, has_app_context
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.metrics import metrics
+from logs import logs_config
+
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without calling the host while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After 'failure_threshold' consecutive failures (connection errors,
+    timeouts or 5xx responses once retries are exhausted) the circuit
+    opens and calls fail fast for 'reset_timeout' seconds. Then a single
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Returns whether a call may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial after a call that never reached the host."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Records a failed call; returns True if it opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            was_open = self._opened_at is not None
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+            return not was_open and self._opened_at is not None
+
+
+class HttpClient:
+    """
+    Shared client for calls to other services (one per worker process).
+
+    Wraps a requests.Session whose adapter keeps a keep-alive connection
+    pool per host, so repeated calls skip the TCP and TLS handshakes.
+    pool_maxsize should match the worker threads: every thread can hold a
+    connection to the same host without opening throwaway ones.
+
+    Idempotent methods are retried with exponential backoff on connection
+    errors and 502/503/504 (urllib3 Retry, honoring Retry-After). Every
+    call gets a default (connect, read) timeout, carries the current
+    g.request_id as X-Request-ID, is timed per host in the metrics
+    registry and goes through the host's circuit breaker.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 10,
+        pool_connections: int = 10,
+        timeout: Tuple[float, float] = (3.05, 10.0),
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Returns the circuit breaker for a host."""
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    host, CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends a request through the pool (same arguments as requests).
+
+        Example:
+            response = get_http_client().get('https://api.example.com/items', params={'page': 1})
+            response.raise_for_status()
+
+        Returns:
+            requests.Response (4xx/5xx responses are returned, not raised)
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+            requests.RequestException: On connection errors or timeouts
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            metrics.increment("http_client_rejected", host)
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        kwargs.setdefault("timeout", self.timeout)
+        if has_app_context() and "request_id" in g:
+            headers = dict(kwargs.get("headers") or {})
+            headers.setdefault(REQUEST_ID_HEADER, g.request_id)
+            kwargs["headers"] = headers
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._record_failure(host, breaker)
+            raise
+        except BaseException:
+            # Not a verdict on the host (e.g. an unserializable json= body),
+            # but a half-open trial must not stay taken forever
+            breaker.release_trial()
+            raise
+        finally:
+            metrics.observe("http_client", host, time.perf_counter() - start)
+
+        if response.status_code >= 500:
+            self._record_failure(host, breaker)
+        else:
+            breaker.record_success()
+        return response
+
+    def _record_failure(self, host: str, breaker: CircuitBreaker) -> None:
+        metrics.increment("http_client_errors", host)
+        if breaker.record_failure():
+            logs_config.logger.warning(
+                f"HTTP circuit opened for {host} for {self.reset_timeout:.0f}s"
+            )
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def init_http_client(app: Flask) -> None:
+    """
+    Creates the app-scoped HttpClient from the HTTP_CLIENT_* settings.
+
+    Args:
+        app: Flask application instance
+    """
+    app.extensions["http_client"] = HttpClient(
+        pool_maxsize=app.config.get("HTTP_CLIENT_POOL_SIZE", 10),
+        pool_connections=app.config.get("HTTP_CLIENT_POOL_HOSTS", 10),
+        timeout=(
+            app.config.get("HTTP_CLIENT_CONNECT_TIMEOUT", 3.05),
+            app.config.get("HTTP_CLIENT_READ_TIMEOUT", 10.0),
+        ),
+        retries=app.config.get("HTTP_CLIENT_RETRIES", 2),
+        backoff_factor=app.config.get("HTTP_CLIENT_BACKOFF", 0.3),
+        failure_threshold=app.config.get("HTTP_CIRCUIT_FAILURES", 5),
+        reset_timeout=app.config.get("HTTP_CIRCUIT_RESET_TIMEOUT", 30.0),
+    )
+
+
+def get_http_client() -> HttpClient:
+    """Returns the HttpClient of the current app."""
+    return current_app.extensions["http_client"]
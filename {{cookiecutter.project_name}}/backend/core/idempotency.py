@@ -0,0 +1,365 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from flask import Flask, Response, current_app, g, jsonify, request
+
+from core.metrics import metrics
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+# Not replayed: the length is recomputed and cookies belong to the first response
+UNSTORED_HEADERS = frozenset({"content-length", "set-cookie"})
+
+
+class StoredResponse(NamedTuple):
+    status: int
+    headers: list
+    body: bytes
+
+
+class Claim(NamedTuple):
+    """Outcome of claiming a key: 'new', 'done', 'pending' or 'mismatch'."""
+    state: str
+    response: Optional[StoredResponse] = None
+
+
+class IdempotencyStore:
+    """
+    Idempotency records in a local SQLite file shared by all workers.
+
+    The first request for a key inserts a 'pending' row; once its view
+    returns, the row holds the response until 'ttl' expires. A pending row
+    older than lock_timeout belongs to a request that died (worker killed)
+    and can be claimed again. Expired rows are purged every
+    'purge_every' writes, and the oldest are evicted past max_entries.
+    The SQLite file is opened on first use, not when the store is created.
+    """
+
+    def __init__(self, path: str, ttl: float, lock_timeout: float, max_entries: int,
+                 purge_every: int = 100) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections do not survive fork)
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS idempotency (
+                    key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, state TEXT NOT NULL,
+                    expires REAL NOT NULL, status INTEGER, headers TEXT, body BLOB
+                )
+                """
+            )
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def claim(self, key: str, fingerprint: str) -> Claim:
+        """Inserts a pending row for the key or reports its current state."""
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT fingerprint, state, expires, status, headers, body FROM idempotency WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and row[2] >= now:
+                if row[0] != fingerprint:
+                    return Claim("mismatch")
+                if row[1] == "done":
+                    return Claim("done", StoredResponse(row[3], json.loads(row[4]), row[5]))
+                return Claim("pending")
+            # New key, expired response or abandoned pending row
+            connection.execute(
+                "INSERT OR REPLACE INTO idempotency (key, fingerprint, state, expires) "
+                "VALUES (?, ?, 'pending', ?)",
+                (key, fingerprint, now + self.lock_timeout),
+            )
+            return Claim("new")
+        finally:
+            connection.execute("COMMIT")
+
+    def complete(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        """
+        Stores the response of a claimed key for 'ttl' seconds.
+
+        Only the pending claim for this request is updated: a row that was
+        reclaimed or completed by another request in the meantime is kept.
+        """
+        connection = self._connection()
+        connection.execute(
+            "UPDATE idempotency SET state = 'done', expires = ?, status = ?, headers = ?, body = ? "
+            "WHERE key = ? AND fingerprint = ? AND state = 'pending'",
+            (time.time() + self.ttl, response.status, json.dumps(response.headers), response.body,
+             key, fingerprint),
+        )
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.purge_every == 0
+        if due:
+            self.purge()
+
+    def release(self, key: str, fingerprint: str) -> None:
+        """Drops a pending claim so the client can retry (the view failed)."""
+        self._connection().execute(
+            "DELETE FROM idempotency WHERE key = ? AND fingerprint = ? AND state = 'pending'",
+            (key, fingerprint),
+        )
+
+    def get(self, key: str) -> Claim:
+        """Returns the state of a key without claiming it ('new' if absent)."""
+        row = self._connection().execute(
+            "SELECT state, status, headers, body FROM idempotency WHERE key = ? AND expires >= ?",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return Claim("new")
+        if row[0] == "done":
+            return Claim("done", StoredResponse(row[1], json.loads(row[2]), row[3]))
+        return Claim("pending")
+
+    def purge(self) -> None:
+        """Deletes expired rows and evicts the oldest ones past max_entries."""
+        connection = self._connection()
+        connection.execute("DELETE FROM idempotency WHERE expires < ?", (time.time(),))
+        connection.execute(
+            "DELETE FROM idempotency WHERE rowid IN ("
+            "SELECT rowid FROM idempotency WHERE state = 'done' "
+            "ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+class IdempotencyManager:
+    """
+    Coordinates duplicate requests on top of an IdempotencyStore.
+
+    A duplicate that arrives while the first request is running waits for
+    it: on a threading.Event when both are in this worker, otherwise by
+    polling the store. It then replays the stored response, or gets 409
+    if the first request is still running after wait_timeout.
+    """
+
+    def __init__(self, store: IdempotencyStore, wait_timeout: float, poll_interval: float = 0.05) -> None:
+        self.store = store
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _wait(self, key: str) -> Claim:
+        deadline = time.monotonic() + self.wait_timeout
+        with self._lock:
+            event = self._inflight.get(key)
+        if event is not None:
+            event.wait(self.wait_timeout)
+            return self.store.get(key)
+
+        while time.monotonic() < deadline:
+            claim = self.store.get(key)
+            if claim.state != "pending":
+                return claim
+            time.sleep(self.poll_interval)
+        return Claim("pending")
+
+    def _begin(self, key: str, fingerprint: str) -> Optional[Response]:
+        """
+        Claims the key for this request.
+
+        Returns:
+            None when the view must run (the key is now in flight),
+            otherwise the response to send instead
+        """
+        claim = self.store.claim(key, fingerprint)
+        if claim.state == "pending":
+            metrics.increment("idempotency", "waited")
+            claim = self._wait(key)
+            if claim.state == "new":
+                # The first request failed and released the key: run it ourselves
+                claim = self.store.claim(key, fingerprint)
+
+        if claim.state == "mismatch":
+            metrics.increment("idempotency", "mismatch")
+            return _error("Idempotency-Key reused with a different request", 422)
+        if claim.state == "pending":
+            return _error("A request with this Idempotency-Key is in progress", 409)
+        if claim.state == "done":
+            metrics.increment("idempotency", "replayed")
+            return _replay(claim.response)
+
+        with self._lock:
+            self._inflight[key] = threading.Event()
+        return None
+
+    def _finish(self, key: str, fingerprint: str, response: Response) -> Response:
+        if response.is_streamed or response.status_code >= 500:
+            # Not replayable (or not final): let the client retry
+            self.store.release(key, fingerprint)
+        else:
+            self.store.complete(key, fingerprint, StoredResponse(
+                response.status_code,
+                [(name, value) for name, value in response.headers.items()
+                 if name.lower() not in UNSTORED_HEADERS],
+                response.get_data(),
+            ))
+        metrics.increment("idempotency", "executed")
+        return response
+
+    def _end(self, key: str) -> None:
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def handle(self, key: str, fingerprint: str, view: Callable[[], Response]) -> Response:
+        """Runs the view once per key and replays its response afterwards."""
+        response = self._begin(key, fingerprint)
+        if response is not None:
+            return response
+        try:
+            return self._finish(key, fingerprint, view())
+        except BaseException:
+            self.store.release(key, fingerprint)
+            raise
+        finally:
+            self._end(key)
+
+    async def handle_async(self, key: str, fingerprint: str,
+                           view: Callable[[], Awaitable[Response]]) -> Response:
+        """Same as handle() for an async view, which is awaited."""
+        response = self._begin(key, fingerprint)
+        if response is not None:
+            return response
+        try:
+            return self._finish(key, fingerprint, await view())
+        except BaseException:
+            self.store.release(key, fingerprint)
+            raise
+        finally:
+            self._end(key)
+
+
+def _error(message: str, status: int) -> Response:
+    response = jsonify({'msg': message})
+    response.status_code = status
+    return response
+
+
+def _replay(stored: StoredResponse) -> Response:
+    response = Response(stored.body, status=stored.status, headers=stored.headers)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _scope() -> str:
+    # Keys are per principal: two clients may pick the same key
+    principal = g.get("principal")
+    return f"key:{principal}" if principal else f"ip:{request.remote_addr}"
+
+
+def idempotent(func: Callable) -> Callable:
+    """
+    Makes a write endpoint safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs the view and its response (status
+    below 500) is stored for IDEMPOTENCY_TTL; retries with the same key
+    and payload get the stored response with 'Idempotent-Replayed: true'
+    without running the view. Reusing a key with a different payload is
+    a 422. Requests without the header run normally.
+
+    Place it below token_required so keys are scoped to the principal.
+    Works on both regular and async def views.
+
+    Example:
+        @bp.route('/orders', methods=['POST'])
+        @token_required
+        @idempotent
+        def create_order():
+            ...
+    """
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def decorated_async(*args: Any, **kwargs: Any) -> Any:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            manager = current_app.extensions.get("idempotency")
+            if not key or manager is None:
+                return await func(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return _error("Invalid Idempotency-Key", 400)
+
+            async def view() -> Response:
+                return current_app.make_response(await func(*args, **kwargs))
+
+            return await manager.handle_async(
+                f"{_scope()}|{request.endpoint}|{key}", _fingerprint(), view
+            )
+
+        return decorated_async
+
+    @wraps(func)
+    def decorated(*args: Any, **kwargs: Any) -> Any:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        manager = current_app.extensions.get("idempotency")
+        if not key or manager is None:
+            return func(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error("Invalid Idempotency-Key", 400)
+
+        return manager.handle(
+            f"{_scope()}|{request.endpoint}|{key}",
+            _fingerprint(),
+            lambda: current_app.make_response(func(*args, **kwargs)),
+        )
+
+    return decorated
+
+
+def init_idempotency(app: Flask) -> None:
+    """
+    Creates the idempotency store from the IDEMPOTENCY_* settings.
+
+    With IDEMPOTENCY_ENABLED off, @idempotent views run without
+    deduplication.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("IDEMPOTENCY_ENABLED"):
+        return
+
+    store = IdempotencyStore(
+        app.config.get("IDEMPOTENCY_PATH", "/tmp/idempotency.sqlite3"),
+        ttl=app.config.get("IDEMPOTENCY_TTL", 86400.0),
+        lock_timeout=app.config.get("IDEMPOTENCY_LOCK_TIMEOUT", 60.0),
+        max_entries=app.config.get("IDEMPOTENCY_MAX_ENTRIES", 10000),
+    )
+    app.extensions["idempotency"] = IdempotencyManager(
+        store, wait_timeout=app.config.get("IDEMPOTENCY_WAIT_TIMEOUT", 10.0)
+    )
@@ -0,0 +1,52 @@
+import json
+from typing import Dict, Optional
+
+import jwt
+
+from logs import logs_config
+
+
+# Algorithms accepted for kid-indexed verification keys
+ALLOWED_ALGORITHMS = frozenset({"HS256", "EdDSA", "ES256"})
+
+
+def load_verification_keys(path: Optional[str]) -> Dict[str, jwt.PyJWK]:
+    """
+    Loads the JWT verification key table from a JWKS file.
+
+    Every entry is parsed once into a PyJWK (HMAC secret or public key
+    object) and indexed by its 'kid', so verification is a single dict
+    lookup regardless of how many keys are active during a rotation.
+
+    Args:
+        path: Path to a JWKS JSON file ({"keys": [...]}). Empty or None
+            disables kid-based verification.
+
+    Returns:
+        Mapping of key id to parsed PyJWK.
+
+    Raises:
+        ValueError: If the file contains duplicated or missing key ids,
+            or keys for algorithms outside ALLOWED_ALGORITHMS.
+    """
+    if not path:
+        return {}
+
+    with open(path, encoding="utf-8") as jwks_file:
+        jwks = json.load(jwks_file)
+
+    keys: Dict[str, jwt.PyJWK] = {}
+    for entry in jwks.get("keys", []):
+        kid = entry.get("kid")
+        if not kid:
+            raise ValueError("JWKS entry without 'kid'")
+        if kid in keys:
+            raise ValueError(f"Duplicated JWKS kid: {kid}")
+
+        jwk = jwt.PyJWK(entry)
+        if jwk.algorithm_name not in ALLOWED_ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm for kid {kid}: {jwk.algorithm_name}")
+        keys[kid] = jwk
+
+    logs_config.logger.info(f"Loaded {len(keys)} JWT verification keys")
+    return keys
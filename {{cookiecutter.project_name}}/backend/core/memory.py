@@ -0,0 +1,163 @@
+import os
+import threading
+import tracemalloc
+from typing import Callable, Optional
+
+from core.metrics import metrics
+from logs import logs_config
+
+
+MB = 1024 * 1024
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class MemoryMonitor:
+    """
+    Per-worker memory telemetry deciding when the worker should be recycled.
+
+    after_request() is called by gunicorn's post_request hook, once the
+    response has been sent; RSS is sampled every check_every requests.
+    The worker is recycled when:
+    - its RSS is over max_rss, or
+    - it keeps growing: the baseline RSS is taken after warmup_requests
+      (caches and lazy imports filled) and, once as many requests again
+      have run, growth over max_growth_per_1k bytes per 1000 requests
+      recycles it
+
+    Memory is logged every log_every requests and on recycle. With
+    tracemalloc_top > 0, tracemalloc runs in the worker and those logs
+    include the top allocation sites (growth since the baseline once it
+    exists). tracemalloc slows allocations down noticeably: enable it to
+    investigate a leak, not permanently.
+    """
+
+    def __init__(
+        self,
+        max_rss: int,
+        max_growth_per_1k: int = 0,
+        warmup_requests: int = 100,
+        check_every: int = 10,
+        log_every: int = 1000,
+        tracemalloc_top: int = 0,
+        rss: Callable[[], int] = current_rss,
+    ) -> None:
+        self.max_rss = max_rss
+        self.max_growth_per_1k = max_growth_per_1k
+        self.warmup_requests = warmup_requests
+        self.check_every = max(check_every, 1)
+        self.log_every = log_every
+        self.tracemalloc_top = tracemalloc_top
+        self.rss = rss
+        self.requests = 0
+        self.baseline: Optional[int] = None
+        self.baseline_requests = 0
+        self.recycling = False
+        self._baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+        if tracemalloc_top and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _recycle_reason(self, rss: int, requests: int) -> Optional[str]:
+        if self.max_rss and rss > self.max_rss:
+            return f"rss {rss / MB:.0f} MB over {self.max_rss / MB:.0f} MB"
+        if not self.max_growth_per_1k or self.baseline is None:
+            return None
+        measured = requests - self.baseline_requests
+        if measured < self.warmup_requests:
+            return None
+        growth_per_1k = (rss - self.baseline) * 1000 / measured
+        if growth_per_1k > self.max_growth_per_1k:
+            return (
+                f"rss grew {growth_per_1k / MB:.1f} MB per 1000 requests "
+                f"(limit {self.max_growth_per_1k / MB:.1f} MB)"
+            )
+        return None
+
+    def after_request(self) -> Optional[str]:
+        """
+        Counts a finished request and samples memory when due.
+
+        Returns:
+            The reason to recycle the worker (only once), otherwise None
+        """
+        with self._lock:
+            self.requests += 1
+            requests = self.requests
+            due_log = self.log_every and requests % self.log_every == 0
+            if self.recycling or (requests % self.check_every and not due_log):
+                return None
+
+            rss = self.rss()
+            if not rss:
+                return None
+            if self.baseline is None and requests >= self.warmup_requests:
+                self.baseline, self.baseline_requests = rss, requests
+                if tracemalloc.is_tracing():
+                    self._baseline_snapshot = tracemalloc.take_snapshot()
+
+            reason = self._recycle_reason(rss, requests)
+            self.recycling = reason is not None
+
+        if reason is not None:
+            metrics.increment("worker_recycled", "memory")
+            logs_config.logger.warning(f"Recycling worker {os.getpid()}: {reason}")
+        if reason is not None or due_log:
+            self.log(rss, requests)
+        return reason
+
+    def log(self, rss: int, requests: int) -> None:
+        """Logs the worker memory and, with tracemalloc, its top allocation sites."""
+        baseline = f"{self.baseline / MB:.1f} MB" if self.baseline is not None else "pending"
+        logs_config.logger.info(
+            f"Worker {os.getpid()} memory: rss={rss / MB:.1f} MB baseline={baseline} "
+            f"requests={requests}"
+        )
+        if self.tracemalloc_top and tracemalloc.is_tracing():
+            logs_config.logger.info(
+                f"Worker {os.getpid()} top allocations:\n{self.top_allocations()}"
+            )
+
+    def top_allocations(self) -> str:
+        """Formats the top allocation sites, as growth since the baseline when taken."""
+        ignored = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+        snapshot = tracemalloc.take_snapshot().filter_traces(ignored)
+        if self._baseline_snapshot is not None:
+            stats = snapshot.compare_to(self._baseline_snapshot.filter_traces(ignored), "lineno")
+        else:
+            stats = snapshot.statistics("lineno")
+        return "\n".join(str(stat) for stat in stats[:self.tracemalloc_top])
+
+
+def build_memory_monitor(config) -> Optional[MemoryMonitor]:
+    """
+    Creates a MemoryMonitor from the MEMORY_* settings.
+
+    Returns None when neither recycling nor telemetry is enabled, or
+    when RSS cannot be read (no /proc).
+    """
+    if not (config.MEMORY_MAX_RSS_MB or config.MEMORY_MAX_GROWTH_MB_PER_1K
+            or config.MEMORY_LOG_EVERY or config.MEMORY_TRACEMALLOC_TOP):
+        return None
+    if not current_rss():
+        logs_config.logger.warning("Memory monitor disabled: RSS is not readable from /proc")
+        return None
+    return MemoryMonitor(
+        max_rss=int(config.MEMORY_MAX_RSS_MB * MB),
+        max_growth_per_1k=int(config.MEMORY_MAX_GROWTH_MB_PER_1K * MB),
+        warmup_requests=config.MEMORY_WARMUP_REQUESTS,
+        check_every=config.MEMORY_CHECK_EVERY,
+        log_every=config.MEMORY_LOG_EVERY,
+        tracemalloc_top=config.MEMORY_TRACEMALLOC_TOP,
+    )
@@ -0,0 +1,46 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry (one per worker process).
+
+    Counters count events by label (e.g. slow requests by endpoint) and
+    timers keep count/total/max of observed durations by label. Values
+    are per worker; they are exposed through the protected /metrics route.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+        self._timers: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+
+    def increment(self, name: str, label: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name][label] += amount
+
+    def observe(self, name: str, label: str, seconds: float) -> None:
+        with self._lock:
+            timer = self._timers[name].get(label)
+            if timer is None:
+                timer = self._timers[name][label] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            elapsed_ms = seconds * 1000
+            timer["count"] += 1
+            timer["total_ms"] += elapsed_ms
+            timer["max_ms"] = max(timer["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a JSON serializable copy of all metrics."""
+        with self._lock:
+            counters = {name: dict(values) for name, values in self._counters.items()}
+            timers = {
+                name: {label: dict(timer) for label, timer in labels.items()}
+                for name, labels in self._timers.items()
+            }
+        return {"counters": counters, "timers": timers}
+
+
+# Worker-wide registry
+metrics = MetricsRegistry()
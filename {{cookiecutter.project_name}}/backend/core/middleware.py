@@ -1,9 +1,13 @@
+import inspect
 import jwt
-from flask import request, jsonify
+from flask import g, request, jsonify
 from functools import wraps
 from typing import Optional, Tuple, Any, Callable
 
 from core.config import APP_CONFIG
+from core.keys import load_verification_keys
+from core.ratelimit import enforce_rate_limit
+from core.timing import phase
 from logs import logs_config
 
 
@@ -19,6 +23,10 @@ ERROR_MESSAGES = {
     'server_error': 'Authentication error'
 }
 
+# Kid-indexed verification keys and extra API keys, parsed once at startup
+VERIFICATION_KEYS = load_verification_keys(APP_CONFIG.JWT_JWKS_FILE)
+ACCEPTED_API_KEYS = APP_CONFIG.TOKEN_API_KEYS
+
 
 def _extract_token(auth_header: str) -> Optional[str]:
     """
@@ -40,22 +48,53 @@ def _extract_token(auth_header: str) -> Optional[str]:
 
 def _validate_token_as_api_key(token: str) -> bool:
     """
-    Validates token against configured API key (TOKEN_API_KEY).
+    Validates token against configured API keys (TOKEN_API_KEY).
     
     This implements the API key validation where the bearer token
-    must match the shared TOKEN_API_KEY configuration.
+    must match the shared TOKEN_API_KEY configuration, or one of the
+    TOKEN_API_KEYS accepted while keys are being rotated.
     
     Args:
         token: Token to validate as API key
         
     Returns:
-        True if token matches the configured API key
+        True if token matches a configured API key
     """
+    if token in ACCEPTED_API_KEYS:
+        return True
     if not APP_CONFIG.TOKEN_API_KEY:
         return False
     return token == APP_CONFIG.TOKEN_API_KEY
 
 
+def _resolve_verification_key(token: str) -> Tuple[Any, str]:
+    """
+    Selects the verification key and algorithm for a token.
+    
+    Tokens carrying a 'kid' header are verified with the matching key
+    from VERIFICATION_KEYS using that key's algorithm only. Tokens
+    without 'kid' fall back to JWT_SECRET_KEY with HS256.
+    
+    Args:
+        token: Encoded JWT
+        
+    Returns:
+        Tuple of (key, algorithm) to use in jwt.decode
+        
+    Raises:
+        jwt.DecodeError: If the token header is malformed
+        jwt.InvalidTokenError: If the 'kid' is not in the key table
+    """
+    kid = jwt.get_unverified_header(token).get('kid')
+    if kid is None:
+        return APP_CONFIG.JWT_SECRET_KEY, EXPECTED_ALGORITHM
+    
+    jwk = VERIFICATION_KEYS.get(kid)
+    if jwk is None:
+        raise jwt.InvalidTokenError("Unknown kid")
+    return jwk.key, jwk.algorithm_name
+
+
 def _log_auth_failure(reason: str, details: str = "") -> None:
     """
     Securely logs authentication failures without exposing sensitive data.
@@ -76,19 +115,114 @@ def _log_auth_failure(reason: str, details: str = "") -> None:
     logs_config.logger.warning(log_message)
 
 
+def _authenticate() -> Optional[Tuple[Any, int]]:
+    """
+    Runs the JWT + API Key checks for the current request.
+    
+    Returns:
+        None when the request is authenticated (and within its rate
+        limit), otherwise the error response tuple to return instead
+        of calling the view
+    """
+    try:
+        # Step 1: Validate Authorization header presence
+        with phase('auth_parse'):
+            auth_header = request.headers.get('Authorization')
+            # Step 2: Extract token safely from header
+            token = _extract_token(auth_header) if auth_header else None
+
+        if not auth_header:
+            _log_auth_failure("Missing Authorization header")
+            return jsonify({'msg': ERROR_MESSAGES['missing_header']}), 401
+
+        if not token:
+            _log_auth_failure("Invalid Authorization header format")
+            return jsonify({'msg': ERROR_MESSAGES['invalid_format']}), 401
+
+        # Step 3: Validate token as API key
+        # This ensures the bearer token matches the shared API key
+        with phase('auth_apikey'):
+            is_api_key = _validate_token_as_api_key(token)
+        if not is_api_key:
+            _log_auth_failure("Invalid API key")
+            return jsonify({'msg': ERROR_MESSAGES['access_denied']}), 403
+
+        # Step 4: Decode and validate JWT structure and signature
+        # The same token that serves as API key must also be a valid JWT
+        with phase('auth_jwt'):
+            verification_key, algorithm = _resolve_verification_key(token)
+            decoded_token = jwt.decode(
+                token, 
+                verification_key, 
+                algorithms=[algorithm],
+                options={
+                    "verify_signature": True,    # Verify JWT signature
+                    "verify_exp": False,         # API keys don't expire
+                    "verify_iat": True,          # Verify issued at time
+                    "require": ["sub", "iss", "iat", "type"]  # Required JWT fields
+                }
+            )
+        
+        # Step 5: Authentication successful - expose the principal and
+        # apply its rate limit (keyed by the key's jti, or sub)
+        g.jwt_claims = decoded_token
+        g.principal = decoded_token.get('jti') or decoded_token['sub']
+        return enforce_rate_limit(f"key:{g.principal}")
+
+    except jwt.InvalidSignatureError:
+        # JWT signature verification failed
+        _log_auth_failure("Invalid JWT signature")
+        return jsonify({'msg': ERROR_MESSAGES['invalid_token']}), 403
+        
+    except jwt.DecodeError:
+        # JWT structure is malformed
+        _log_auth_failure("JWT decode error")
+        return jsonify({'msg': ERROR_MESSAGES['invalid_token']}), 403
+        
+    except jwt.InvalidTokenError as e:
+        # Other JWT validation errors
+        _log_auth_failure("Invalid JWT token", str(e))
+        return jsonify({'msg': ERROR_MESSAGES['invalid_token']}), 403
+        
+    except Exception as error:
+        # Unexpected errors - log for debugging but don't expose details
+        logs_config.logger.error(
+            f"Unexpected authentication error: {type(error).__name__}: {str(error)}"
+        )
+        return jsonify({'msg': ERROR_MESSAGES['server_error']}), 500
+
+
+def _authenticate_or_limit() -> Optional[Tuple[Any, int]]:
+    """
+    Authenticates the request, rate limiting failed attempts by client IP.
+
+    A request whose token does not resolve to a principal (missing,
+    malformed or invalid) is counted against the IP bucket, so
+    unauthenticated traffic on protected routes is limited too.
+    """
+    error_response = _authenticate()
+    if error_response is None or 'principal' in g:
+        return error_response
+    return enforce_rate_limit(f"ip:{request.remote_addr}") or error_response
+
+
 def token_required(func: Callable) -> Callable:
     """
     Decorator that enforces JWT + API Key authentication.
     
     This implements a hybrid authentication system:
     1. Bearer token must match the configured API key (TOKEN_API_KEY)
-    2. Same token must be a valid JWT signed with JWT_SECRET_KEY
+    2. Same token must be a valid JWT signed with JWT_SECRET_KEY, or with
+       the key selected by its 'kid' header from VERIFICATION_KEYS
     3. JWT payload is validated for 'sub' and 'iss' if configured
+    4. The authenticated principal is rate limited (core/ratelimit.py);
+       failed authentications are limited by client IP
     
     Authentication flow:
     - Extract Bearer token from Authorization header
     - Validate token as API key against TOKEN_API_KEY
-    - Decode token as JWT using JWT_SECRET_KEY for signature verification
+    - Select verification key by 'kid' (fallback: JWT_SECRET_KEY)
+    - Decode token as JWT verifying the signature with that key
     - Validate JWT payload fields (sub, iss) if configured
     
     Security features:
@@ -97,70 +231,32 @@ def token_required(func: Callable) -> Callable:
     - Comprehensive JWT validation options
     - Separation of API key and JWT validation logic
     
+    Works on both regular and async def views; errors raised by the view
+    itself are not treated as authentication errors.
+    
     Args:
         func: Function to protect with authentication
         
     Returns:
         Decorated function with JWT + API Key validation
     """
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def decorated_async(*args, **kwargs) -> Tuple[Any, int]:
+            error_response = _authenticate_or_limit()
+            if error_response is not None:
+                return error_response
+            return await func(*args, **kwargs)
+
+        decorated_async.auth_required = True
+        return decorated_async
+
     @wraps(func)
     def decorated(*args, **kwargs) -> Tuple[Any, int]:
-        try:
-            # Step 1: Validate Authorization header presence
-            auth_header = request.headers.get('Authorization')
-            if not auth_header:
-                _log_auth_failure("Missing Authorization header")
-                return jsonify({'msg': ERROR_MESSAGES['missing_header']}), 401
-
-            # Step 2: Extract token safely from header
-            token = _extract_token(auth_header)
-            if not token:
-                _log_auth_failure("Invalid Authorization header format")
-                return jsonify({'msg': ERROR_MESSAGES['invalid_format']}), 401
-
-            # Step 3: Validate token as API key
-            # This ensures the bearer token matches the shared API key
-            if not _validate_token_as_api_key(token):
-                _log_auth_failure("Invalid API key")
-                return jsonify({'msg': ERROR_MESSAGES['access_denied']}), 403
-
-            # Step 4: Decode and validate JWT structure and signature
-            # The same token that serves as API key must also be a valid JWT
-            decoded_token = jwt.decode(
-                token, 
-                APP_CONFIG.JWT_SECRET_KEY, 
-                algorithms=[EXPECTED_ALGORITHM],
-                options={
-                    "verify_signature": True,    # Verify JWT signature
-                    "verify_exp": False,         # API keys don't expire
-                    "verify_iat": True,          # Verify issued at time
-                    "require": ["sub", "iss", "iat", "type"]  # Required JWT fields
-                }
-            )
-            
-            # Step 5: Authentication successful - proceed with original function
-            return func(*args, **kwargs)
-
-        except jwt.InvalidSignatureError:
-            # JWT signature verification failed
-            _log_auth_failure("Invalid JWT signature")
-            return jsonify({'msg': ERROR_MESSAGES['invalid_token']}), 403
-            
-        except jwt.DecodeError:
-            # JWT structure is malformed
-            _log_auth_failure("JWT decode error")
-            return jsonify({'msg': ERROR_MESSAGES['invalid_token']}), 403
-            
-        except jwt.InvalidTokenError as e:
-            # Other JWT validation errors
-            _log_auth_failure("Invalid JWT token", str(e))
-            return jsonify({'msg': ERROR_MESSAGES['invalid_token']}), 403
-            
-        except Exception as error:
-            # Unexpected errors - log for debugging but don't expose details
-            logs_config.logger.error(
-                f"Unexpected authentication error: {type(error).__name__}: {str(error)}"
-            )
-            return jsonify({'msg': ERROR_MESSAGES['server_error']}), 500
+        error_response = _authenticate_or_limit()
+        if error_response is not None:
+            return error_response
+        return func(*args, **kwargs)
 
+    decorated.auth_required = True
     return decorated
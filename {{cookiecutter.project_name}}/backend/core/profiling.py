@@ -0,0 +1,154 @@
+import cProfile
+import hmac
+import os
+import random
+import threading
+import time
+from typing import Optional, Tuple
+
+from flask import Flask, g, request
+
+from logs import logs_config
+
+
+PROFILE_HEADER = "X-Profile-Token"
+
+
+class RequestProfiler:
+    """
+    Per-worker limiter and writer for on-demand request profiles.
+
+    Only one request is profiled at a time (cProfile hooks are process
+    wide on recent Python versions), with a minimum interval between
+    profiles and a hard cap per worker process.
+    """
+
+    def __init__(self, output_dir: str, max_profiles: int, min_interval: float) -> None:
+        self.output_dir = output_dir
+        self.max_profiles = max_profiles
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._active = False
+        self._taken = 0
+        self._last_started = float("-inf")
+        self._previous_started = self._last_started
+
+    def try_acquire(self) -> bool:
+        """Reserves the profiling slot if limits allow another profile."""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._active
+                or self._taken >= self.max_profiles
+                or now - self._last_started < self.min_interval
+            ):
+                return False
+            self._active = True
+            self._taken += 1
+            self._previous_started, self._last_started = self._last_started, now
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = False
+
+    def cancel(self) -> None:
+        """Releases a slot whose profiler never started, without counting it."""
+        with self._lock:
+            self._active = False
+            self._taken -= 1
+            self._last_started = self._previous_started
+
+    def write(self, profiler: cProfile.Profile, request_id: str) -> str:
+        """Writes the profile as pstats named after the request id."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{request_id}.pstats")
+        profiler.dump_stats(path)
+        return path
+
+
+def _profiling_reason(config: dict) -> Optional[str]:
+    """
+    Decides whether the current request should be profiled.
+
+    Returns:
+        'header' for an authorized explicit request, 'sampled' for a
+        sampled path, or None.
+    """
+    token = config.get("PROFILING_TOKEN")
+    header_value = request.headers.get(PROFILE_HEADER)
+    # Compared as bytes: compare_digest raises TypeError on non-ASCII str
+    # and header values are decoded as latin-1
+    if token and header_value and hmac.compare_digest(
+        header_value.encode("utf-8", "surrogateescape"), token.encode()
+    ):
+        return "header"
+
+    sample_rate = config.get("PROFILING_SAMPLE_RATE", 0.0)
+    paths: Tuple[str, ...] = config.get("PROFILING_PATHS", ())
+    if sample_rate > 0 and request.path.startswith(paths) and random.random() < sample_rate:
+        return "sampled"
+
+    return None
+
+
+def init_profiling(app: Flask) -> None:
+    """
+    Enables opt-in per-request profiling.
+
+    A request is profiled with cProfile when it carries the
+    X-Profile-Token header matching PROFILING_TOKEN, or when its path
+    starts with one of PROFILING_PATHS and is picked at
+    PROFILING_SAMPLE_RATE. The profile is written to PROFILING_DIR as
+    '<request_id>.pstats' (inspect with 'python -m pstats' or snakeviz).
+
+    Must be registered after the request logging hook so g.request_id
+    is set when profiling starts.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    profiles = RequestProfiler(
+        output_dir=app.config["PROFILING_DIR"],
+        max_profiles=app.config.get("PROFILING_MAX_PER_WORKER", 20),
+        min_interval=app.config.get("PROFILING_MIN_INTERVAL", 60.0),
+    )
+    app.extensions["request_profiler"] = profiles
+
+    @app.before_request
+    def start_profiling():
+        reason = _profiling_reason(app.config)
+        if reason is None or not profiles.try_acquire():
+            return
+
+        g.profiler = cProfile.Profile()
+        g.profile_reason = reason
+        try:
+            g.profiler.enable()
+        except ValueError as exc:
+            # Another profiler (e.g. a debugger or Sentry profiling) is active
+            g.pop("profiler")
+            profiles.cancel()
+            logs_config.logger.warning(f"Request profiling unavailable: {exc}")
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return
+
+        profiler.disable()
+        try:
+            request_id = g.get("request_id", "unknown")
+            path = profiles.write(profiler, request_id)
+            logs_config.logger.info(
+                f"Request profile written: request_id={request_id} "
+                f"reason={g.get('profile_reason')} path={path}"
+            )
+        except OSError as error:
+            logs_config.logger.error(f"Failed to write request profile: {error}")
+        finally:
+            profiles.release()
@@ -0,0 +1,252 @@
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from flask import Flask, current_app, g, jsonify, request
+
+
+# Bucket slot: key hash, tokens left, last refill (unix time)
+_SLOT = struct.Struct("<Qdd")
+# Slots probed for a key before evicting the least recently used one
+_PROBES = 8
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit(NamedTuple):
+    """Token bucket limit: 'burst' tokens, refilled at 'rate' per second."""
+    rate: float
+    burst: int
+    text: str
+
+
+def parse_limit(text: str, burst: Optional[int] = None) -> RateLimit:
+    """
+    Parses '<count>/<second|minute|hour|day>' (e.g. '100/minute').
+
+    burst defaults to count: the whole quota may be spent at once.
+
+    Raises:
+        ValueError: If the limit is malformed
+    """
+    count, _, period = text.partition("/")
+    seconds = _PERIODS.get(period.strip().rstrip("s"))
+    if seconds is None or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit: {text!r}")
+    return RateLimit(int(count) / seconds, burst or int(count), text)
+
+
+class SharedTokenBuckets:
+    """
+    Token buckets shared by all worker processes on the host.
+
+    Buckets live in a fixed-size open addressing table in a memory-mapped
+    file (/dev/shm when available), so every gunicorn worker sees the same
+    counters without Redis. Updates take a thread lock plus an fcntl lock
+    on the file; a check is a hash, two lock calls and a few struct reads,
+    in the order of microseconds.
+
+    When all probed slots for a key are taken, the least recently used one
+    is reused: under table pressure a bucket can be reset to full, never
+    wrongly emptied.
+    """
+
+    def __init__(self, path: str, slots: int) -> None:
+        self.path = path
+        self.slots = slots
+        size = slots * _SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size != size:
+            os.ftruncate(fd, size)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _find_slot(self, key_hash: int) -> int:
+        start = key_hash % self.slots
+        oldest_index, oldest_last = start, math.inf
+        for probe in range(_PROBES):
+            index = (start + probe) % self.slots
+            stored_hash, _, last = _SLOT.unpack_from(self._map, index * _SLOT.size)
+            if stored_hash in (key_hash, 0):
+                return index
+            if last < oldest_last:
+                oldest_index, oldest_last = index, last
+        return oldest_index
+
+    def take(self, key: str, limit: RateLimit, cost: int = 1) -> Tuple[bool, float, float]:
+        """
+        Takes 'cost' tokens from the key's bucket if available.
+
+        Returns:
+            Tuple of (allowed, tokens left, seconds until the bucket is full)
+        """
+        key_hash = self._hash(key)
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                offset = self._find_slot(key_hash) * _SLOT.size
+                stored_hash, tokens, last = _SLOT.unpack_from(self._map, offset)
+                if stored_hash != key_hash:
+                    tokens, last = limit.burst, now
+                tokens = min(limit.burst, tokens + max(now - last, 0) * limit.rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                _SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        return allowed, tokens, (limit.burst - tokens) / limit.rate
+
+
+def rate_limit(limit: str, burst: Optional[int] = None) -> Callable:
+    """
+    Sets a per-route limit on a view, with its own bucket per client.
+
+    Works above or below token_required (wraps copies the attribute).
+
+    Example:
+        @bp.route('/reports', methods=['POST'])
+        @token_required
+        @rate_limit('10/minute', burst=3)
+        def create_report():
+            ...
+    """
+    parsed = parse_limit(limit, burst)
+
+    def decorator(func: Callable) -> Callable:
+        func.rate_limit = parsed
+        return func
+
+    return decorator
+
+
+class RateLimiter:
+    """
+    Resolves the limit for the current route and applies it.
+
+    The limit comes from the view's @rate_limit, then RATE_LIMIT_ROUTES
+    (endpoint -> limit) and finally RATE_LIMIT_DEFAULT. Route limits have
+    a bucket per route and client; the default limit has one bucket per
+    client shared by all routes without their own limit.
+    """
+
+    def __init__(self, buckets: SharedTokenBuckets, default: Optional[RateLimit],
+                 routes: Dict[str, RateLimit]) -> None:
+        self.buckets = buckets
+        self.default = default
+        self.routes = routes
+
+    def _route_limit(self) -> Tuple[Optional[RateLimit], str]:
+        view = current_app.view_functions.get(request.endpoint)
+        limit = getattr(view, "rate_limit", None) or self.routes.get(request.endpoint)
+        if limit is not None:
+            return limit, request.endpoint
+        return self.default, "*"
+
+    def check(self, client: str) -> Optional[Tuple[object, int]]:
+        """
+        Takes a token for the client on the current route.
+
+        Returns:
+            None if allowed, otherwise the 429 response tuple
+        """
+        limit, scope = self._route_limit()
+        if limit is None:
+            return None
+
+        allowed, tokens, reset = self.buckets.take(f"{scope}|{client}", limit)
+        g.rate_limit_headers = {
+            "RateLimit-Limit": str(limit.burst),
+            "RateLimit-Remaining": str(int(tokens)),
+            "RateLimit-Reset": str(math.ceil(reset)),
+        }
+        if allowed:
+            return None
+
+        retry_after = math.ceil((1 - tokens) / limit.rate)
+        g.rate_limit_headers["Retry-After"] = str(retry_after)
+        return jsonify({'msg': 'Too many requests'}), 429
+
+
+def enforce_rate_limit(client: str) -> Optional[Tuple[object, int]]:
+    """
+    Applies the current route's limit to a client key.
+
+    Called by token_required with the authenticated principal, or with
+    the client IP when authentication fails; a no-op when rate limiting
+    is disabled.
+    """
+    limiter = current_app.extensions.get("rate_limiter")
+    if limiter is None:
+        return None
+    return limiter.check(client)
+
+
+def _default_path(app: Flask) -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    # One table per deployed project, shared by its workers
+    suffix = hashlib.sha1(app.root_path.encode()).hexdigest()[:12]
+    return os.path.join(directory, f"ratelimit-{suffix}")
+
+
+def init_rate_limiting(app: Flask) -> None:
+    """
+    Creates the shared buckets and the hooks for unauthenticated routes.
+
+    Views protected by token_required are limited per principal (the
+    key's jti, or sub) once authenticated, and per client IP when the
+    token is missing or invalid; every other route is limited per
+    client IP (request.remote_addr, so behind a proxy configure
+    werkzeug's ProxyFix). Responses carry RateLimit-* headers and
+    rejected ones are 429 with Retry-After.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("RATE_LIMIT_ENABLED"):
+        return
+
+    default = app.config.get("RATE_LIMIT_DEFAULT")
+    routes = json.loads(app.config.get("RATE_LIMIT_ROUTES") or "{}")
+    limiter = RateLimiter(
+        SharedTokenBuckets(
+            app.config.get("RATE_LIMIT_PATH") or _default_path(app),
+            app.config.get("RATE_LIMIT_SLOTS", 65536),
+        ),
+        default=parse_limit(default) if default else None,
+        routes={endpoint: parse_limit(limit) for endpoint, limit in routes.items()},
+    )
+    app.extensions["rate_limiter"] = limiter
+    exempt_paths = frozenset(app.config.get("RATE_LIMIT_EXEMPT_PATHS", ("/health",)))
+
+    @app.before_request
+    def limit_by_client_ip():
+        if request.path in exempt_paths:
+            return None
+        view = app.view_functions.get(request.endpoint)
+        if getattr(view, "auth_required", False):
+            # token_required limits by principal, or by IP if auth fails
+            return None
+        return limiter.check(f"ip:{request.remote_addr}")
+
+    @app.after_request
+    def add_rate_limit_headers(response):
+        headers = g.pop("rate_limit_headers", None)
+        if headers:
+            response.headers.update(headers)
+        return response
@@ -0,0 +1,225 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from flask import Flask, g, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map
+
+
+class RouteHealth:
+    """
+    Remembers which routes were recently slow or failing.
+
+    Routes are keyed by their URL rule ('/items/<int:item_id>'), so one
+    slow request makes every path of the route hot. A route is 'hot' for
+    'window' seconds after a response slower than slow_threshold or with
+    a 5xx status. Keeps at most max_paths entries (least recently flagged
+    evicted first).
+    """
+
+    def __init__(self, slow_threshold: float, window: float, max_paths: int = 1024) -> None:
+        self.slow_threshold = slow_threshold
+        self.window = window
+        self.max_paths = max_paths
+        self._hot_until: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, rule: str, duration: float, status_code: int) -> None:
+        if duration < self.slow_threshold and status_code < 500:
+            return
+        with self._lock:
+            self._hot_until[rule] = time.monotonic() + self.window
+            self._hot_until.move_to_end(rule)
+            while len(self._hot_until) > self.max_paths:
+                self._hot_until.popitem(last=False)
+
+    def is_hot(self, rule: str) -> bool:
+        hot_until = self._hot_until.get(rule)
+        return hot_until is not None and hot_until > time.monotonic()
+
+    def is_empty(self) -> bool:
+        return not self._hot_until
+
+
+class TraceBudget:
+    """
+    Per-worker token bucket capping sampled transactions per second.
+
+    The bucket holds at least one token, so rates below 1 per second
+    still sample (one transaction every 1 / per_second seconds).
+    """
+
+    def __init__(self, per_second: float) -> None:
+        self.per_second = per_second
+        self.capacity = max(per_second, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.per_second)
+            self._last = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class TracesSampler:
+    """
+    Sentry traces_sampler deciding per request path.
+
+    In order:
+    - ignored paths (health checks, metrics) are never sampled
+    - a sampling decision propagated by an upstream service is kept
+    - routes recently slow or failing (RouteHealth) are always sampled;
+      the request path is resolved to its URL rule with the app's url_map
+    - otherwise the longest matching prefix in route_rates gives the rate,
+      falling back to default_rate
+
+    Positive decisions are then capped by a per-second budget, so a
+    traffic spike cannot multiply the tracing overhead and quota usage.
+    The sampler draws the random number itself and returns 0 or 1, as the
+    budget must only be spent on transactions that are kept.
+    """
+
+    def __init__(
+        self,
+        default_rate: float,
+        route_rates: Dict[str, float],
+        ignored_paths: Iterable[str],
+        health: RouteHealth,
+        budget: Optional[TraceBudget],
+        base_url: str = "",
+    ) -> None:
+        self.default_rate = default_rate
+        # Longest prefix first
+        self.route_rates = sorted(route_rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self.ignored_paths = frozenset(ignored_paths)
+        self.health = health
+        self.budget = budget
+        self.base_url = base_url.rstrip("/")
+        # Set by init_trace_sampling once the app exists
+        self.url_map: Optional[Map] = None
+
+    def rule_for(self, environ: Dict[str, Any]) -> Optional[str]:
+        """URL rule matching the request, or None (no url_map or no match)."""
+        if self.url_map is None:
+            return None
+        path = environ.get("PATH_INFO", "")
+        # The sampler sees the request before the API_BASE_URL dispatcher
+        if self.base_url and path.startswith(self.base_url + "/"):
+            environ = dict(
+                environ,
+                SCRIPT_NAME=environ.get("SCRIPT_NAME", "") + self.base_url,
+                PATH_INFO=path[len(self.base_url):],
+            )
+        try:
+            rule, _ = self.url_map.bind_to_environ(environ).match(return_rule=True)
+        except HTTPException:
+            return None
+        return rule.rule
+
+    def _is_hot(self, environ: Dict[str, Any]) -> bool:
+        if self.health.is_empty():
+            return False
+        rule = self.rule_for(environ)
+        return rule is not None and self.health.is_hot(rule)
+
+    def rate_for(self, path: str) -> float:
+        for prefix, rate in self.route_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.default_rate
+
+    def __call__(self, sampling_context: Dict[str, Any]) -> float:
+        environ = sampling_context.get("wsgi_environ", {})
+        path = environ.get("PATH_INFO", "")
+        if path in self.ignored_paths:
+            return 0.0
+
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return 1.0 if parent_sampled else 0.0
+
+        if not self._is_hot(environ) and random.random() >= self.rate_for(path):
+            return 0.0
+        if self.budget is not None and not self.budget.take():
+            return 0.0
+        return 1.0
+
+
+# Sampler installed by init_sentry, fed by init_trace_sampling
+_active_sampler: Optional[TracesSampler] = None
+
+
+def build_traces_sampler(
+    default_rate: float,
+    route_rates: Dict[str, float],
+    ignored_paths: Iterable[str],
+    slow_threshold: float,
+    hot_window: float,
+    max_per_second: float,
+    base_url: str = "",
+) -> TracesSampler:
+    """
+    Creates the process-wide TracesSampler.
+
+    Paths (ignored and per-route) are matched with and without the
+    API_BASE_URL prefix, as the sampler sees the full request path.
+    """
+    global _active_sampler
+    base_url = base_url.rstrip("/")
+    prefixed_rates = {}
+    for path, rate in route_rates.items():
+        prefixed_rates[path] = rate
+        prefixed_rates[base_url + path] = rate
+    ignored = set()
+    for path in ignored_paths:
+        ignored.update((path, base_url + path))
+
+    _active_sampler = TracesSampler(
+        default_rate,
+        prefixed_rates,
+        ignored,
+        RouteHealth(slow_threshold, hot_window),
+        TraceBudget(max_per_second) if max_per_second > 0 else None,
+        base_url,
+    )
+    return _active_sampler
+
+
+def init_trace_sampling(app: Flask) -> None:
+    """
+    Feeds response durations and statuses to the active sampler, keyed
+    by the URL rule of the request, and gives it the app's url_map to
+    resolve incoming paths to those rules.
+
+    No-op when Sentry is not initialized with the adaptive sampler.
+
+    Args:
+        app: Flask application instance
+    """
+    sampler = _active_sampler
+    if sampler is None:
+        return
+    sampler.url_map = app.url_map
+
+    @app.before_request
+    def start_sampling_timer():
+        g.sampling_start = time.perf_counter()
+
+    @app.after_request
+    def record_route_health(response):
+        start = g.get("sampling_start")
+        # Unmatched paths (404/405) have no rule to flag
+        if start is not None and request.url_rule is not None:
+            sampler.health.record(
+                request.url_rule.rule, time.perf_counter() - start, response.status_code
+            )
+        return response
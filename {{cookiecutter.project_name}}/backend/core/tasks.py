@@ -0,0 +1,277 @@
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Optional, Set
+
+from flask import Flask, current_app, g, has_app_context
+
+from core.metrics import metrics
+from logs import logs_config
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+# Queue policy -> metrics label for tasks it applies to
+QUEUE_POLICIES = {"reject": "rejected", "caller_runs": "caller_runs", "drop": "dropped"}
+
+# Executors of this process, drained by drain_executors() on worker exit
+_executors: "weakref.WeakSet[TaskExecutor]" = weakref.WeakSet()
+
+
+class TaskRejected(RuntimeError):
+    """Raised by submit() when the queue is full and the policy is 'reject'."""
+
+
+def _task_name(func: Callable) -> str:
+    return f"{func.__module__}.{getattr(func, '__qualname__', repr(func))}"
+
+
+def _run_now(func: Callable, *args: Any) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as error:
+        future.set_exception(error)
+    return future
+
+
+class TaskExecutor:
+    """
+    In-process executor for work that does not need to delay the response.
+
+    Tasks run on a bounded thread pool (one per worker process, created
+    lazily after gunicorn's fork) inside an app context, with g.request_id
+    set to the id of the request that submitted them. CPU-bound functions
+    can go to an optional process pool with submit_process(); those run
+    without app context and must be picklable module-level functions.
+
+    At most max_workers + max_queue tasks are pending; beyond that the
+    queue policy applies:
+    - 'reject': raise TaskRejected
+    - 'caller_runs': run the task in the calling thread (slows the producer)
+    - 'drop': discard the task with a warning
+
+    Tasks are lost if the process dies: use it for best-effort work
+    (audit writes, notifications, cache warming), not for jobs that must
+    survive a crash.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        max_workers: int = 4,
+        max_queue: int = 100,
+        policy: str = "reject",
+        process_workers: int = 0,
+    ) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown task queue policy: {policy}")
+        self.app = app
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.policy = policy
+        self.process_workers = process_workers
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional["ProcessPoolExecutor"] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._pending: Set[Future] = set()
+        self._closed = False
+        _executors.add(self)
+
+    def _ensure_pools(self) -> None:
+        # Pool threads do not survive fork: create the pools per worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._threads = ThreadPoolExecutor(self.max_workers, thread_name_prefix="task")
+            self._processes = None
+            self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+            self._pending = set()
+            self._closed = False
+            self._pid = os.getpid()
+
+    def _process_pool(self) -> "ProcessPoolExecutor":
+        with self._lock:
+            if self._processes is None:
+                # Imported on first use: multiprocessing is slow to import
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # spawn: forking a multithreaded worker can deadlock the child
+                self._processes = ProcessPoolExecutor(
+                    self.process_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._processes
+
+    def _run_in_context(self, func: Callable, args: tuple, kwargs: dict,
+                        request_id: str, submitted: float) -> Any:
+        name = _task_name(func)
+        metrics.observe("task_wait", name, time.monotonic() - submitted)
+        start = time.monotonic()
+        with self.app.app_context():
+            g.request_id = request_id
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                metrics.increment("tasks", "failed")
+                logs_config.logger.error(
+                    f"Background task failed: request_id={request_id} task={name} "
+                    f"{type(error).__name__}: {error}"
+                )
+                raise
+            finally:
+                metrics.observe("task_duration", name, time.monotonic() - start)
+        metrics.increment("tasks", "completed")
+        return result
+
+    def _acquire_slot(self, func: Callable) -> bool:
+        if self._closed:
+            raise TaskRejected("Task executor is shutting down")
+        if self._slots.acquire(blocking=False):
+            return True
+        metrics.increment("tasks", QUEUE_POLICIES[self.policy])
+        if self.policy == "reject":
+            raise TaskRejected(f"Task queue full ({self.max_workers + self.max_queue} pending)")
+        if self.policy == "drop":
+            logs_config.logger.warning(f"Task queue full, dropped task {_task_name(func)}")
+        return False
+
+    def _track(self, future: Future) -> Future:
+        with self._lock:
+            self._pending.add(future)
+
+        def release(done: Future) -> None:
+            with self._lock:
+                self._pending.discard(done)
+            self._slots.release()
+
+        future.add_done_callback(release)
+        return future
+
+    def submit(self, func: Callable, *args: Any, **kwargs: Any) -> Optional[Future]:
+        """
+        Queues func(*args, **kwargs) on the thread pool.
+
+        Returns:
+            Future of the task, or None if it was dropped
+
+        Raises:
+            TaskRejected: If the queue is full and the policy is 'reject'
+        """
+        self._ensure_pools()
+        request_id = g.get("request_id", "unknown") if has_app_context() else "unknown"
+
+        if not self._acquire_slot(func):
+            if self.policy == "caller_runs":
+                return _run_now(self._run_in_context, func, args, kwargs, request_id, time.monotonic())
+            return None
+
+        metrics.increment("tasks", "submitted")
+        return self._track(self._threads.submit(
+            self._run_in_context, func, args, kwargs, request_id, time.monotonic()
+        ))
+
+    def submit_process(self, func: Callable, *args: Any, **kwargs: Any) -> Optional[Future]:
+        """
+        Runs a CPU-bound function on the process pool (no app context).
+
+        Raises:
+            RuntimeError: If TASKS_PROCESS_WORKERS is 0
+            TaskRejected: If the queue is full and the policy is 'reject'
+        """
+        if not self.process_workers:
+            raise RuntimeError("Process pool disabled (TASKS_PROCESS_WORKERS=0)")
+        self._ensure_pools()
+        if not self._acquire_slot(func):
+            if self.policy == "caller_runs":
+                return _run_now(lambda: func(*args, **kwargs))
+            return None
+
+        metrics.increment("tasks", "submitted")
+        return self._track(self._process_pool().submit(func, *args, **kwargs))
+
+    def shutdown(self, timeout: float) -> bool:
+        """
+        Stops accepting tasks and waits for the pending ones.
+
+        Args:
+            timeout: Seconds to wait for queued and running tasks
+
+        Returns:
+            True if every task finished in time.
+        """
+        if self._pid != os.getpid():
+            return True
+        self._closed = True
+        with self._lock:
+            pending = set(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        if not_done:
+            metrics.increment("tasks", "abandoned", len(not_done))
+            logs_config.logger.warning(
+                f"Task executor shutdown: {len(not_done)} tasks unfinished after {timeout:.0f}s"
+            )
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+        return not not_done
+
+
+def drain_executors(timeout: float) -> None:
+    """
+    Drains every executor of this process within 'timeout' seconds.
+
+    Called from gunicorn's worker_exit hook (gunicorn.conf.py).
+    """
+    deadline = time.monotonic() + timeout
+    for executor in list(_executors):
+        executor.shutdown(max(deadline - time.monotonic(), 0))
+
+
+def init_tasks(app: Flask) -> None:
+    """
+    Creates the app's TaskExecutor from the TASKS_* settings.
+
+    Args:
+        app: Flask application instance
+    """
+    app.extensions["task_executor"] = TaskExecutor(
+        app,
+        max_workers=app.config.get("TASKS_MAX_WORKERS", 4),
+        max_queue=app.config.get("TASKS_MAX_QUEUE", 100),
+        policy=app.config.get("TASKS_QUEUE_POLICY", "reject"),
+        process_workers=app.config.get("TASKS_PROCESS_WORKERS", 0),
+    )
+
+
+def background(func: Callable) -> Callable:
+    """
+    Makes calls to func run on the current app's TaskExecutor.
+
+    The call returns a Future immediately (None if the task was dropped);
+    the undecorated function stays available as func.__wrapped__.
+
+    Example:
+        @background
+        def write_audit(user_id, action):
+            db.session.add(AuditLog(user_id=user_id, action=action))
+            db.session.commit()
+
+        write_audit(user.id, 'login')
+
+    Raises:
+        TaskRejected: If the queue is full and the policy is 'reject'
+    """
+    @wraps(func)
+    def submit(*args: Any, **kwargs: Any) -> Optional[Future]:
+        return current_app.extensions["task_executor"].submit(func, *args, **kwargs)
+
+    return submit
@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterator, Optional
+
+from flask import Flask, g, has_request_context
+
+
+def record_phase(name: str, duration_ns: int) -> None:
+    """
+    Adds a phase duration to the current request timings.
+
+    Does nothing outside a request or when phase timing is disabled
+    (g.phase_timings is only created by init_phase_timing hooks).
+    Repeated phases accumulate.
+
+    Args:
+        name: Phase name (Server-Timing metric name, no spaces)
+        duration_ns: Duration in nanoseconds
+    """
+    if not has_request_context():
+        return
+
+    phases = g.get('phase_timings')
+    if phases is not None:
+        phases[name] = phases.get(name, 0) + duration_ns
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Context manager that times a block as a request phase.
+
+    Example:
+        with phase('render'):
+            body = build_body()
+    """
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        record_phase(name, perf_counter_ns() - start)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator that times every call of a function as a request phase.
+
+    Args:
+        name: Phase name
+
+    Returns:
+        Decorator preserving the wrapped function metadata
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_phase(name, perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+
+def timings_ms(phases: Dict[str, int]) -> Dict[str, float]:
+    """Converts phase durations from nanoseconds to rounded milliseconds."""
+    return {name: round(duration / 1_000_000, 3) for name, duration in phases.items()}
+
+
+def snapshot_timings_ms() -> Optional[Dict[str, float]]:
+    """
+    Returns the current request phases plus the elapsed total so far,
+    in milliseconds, or None when phase timing is not active.
+    """
+    phases = g.get('phase_timings')
+    if phases is None:
+        return None
+    return timings_ms({**phases, 'total': perf_counter_ns() - g.request_start_ns})
+
+
+def server_timing_value(phases: Dict[str, int]) -> str:
+    """Formats phase durations as a Server-Timing header value."""
+    return ", ".join(
+        f"{name};dur={duration / 1_000_000:.3f}" for name, duration in phases.items()
+    )
+
+
+class StartupTimings:
+    """
+    Durations of the create_app steps, in the order they ran.
+
+    Stored in app.extensions['startup_timings'] and printed by
+    benchmarks/startup_report.py next to the import times.
+    """
+
+    def __init__(self) -> None:
+        self.steps: Dict[str, int] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Times a block as a startup step (repeated steps accumulate)."""
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0) + perf_counter_ns() - start
+
+    def as_ms(self) -> Dict[str, float]:
+        """Returns the steps plus their total, in milliseconds."""
+        return timings_ms({**self.steps, 'total': sum(self.steps.values())})
+
+
+def init_phase_timing(app: Flask) -> None:
+    """
+    Enables per-request phase timing.
+
+    Must be called before other request hooks are registered, so the
+    timings dict exists for them and the header is emitted last. Phases
+    recorded by the application:
+    - log_req / log_res: request and response logging hooks
+    - auth_parse / auth_apikey / auth_jwt: token_required steps
+    - view: view function, including nested auth phases
+    - serialize: conversion of the view result into a response
+    - total: whole request, up to the header emission
+
+    The Server-Timing header is only emitted when SERVER_TIMING_HEADER
+    is enabled; the access log always includes the timings.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('PHASE_TIMING_ENABLED'):
+        return
+
+    emit_header = app.config.get('SERVER_TIMING_HEADER', False)
+
+    app.dispatch_request = timed('view')(app.dispatch_request)
+    app.make_response = timed('serialize')(app.make_response)
+
+    @app.before_request
+    def start_phase_timing():
+        g.request_start_ns = perf_counter_ns()
+        g.phase_timings = {}
+
+    @app.after_request
+    def emit_server_timing(response):
+        phases = g.get('phase_timings')
+        if phases is None or not emit_header:
+            return response
+
+        phases['total'] = perf_counter_ns() - g.request_start_ns
+        response.headers.add('Server-Timing', server_timing_value(phases))
+        return response
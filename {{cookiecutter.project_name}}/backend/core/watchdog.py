@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict
+
+from flask import Flask, g, request
+
+from core.metrics import metrics
+from logs import logs_config
+
+
+class RequestWatchdog:
+    """
+    Per-worker watchdog that reports requests running longer than a threshold.
+
+    Request threads register themselves on entry and exit; a daemon thread
+    scans the in-flight table every 'interval' seconds. A request over the
+    threshold is reported once, with its metadata and the current Python
+    stack of the thread serving it, before gunicorn's timeout kills the
+    worker.
+    """
+
+    def __init__(self, threshold: float, interval: float) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self._inflight: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_thread(self) -> None:
+        # Threads do not survive fork: start one per worker process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._inflight.clear()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="request-watchdog", daemon=True).start()
+
+    def start_request(self, request_id: str, method: str, route: str) -> None:
+        self._ensure_thread()
+        self._inflight[threading.get_ident()] = {
+            "request_id": request_id,
+            "method": method,
+            "route": route,
+            "started": time.monotonic(),
+            "reported": False,
+        }
+
+    def end_request(self) -> None:
+        self._inflight.pop(threading.get_ident(), None)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as error:
+                logs_config.logger.error(f"Request watchdog error: {type(error).__name__}: {error}")
+
+    def check(self) -> None:
+        """Reports in-flight requests over the threshold (once per request)."""
+        now = time.monotonic()
+        frames = None
+        for ident, info in list(self._inflight.items()):
+            elapsed = now - info["started"]
+            if info["reported"] or elapsed < self.threshold:
+                continue
+
+            info["reported"] = True
+            if frames is None:
+                frames = sys._current_frames()
+            frame = frames.get(ident)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<thread finished>"
+
+            metrics.increment("slow_requests", info["route"])
+            logs_config.logger.warning(
+                f"Slow request: request_id={info['request_id']} "
+                f"{info['method']} {info['route']} running for {elapsed:.1f}s "
+                f"(threshold {self.threshold:.1f}s)\n{stack}"
+            )
+
+
+def init_watchdog(app: Flask) -> None:
+    """
+    Tracks in-flight requests with a RequestWatchdog.
+
+    Must be registered after the request logging hook so g.request_id
+    is available.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get("WATCHDOG_ENABLED"):
+        return
+
+    watchdog = RequestWatchdog(
+        threshold=app.config["SLOW_REQUEST_THRESHOLD"],
+        interval=app.config.get("WATCHDOG_INTERVAL", 1.0),
+    )
+    app.extensions["request_watchdog"] = watchdog
+
+    @app.before_request
+    def track_request():
+        route = request.url_rule.rule if request.url_rule else request.path
+        watchdog.start_request(g.get("request_id", "unknown"), request.method, route)
+
+    @app.teardown_request
+    def untrack_request(exc):
+        watchdog.end_request()
@@ -0,0 +1,182 @@
+import asyncio
+import atexit
+import os
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+from flask import Flask
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from core.aio import gather_with_timeout
+from logs import logs_config
+
+
+# Query function run on the worker loop with its own AsyncSession
+SessionCall = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def async_database_uri(uri: str) -> URL:
+    """Returns the asyncio variant of a database URI (psycopg 3 for Postgres)."""
+    url = make_url(uri)
+    if url.get_backend_name() == "postgresql":
+        # psycopg 3 serves both engines; psycopg2 has no asyncio support
+        return url.set(drivername="postgresql+psycopg")
+    if url.get_backend_name() == "sqlite" and url.get_driver_name() != "aiosqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+class AsyncDatabase:
+    """
+    AsyncSession factory for async def views.
+
+    Flask runs each async view in a new event loop (asgiref), but asyncio
+    connections are bound to the loop that opened them, so a pool cannot
+    be shared across views. Instead every worker process owns one event
+    loop in a daemon thread, started lazily (after gunicorn's fork), and
+    the engine and all sessions live on it. Views submit query functions
+    to that loop and await the result from their own loop.
+
+    Each query function gets its own AsyncSession (sessions are not safe
+    for concurrent use), so independent queries really run in parallel,
+    on up to pool_size connections.
+    """
+
+    def __init__(self) -> None:
+        self.uri: Optional[URL] = None
+        self.engine_options: dict = {}
+        self.default_timeout: Optional[float] = None
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Reads the async engine settings from the app config.
+
+        SQLALCHEMY_ASYNC_DATABASE_URI overrides the URI derived from
+        SQLALCHEMY_DATABASE_URI. DB_PREPARE_THRESHOLD is passed to the
+        driver only when it is psycopg: other drivers reject the argument.
+        No connection is opened here.
+        """
+        self.uri = async_database_uri(
+            app.config.get("SQLALCHEMY_ASYNC_DATABASE_URI") or app.config["SQLALCHEMY_DATABASE_URI"]
+        )
+        self.engine_options = dict(app.config.get("SQLALCHEMY_ASYNC_ENGINE_OPTIONS", {}))
+        if self.uri.get_driver_name() == "psycopg" and "DB_PREPARE_THRESHOLD" in app.config:
+            connect_args = dict(self.engine_options.get("connect_args", {}))
+            connect_args.setdefault("prepare_threshold", app.config["DB_PREPARE_THRESHOLD"])
+            self.engine_options["connect_args"] = connect_args
+        self.default_timeout = app.config.get("ASYNC_DB_TIMEOUT")
+        app.extensions["async_db"] = self
+
+    def _worker_loop(self) -> asyncio.AbstractEventLoop:
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._loop
+        with self._lock:
+            if self._pid != pid:
+                # A forked worker inherits a stopped copy of the parent's loop
+                # and engine; it starts its own
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-db-loop", daemon=True).start()
+                self._loop, self._engine, self._sessionmaker = loop, None, None
+                self._pid = pid
+                atexit.register(self.shutdown)
+        return self._loop
+
+    def _session_factory(self) -> async_sessionmaker:
+        # Only called on the worker loop thread, so no lock is needed
+        if self._sessionmaker is None:
+            if self.uri is None:
+                raise RuntimeError("AsyncDatabase.init_app() was not called")
+            self._engine = create_async_engine(self.uri, **self.engine_options)
+            self._sessionmaker = async_sessionmaker(self._engine, expire_on_commit=False)
+        return self._sessionmaker
+
+    async def _call(self, func: SessionCall, timeout: Optional[float]) -> Any:
+        async def with_session() -> Any:
+            async with self._session_factory()() as session:
+                return await func(session)
+
+        # Cancelling on the worker loop releases the connection on timeout
+        return await asyncio.wait_for(with_session(), timeout)
+
+    async def run(self, func: SessionCall, timeout: Optional[float] = None) -> Any:
+        """
+        Runs func(session) on the worker loop and awaits its result.
+
+        Can be awaited from any event loop, typically an async view.
+
+        Example:
+            async def count_items(session):
+                return await session.scalar(select(func.count()).select_from(Item))
+
+            total = await async_db.run(count_items)
+
+        Args:
+            func: Coroutine function receiving a fresh AsyncSession
+            timeout: Seconds allowed (default ASYNC_DB_TIMEOUT)
+
+        Returns:
+            What func returned.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._call(func, timeout if timeout is not None else self.default_timeout),
+            self._worker_loop(),
+        )
+        return await asyncio.wrap_future(future)
+
+    async def gather(
+        self,
+        *funcs: SessionCall,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Runs independent query functions concurrently, one session each.
+
+        Example:
+            @bp.route('/dashboard')
+            @token_required
+            async def dashboard():
+                total, latest = await async_db.gather(
+                    count_items, partial(latest_items, limit=10), timeout=2.0
+                )
+                ...
+
+        Args:
+            *funcs: Coroutine functions receiving a fresh AsyncSession
+            timeout: Seconds allowed per call (default ASYNC_DB_TIMEOUT)
+            return_exceptions: Return exceptions in place of results
+
+        Returns:
+            Results in the order of funcs.
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        # The per-call timeout is enforced on the worker loop by run()
+        return await gather_with_timeout(
+            *(self.run(func, timeout) for func in funcs),
+            timeout=None,
+            return_exceptions=return_exceptions,
+        )
+
+    def shutdown(self) -> None:
+        """Disposes the engine and stops the worker loop (registered at exit)."""
+        with self._lock:
+            loop, engine = self._loop, self._engine
+            if loop is None or self._pid != os.getpid():
+                return
+            self._pid, self._loop, self._engine, self._sessionmaker = None, None, None, None
+        if engine is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(timeout=5)
+            except Exception as error:
+                logs_config.logger.warning(f"Async engine dispose failed: {error}")
+        loop.call_soon_threadsafe(loop.stop)
+
+
+async_db = AsyncDatabase()
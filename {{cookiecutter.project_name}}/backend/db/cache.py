@@ -0,0 +1,334 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, List, Optional, Sequence, Tuple
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import Table, event
+from sqlalchemy.sql import Select, TextClause
+from sqlalchemy.sql.util import find_tables
+
+from core.metrics import metrics
+from db.database import WRITTEN_TABLES_KEY, db, is_entity_select, written_tables
+from logs import logs_config
+
+
+class MemoryCacheBackend:
+    """
+    Per-worker bounded LRU cache.
+
+    Invalidation only reaches the worker that committed: other gunicorn
+    workers keep serving their entries for the tables until QUERY_CACHE_TTL
+    expires. Use SQLiteCacheBackend when several workers must see writes
+    immediately.
+
+    Each table has a generation counter bumped on invalidation; a result
+    is only stored if the generations of its tables did not change while
+    the query ran, so a concurrent commit cannot leave a stale entry.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._keys_by_table = defaultdict(set)
+        self._generations: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def generations(self, tables: Sequence[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations[table] for table in tables)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, tables, value = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, tables: Sequence[str], ttl: float, snapshot: Tuple[int, ...]) -> None:
+        with self._lock:
+            if snapshot != tuple(self._generations[table] for table in tables):
+                return
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, tables, value)
+            for table in tables:
+                self._keys_by_table[table].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tables: Sequence[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._generations[table] += 1
+                for key in list(self._keys_by_table.pop(table, ())):
+                    self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for table in entry[1]:
+                self._keys_by_table[table].discard(key)
+
+
+class SQLiteCacheBackend:
+    """
+    Cache shared by all workers on the host through a local SQLite file.
+
+    Entries, their tables and per-table generations live in the file, so
+    a commit in any worker invalidates the entries for every worker.
+    Eviction is by insertion order once max_entries is exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, expires REAL, value BLOB
+                );
+                CREATE TABLE IF NOT EXISTS entry_tables (
+                    key TEXT, table_name TEXT, PRIMARY KEY (table_name, key)
+                );
+                CREATE TABLE IF NOT EXISTS generations (
+                    table_name TEXT PRIMARY KEY, generation INTEGER NOT NULL
+                );
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections do not survive fork)
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def generations(self, tables: Sequence[str]) -> Tuple[int, ...]:
+        rows = dict(self._connection().execute(
+            f"SELECT table_name, generation FROM generations WHERE table_name IN ({','.join('?' * len(tables))})",
+            list(tables),
+        ).fetchall())
+        return tuple(rows.get(table, 0) for table in tables)
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, tables: Sequence[str], ttl: float, snapshot: Tuple[int, ...]) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if snapshot != self.generations(tables):
+                return
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, expires, value) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO entry_tables (key, table_name) VALUES (?, ?)",
+                [(key, table) for table in tables],
+            )
+            evicted = connection.execute(
+                "DELETE FROM entries WHERE rowid IN ("
+                "SELECT rowid FROM entries ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            if evicted:
+                connection.execute("DELETE FROM entry_tables WHERE key NOT IN (SELECT key FROM entries)")
+        finally:
+            connection.execute("COMMIT")
+
+    def invalidate(self, tables: Sequence[str]) -> None:
+        connection = self._connection()
+        placeholders = ",".join("?" * len(tables))
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO generations (table_name, generation) VALUES (?, 1) "
+                "ON CONFLICT(table_name) DO UPDATE SET generation = generation + 1",
+                [(table,) for table in tables],
+            )
+            connection.execute(
+                f"DELETE FROM entries WHERE key IN "
+                f"(SELECT key FROM entry_tables WHERE table_name IN ({placeholders}))",
+                list(tables),
+            )
+            connection.execute(f"DELETE FROM entry_tables WHERE table_name IN ({placeholders})", list(tables))
+        finally:
+            connection.execute("COMMIT")
+
+
+def _statement_tables(statement: Select) -> List[str]:
+    tables = find_tables(statement, check_columns=True, include_aliases=False)
+    return sorted({table.name for table in tables if isinstance(table, Table)})
+
+
+class QueryCache:
+    """
+    Opt-in cache of read query results on top of db.session.
+
+    Results are keyed by the compiled SQL and its parameters and are
+    invalidated when a transaction that wrote to any of the query's
+    tables commits. Writes are tracked from flushed ORM objects, from
+    insert/update/delete statements and text() writes run through the
+    session, and from the db.database helpers that write through the
+    DBAPI cursor (copy_rows, run_pipelined). Other raw cursor writes
+    must call db.database.mark_tables_written.
+    """
+
+    def __init__(self, backend: Any, ttl: float, log_every: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.log_every = log_every
+        self._counts: Counter = Counter()
+
+    def _key(self, statement: Select) -> str:
+        compiled = statement.compile(dialect=db.engine.dialect)
+        raw_key = f"{compiled}\x00{sorted(compiled.params.items())!r}"
+        return hashlib.sha1(raw_key.encode()).hexdigest()
+
+    def _record(self, outcome: str) -> None:
+        metrics.increment("query_cache", outcome)
+        self._counts[outcome] += 1
+        lookups = self._counts["hit"] + self._counts["miss"]
+        if self.log_every and lookups % self.log_every == 0:
+            logs_config.logger.info(
+                f"Query cache: lookups={lookups} hit_rate={self._counts['hit'] / lookups:.1%} "
+                f"bypass={self._counts['bypass']}"
+            )
+
+    def all(self, statement: Select, ttl: Optional[float] = None) -> List[Any]:
+        """Returns statement.all() rows, from cache when possible."""
+        if is_entity_select(statement):
+            raise ValueError("Query cache only supports column selects, not ORM entities")
+
+        tables = _statement_tables(statement)
+        session = db.session
+        # Autoflush pending ORM changes first, as session.execute would, so
+        # their tables are recorded as written before the check below
+        if session.autoflush and (session.new or session.dirty or session.deleted):
+            session.flush()
+        # Reads inside a transaction that already wrote to these tables skip the cache
+        if db.session.info.get(WRITTEN_TABLES_KEY, set()).intersection(tables):
+            self._record("bypass")
+            return db.session.execute(statement).all()
+
+        key = self._key(statement)
+        rows = self.backend.get(key)
+        if rows is not None:
+            self._record("hit")
+            # Callers get their own list: mutating it must not alter the entry
+            return list(rows)
+
+        self._record("miss")
+        ttl = self.ttl if ttl is None else ttl
+        snapshot = self.backend.generations(tables)
+        rows = db.session.execute(statement).all()
+        if ttl > 0:
+            self.backend.set(key, list(rows), tables, ttl, snapshot)
+        return rows
+
+
+def _track_flushed_tables(session, flush_context) -> None:
+    written = session.info.setdefault(WRITTEN_TABLES_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(type(instance), "__table__", None)
+        if table is not None:
+            written.add(table.name)
+
+
+def _track_executed_tables(orm_execute_state) -> None:
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(statement, "table", None)
+        if isinstance(table, Table):
+            orm_execute_state.session.info.setdefault(WRITTEN_TABLES_KEY, set()).add(table.name)
+    elif isinstance(statement, TextClause):
+        tables = written_tables(statement.text)
+        if tables:
+            orm_execute_state.session.info.setdefault(WRITTEN_TABLES_KEY, set()).update(tables)
+
+
+def _invalidate_written_tables(session) -> None:
+    written = session.info.pop(WRITTEN_TABLES_KEY, None)
+    if written and has_app_context():
+        cache = current_app.extensions.get("query_cache")
+        if cache is not None:
+            cache.backend.invalidate(sorted(written))
+
+
+def _discard_written_tables(session, *args) -> None:
+    session.info.pop(WRITTEN_TABLES_KEY, None)
+
+
+def init_query_cache(app: Flask) -> None:
+    """
+    Creates the query cache and its invalidation listeners.
+
+    QUERY_CACHE_BACKEND is 'memory' (per worker LRU) or 'sqlite' (shared
+    by the workers on the host through QUERY_CACHE_PATH). With 'memory' a
+    commit only invalidates the committing worker's entries; the other
+    workers may return stale rows for up to QUERY_CACHE_TTL, so use
+    'sqlite' with more than one worker unless that staleness is acceptable.
+
+    Args:
+        app: Flask application with db already initialized.
+    """
+    if not app.config.get("QUERY_CACHE_ENABLED"):
+        return
+
+    max_entries = app.config.get("QUERY_CACHE_MAX_ENTRIES", 1024)
+    if app.config.get("QUERY_CACHE_BACKEND") == "sqlite":
+        backend = SQLiteCacheBackend(app.config["QUERY_CACHE_PATH"], max_entries)
+    else:
+        backend = MemoryCacheBackend(max_entries)
+
+    cache = QueryCache(
+        backend,
+        ttl=app.config.get("QUERY_CACHE_TTL", 300.0),
+        log_every=app.config.get("QUERY_CACHE_LOG_EVERY", 1000),
+    )
+    app.extensions["query_cache"] = cache
+
+    # Session listeners are global: register them once for every app
+    if not event.contains(db.session, "after_commit", _invalidate_written_tables):
+        event.listen(db.session, "after_flush", _track_flushed_tables)
+        event.listen(db.session, "do_orm_execute", _track_executed_tables)
+        event.listen(db.session, "after_commit", _invalidate_written_tables)
+        event.listen(db.session, "after_rollback", _discard_written_tables)
+
+
+def cached_all(statement: Select, ttl: Optional[float] = None) -> List[Any]:
+    """
+    Runs a column select through the query cache.
+
+    Falls back to a plain db.session.execute(statement).all() when the
+    cache is disabled, so routes can use it unconditionally.
+
+    ttl overrides QUERY_CACHE_TTL for this query; ttl=0 does not store
+    the result.
+
+    Example:
+        countries = cached_all(select(Country.code, Country.name))
+    """
+    cache = current_app.extensions.get("query_cache")
+    if cache is None:
+        return db.session.execute(statement).all()
+    return cache.all(statement, ttl)
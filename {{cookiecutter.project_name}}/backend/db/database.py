@@ -1,9 +1,30 @@
+import json
+import re
+import time
+from datetime import date, datetime, time as dt_time
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Union
+
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
+from sqlalchemy import Table, event, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql import Select
 
 
 db = SQLAlchemy()
 
+# Clave de session.info con las tablas escritas por la transacción actual;
+# db/cache.py invalida sus entradas al hacer commit
+WRITTEN_TABLES_KEY = "query_cache_written_tables"
+
+_WRITE_TARGET = re.compile(
+    r'\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)',
+    re.IGNORECASE,
+)
+
 
 def test_connection():
     """
@@ -14,4 +35,321 @@ def test_connection():
         return True
     
     except Exception as e:
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
+
+
+def is_entity_select(statement: Select) -> bool:
+    """
+    Indica si la consulta selecciona una sola entidad ORM (select(Modelo)),
+    en cuyo caso los resultados se leen con scalars().
+    """
+    descriptions = statement.column_descriptions
+    if len(descriptions) != 1:
+        return False
+    entity = descriptions[0].get("entity")
+    return entity is not None and descriptions[0]["type"] is entity
+
+
+def written_tables(sql: str) -> Set[str]:
+    """
+    Tablas destino de los INSERT, UPDATE y DELETE de una sentencia SQL
+    textual (sin esquema). Puede incluir nombres de más (por ejemplo el
+    SET de ON CONFLICT DO UPDATE): solo invalidan de más.
+    """
+    tables = set()
+    for target in _WRITE_TARGET.findall(sql):
+        name = target.rsplit(".", 1)[-1]
+        tables.add(name.strip('"'))
+    return tables
+
+
+def mark_tables_written(tables: Iterable[str]) -> None:
+    """
+    Registra tablas escritas sin pasar por el ORM (cursor DBAPI, COPY)
+    para que la caché de consultas las invalide al hacer commit.
+    """
+    db.session.info.setdefault(WRITTEN_TABLES_KEY, set()).update(tables)
+
+
+def _configure_psycopg_connection(prepared_max: int, dbapi_connection, connection_record) -> None:
+    dbapi_connection.prepared_max = prepared_max
+
+
+def init_driver_options(app: Flask) -> None:
+    """
+    Aplica opciones del driver a cada conexión nueva del pool.
+
+    Con psycopg 3 fija el tamaño de la caché de sentencias preparadas en
+    el servidor (DB_PREPARED_MAX). El umbral de preparación automática
+    (DB_PREPARE_THRESHOLD) se pasa en SQLALCHEMY_ENGINE_OPTIONS.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.driver == "psycopg":
+                event.listen(
+                    engine,
+                    "connect",
+                    partial(_configure_psycopg_connection, app.config.get("DB_PREPARED_MAX", 100)),
+                )
+
+
+def run_pipelined(statement: str, params: Iterable[Union[Sequence[Any], Mapping[str, Any]]]) -> int:
+    """
+    Ejecuta una sentencia SQL por cada juego de parámetros, en lote.
+
+    Usa la conexión de la sesión actual (misma transacción). Con psycopg 3
+    los parámetros se envían en modo pipeline (sin esperar cada respuesta);
+    con psycopg2 se usa execute_batch. La sentencia usa el paramstyle del
+    driver (%s o %(nombre)s).
+
+    Returns:
+        Cantidad de juegos de parámetros ejecutados.
+    """
+    params = list(params)
+    if not params:
+        return 0
+
+    # El cursor DBAPI no pasa por los eventos de la sesión
+    mark_tables_written(written_tables(statement))
+    connection = db.session.connection().connection
+    cursor = connection.cursor()
+    try:
+        if db.engine.dialect.driver == "psycopg":
+            with connection.driver_connection.pipeline():
+                cursor.executemany(statement, params)
+        else:
+            from psycopg2.extras import execute_batch
+            execute_batch(cursor, statement, params, page_size=len(params))
+    finally:
+        cursor.close()
+
+    return len(params)
+
+
+class BatchResult(NamedTuple):
+    """Resultado de un lote de escritura masiva."""
+    rows: int
+    seconds: float
+
+
+def _table_of(target: Any) -> Table:
+    """Acepta un modelo declarado en models/ o una Table."""
+    return target if isinstance(target, Table) else target.__table__
+
+
+def _copy_value(value: Any) -> str:
+    # Formato TEXT de COPY: \N es NULL; se escapan barra, tab y saltos de línea
+    if value is None:
+        return "\\N"
+    # Mismo texto que insert_rows enviaría: JSON para dict/list (columnas
+    # json/jsonb), hex para bytea y formatos explícitos en vez de repr()
+    if isinstance(value, bool):
+        text_value = "t" if value else "f"
+    elif isinstance(value, (dict, list)):
+        text_value = json.dumps(value)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        text_value = "\\x" + bytes(value).hex()
+    elif isinstance(value, (datetime, date, dt_time)):
+        text_value = value.isoformat()
+    else:
+        text_value = str(value)
+    return (
+        text_value
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _CopyStream:
+    """
+    Objeto tipo archivo que genera líneas COPY bajo demanda (psycopg2).
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]) -> None:
+        self.rows = 0
+        self._lines = self._encode(rows)
+        self._buffer = ""
+
+    def _encode(self, rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+        for row in rows:
+            self.rows += 1
+            yield "\t".join(_copy_value(value) for value in row) + "\n"
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    readline = read
+
+
+def _row_tuples(rows: Iterable[Any], columns: Sequence[str]) -> Iterator[Sequence[Any]]:
+    getter = itemgetter(*columns) if len(columns) > 1 else (lambda row: (row[columns[0]],))
+    for row in rows:
+        yield getter(row) if isinstance(row, Mapping) else row
+
+
+def _row_dicts(rows: Iterable[Any], columns: Sequence[str]) -> Iterator[Mapping[str, Any]]:
+    for row in rows:
+        yield row if isinstance(row, Mapping) else dict(zip(columns, row))
+
+
+def copy_rows(
+    target: Any,
+    rows: Iterable[Any],
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = 10000,
+) -> List[BatchResult]:
+    """
+    Inserta filas con COPY FROM STDIN alimentado desde un iterable.
+
+    Las filas se consumen de forma perezosa (se puede pasar un generador)
+    y se envían en lotes de batch_size, cada uno con su propio COPY, sin
+    construir listas intermedias. En motores distintos de PostgreSQL se
+    usa insert_rows (executemany) como alternativa.
+
+    Se ejecuta en la transacción de la sesión actual; el commit queda a
+    cargo de quien llama.
+
+    Args:
+        target: Modelo de models/ o Table
+        rows: Tuplas en el orden de columns, o mappings por nombre
+        columns: Columnas a cargar (por defecto todas las de la tabla)
+        batch_size: Filas por COPY
+
+    Returns:
+        Lista de BatchResult con filas y segundos por lote.
+    """
+    table = _table_of(target)
+    columns = list(columns or table.columns.keys())
+    # COPY usa el cursor DBAPI, que no pasa por los eventos de la sesión
+    mark_tables_written([table.name])
+    if db.engine.dialect.name != "postgresql":
+        return insert_rows(table, rows, columns=columns, batch_size=batch_size)
+
+    preparer = db.engine.dialect.identifier_preparer
+    copy_sql = (
+        f"COPY {preparer.format_table(table)} "
+        f"({', '.join(preparer.quote(column) for column in columns)}) FROM STDIN"
+    )
+
+    connection = db.session.connection().connection
+    is_psycopg3 = db.engine.dialect.driver == "psycopg"
+    tuples = _row_tuples(rows, columns)
+    results = []
+    cursor = connection.cursor()
+    try:
+        while True:
+            batch = islice(tuples, batch_size)
+            start = time.perf_counter()
+            if is_psycopg3:
+                count = 0
+                with cursor.copy(copy_sql) as copy:
+                    for row in batch:
+                        copy.write_row(row)
+                        count += 1
+            else:
+                stream = _CopyStream(batch)
+                cursor.copy_expert(copy_sql, stream)
+                count = stream.rows
+            if count == 0:
+                break
+            results.append(BatchResult(count, time.perf_counter() - start))
+            if count < batch_size:
+                break
+    finally:
+        cursor.close()
+
+    return results
+
+
+def insert_rows(
+    target: Any,
+    rows: Iterable[Any],
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = 1000,
+) -> List[BatchResult]:
+    """
+    Inserta filas en lotes con executemany (INSERT con múltiples VALUES).
+
+    Alternativa portable a copy_rows. Funciona con cualquier motor y con
+    ambos drivers de PostgreSQL.
+
+    Returns:
+        Lista de BatchResult con filas y segundos por lote.
+    """
+    table = _table_of(target)
+    columns = list(columns or table.columns.keys())
+    dicts = _row_dicts(rows, columns)
+    statement = insert(table)
+    results = []
+
+    while True:
+        batch = list(islice(dicts, batch_size))
+        if not batch:
+            break
+        start = time.perf_counter()
+        db.session.execute(statement, batch)
+        results.append(BatchResult(len(batch), time.perf_counter() - start))
+
+    return results
+
+
+def upsert_rows(
+    target: Any,
+    rows: Iterable[Any],
+    conflict_columns: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = 1000,
+) -> List[BatchResult]:
+    """
+    Inserta o actualiza filas en lotes con INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+        target: Modelo de models/ o Table
+        rows: Mappings por nombre de columna, o tuplas en el orden de columns
+        conflict_columns: Columnas del índice único (por defecto la clave primaria)
+        update_columns: Columnas a actualizar en conflicto (por defecto el resto);
+            una lista vacía ignora el conflicto (DO NOTHING)
+        columns: Orden de columnas para filas en tuplas
+        batch_size: Filas por sentencia
+
+    Returns:
+        Lista de BatchResult con filas y segundos por lote.
+    """
+    table = _table_of(target)
+    columns = list(columns or table.columns.keys())
+    conflict_columns = list(conflict_columns or [column.name for column in table.primary_key])
+    dialect_insert = sqlite.insert if db.engine.dialect.name == "sqlite" else postgresql.insert
+
+    statement = dialect_insert(table)
+    if update_columns is None:
+        update_columns = [column for column in columns if column not in conflict_columns]
+    if update_columns:
+        statement = statement.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={column: statement.excluded[column] for column in update_columns},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    dicts = _row_dicts(rows, columns)
+    results = []
+    while True:
+        batch = list(islice(dicts, batch_size))
+        if not batch:
+            break
+        start = time.perf_counter()
+        db.session.execute(statement, batch)
+        results.append(BatchResult(len(batch), time.perf_counter() - start))
+
+    return results
@@ -0,0 +1,83 @@
+from typing import Any, Iterator
+
+from flask import Response, current_app, stream_with_context
+from marshmallow import Schema
+from sqlalchemy.sql import Select
+
+from db.database import db, is_entity_select
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def iter_partitions(statement: Select, yield_per: int) -> Iterator[list]:
+    """
+    Runs a select with a server-side cursor and yields rows in partitions.
+
+    yield_per enables stream_results, so only 'yield_per' rows are held in
+    memory at a time. ORM entity selects yield entities; column selects
+    yield Row objects (attribute access by column name).
+    """
+    result = db.session.execute(statement, execution_options={"yield_per": yield_per})
+    if is_entity_select(statement):
+        result = result.scalars()
+    for partition in result.partitions():
+        yield partition
+
+
+def _ndjson_chunks(statement: Select, schema: Schema, yield_per: int) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    for partition in iter_partitions(statement, yield_per):
+        yield "".join(dumps(item) + "\n" for item in schema.dump(partition, many=True))
+
+
+def _json_array_chunks(statement: Select, schema: Schema, yield_per: int) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    yield "["
+    separator = ""
+    for partition in iter_partitions(statement, yield_per):
+        items = schema.dump(partition, many=True)
+        if items:
+            # Dump the partition as a list and drop its brackets
+            yield separator + dumps(items)[1:-1]
+            separator = ","
+    yield "]"
+
+
+def stream_query(
+    statement: Select,
+    schema: Schema,
+    fmt: str = "ndjson",
+    yield_per: int = 1000,
+    **response_kwargs: Any,
+) -> Response:
+    """
+    Streams the rows of a select serialized through a marshmallow schema.
+
+    Memory stays constant regardless of the result size: rows are fetched
+    with a server-side cursor 'yield_per' at a time, dumped with the
+    schema and written to the response as they are produced. The app
+    context (and db.session) is kept alive with stream_with_context.
+
+    The response is marked as streamed, so the response logging hook does
+    not read the body, and no Content-Length is set, so compression
+    middleware can wrap the stream.
+
+    Args:
+        statement: SQLAlchemy select (select(Model) or column select)
+        schema: Schema instance from schemas/
+        fmt: 'ndjson' (one JSON document per line) or 'json' (chunked array)
+        yield_per: Rows fetched and serialized per chunk
+        **response_kwargs: Extra Response arguments (status, headers)
+
+    Returns:
+        Streaming Flask Response.
+    """
+    if fmt == "ndjson":
+        chunks, mimetype = _ndjson_chunks(statement, schema, yield_per), NDJSON_MIMETYPE
+    elif fmt == "json":
+        chunks, mimetype = _json_array_chunks(statement, schema, yield_per), "application/json"
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    return Response(stream_with_context(chunks), mimetype=mimetype, **response_kwargs)
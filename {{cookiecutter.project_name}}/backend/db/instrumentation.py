@@ -0,0 +1,105 @@
+from collections import Counter
+from time import perf_counter
+from typing import Any, Dict
+
+from flask import Flask, g, has_request_context
+from sqlalchemy import event
+
+from db.database import db
+from logs import logs_config
+
+
+class QueryStats:
+    """
+    Per-request SQL statistics stored in g.sql_stats.
+
+    Statements are keyed by their SQL text, which SQLAlchemy renders with
+    bound parameters, so repeated statements with different values share
+    the same shape.
+    """
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement] += 1
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        """Returns statement shapes executed at least 'threshold' times."""
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+    def summary(self) -> Dict[str, Any]:
+        return {"queries": self.count, "time_ms": round(self.duration * 1000, 2)}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the execution context, not the pooled connection: a failed
+    # statement never fires after_cursor_execute and would leave it behind
+    if context is not None:
+        context._query_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, "_query_start", None)
+    if start is None or not has_request_context():
+        return
+
+    stats = g.get("sql_stats")
+    if stats is not None:
+        stats.record(statement, perf_counter() - start)
+
+
+def init_query_instrumentation(app: Flask) -> None:
+    """
+    Attaches per-request SQL instrumentation to the application engines.
+
+    When SQL_INSTRUMENTATION is disabled nothing is registered, so the
+    statement execution path carries no extra overhead. When enabled:
+    - Counts statements and accumulates DB time per request in g.sql_stats
+    - Flags statement shapes repeated SQL_N_PLUS_ONE_THRESHOLD or more
+      times in the same request (N+1 pattern)
+    - Adds a 'db' entry to the Server-Timing response header when
+      SERVER_TIMING_HEADER is enabled
+
+    Args:
+        app: Flask application with db already initialized.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION"):
+        return
+
+    threshold = app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 5)
+    emit_header = app.config.get("SERVER_TIMING_HEADER", False)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.sql_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get("sql_stats")
+        if stats is None:
+            return response
+
+        for shape, count in stats.repeated_shapes(threshold).items():
+            logs_config.logger.warning(
+                f"Possible N+1 query: request_id={g.get('request_id', 'unknown')} "
+                f"executions={count} statement={shape[:200]!r}"
+            )
+
+        if emit_header:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'
+            )
+        return response
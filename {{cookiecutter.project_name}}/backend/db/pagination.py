@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from flask import current_app, request, url_for
+from flask.json.tag import TaggedJSONSerializer
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+from db.database import db, is_entity_select
+
+
+CURSOR_SALT = "keyset-cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor is tampered with or malformed."""
+
+
+class Page(NamedTuple):
+    """A keyset page: items plus opaque cursors for the adjacent pages."""
+    items: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def _serializer() -> URLSafeSerializer:
+    # TaggedJSONSerializer (Flask sessions) round-trips datetimes, UUIDs and bytes
+    return URLSafeSerializer(
+        current_app.config["SECRET_KEY"], salt=CURSOR_SALT, serializer=TaggedJSONSerializer()
+    )
+
+
+def encode_cursor(direction: str, key: Sequence[Any]) -> str:
+    """Signs a cursor holding the direction ('next'/'prev') and the row key."""
+    return _serializer().dumps({"d": direction, "k": list(key)})
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Verifies and decodes a cursor.
+
+    Raises:
+        InvalidCursor: If the signature or contents are invalid.
+    """
+    try:
+        data = _serializer().loads(cursor)
+    except BadSignature as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if not isinstance(data, dict) or data.get("d") not in ("next", "prev"):
+        raise InvalidCursor("Invalid cursor")
+    return data
+
+
+def paginate_keyset(
+    statement: Select,
+    order_columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    descending: bool = False,
+) -> Page:
+    """
+    Paginates a select with keyset (seek) pagination.
+
+    Instead of OFFSET, each page filters on the ordering key of the last
+    (or first) row seen, so an index on order_columns makes every page
+    cost the same regardless of depth. order_columns must identify rows
+    uniquely (append the primary key when ordering by a non-unique
+    column) and are compared as a row value, all in the same direction.
+
+    Args:
+        statement: Base select (filters allowed, no order_by/limit)
+        order_columns: Model attributes or columns defining the order
+        cursor: Cursor from a previous Page (None for the first page)
+        limit: Page size
+        descending: Order direction for all columns
+
+    Returns:
+        Page with items and next/prev cursors (None when there is no page).
+
+    Raises:
+        InvalidCursor: If the cursor is invalid.
+    """
+    direction, key = "next", None
+    if cursor:
+        data = decode_cursor(cursor)
+        direction, key = data["d"], data["k"]
+        if len(key) != len(order_columns):
+            raise InvalidCursor("Invalid cursor")
+
+    backwards = direction == "prev"
+    # Scanning backwards flips the order; rows are reversed afterwards
+    scan_descending = descending != backwards
+
+    if key is not None:
+        row_value = tuple_(*order_columns)
+        statement = statement.where(row_value < tuple_(*key) if scan_descending else row_value > tuple_(*key))
+    statement = statement.order_by(
+        *[column.desc() if scan_descending else column.asc() for column in order_columns]
+    ).limit(limit + 1)
+
+    result = db.session.execute(statement)
+    rows = list(result.scalars() if is_entity_select(statement) else result)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return Page(rows, None, None)
+
+    keys = [column.key for column in order_columns]
+    first_key = [getattr(rows[0], name) for name in keys]
+    last_key = [getattr(rows[-1], name) for name in keys]
+
+    # Going forward, a previous page exists once we moved past the first one;
+    # going backward, a next page always exists (the one we came from)
+    has_next = has_more if not backwards else True
+    has_prev = key is not None if not backwards else has_more
+
+    return Page(
+        rows,
+        encode_cursor("next", last_key) if has_next else None,
+        encode_cursor("prev", first_key) if has_prev else None,
+    )
+
+
+def page_links(page: Page, cursor_arg: str = "cursor") -> Dict[str, Optional[str]]:
+    """
+    Builds next/prev URLs for the current endpoint.
+
+    Keeps the current view args and query string, replacing only the
+    cursor argument.
+
+    Example:
+        page = paginate_keyset(select(Item), [Item.id], request.args.get('cursor'))
+        return jsonify({
+            'items': ItemSchema(many=True).dump(page.items),
+            'links': page_links(page),
+        }), 200
+    """
+    def link(cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        values = {**request.view_args, **request.args.to_dict(), cursor_arg: cursor}
+        return url_for(request.endpoint, **values)
+
+    return {"next": link(page.next_cursor), "prev": link(page.prev_cursor)}
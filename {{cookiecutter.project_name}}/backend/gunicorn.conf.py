@@ -0,0 +1,81 @@
+"""
+Configuración de gunicorn (hooks del ciclo de vida de los workers).
+
+Los parámetros de despliegue (workers, threads, timeouts, max-requests)
+se pasan por línea de comandos en docker-compose-prod.yml, que tiene
+precedencia sobre este archivo.
+"""
+import os
+import signal
+import time
+
+
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Segundos del graceful_timeout que se reservan para que el worker salga
+# después de esperar las tareas en segundo plano
+DRAIN_MARGIN = 1.0
+
+
+def _mark_shutdown(worker):
+    # Solo cuenta el primer aviso: desde ahí corre el graceful_timeout
+    if getattr(worker, "shutdown_started", None) is None:
+        worker.shutdown_started = time.monotonic()
+
+
+def post_worker_init(worker):
+    """
+    Crea el monitor de memoria del worker (core/memory.py) una vez
+    cargada la app, con los parámetros MEMORY_* de la configuración, y
+    registra cuándo llega el SIGTERM del arbiter: desde ese momento
+    corre el graceful_timeout tras el cual mata al worker.
+    """
+    from core.config import APP_CONFIG
+    from core.memory import build_memory_monitor
+
+    worker.memory_monitor = build_memory_monitor(APP_CONFIG)
+    worker.shutdown_started = None
+
+    def handle_exit(sig, frame):
+        _mark_shutdown(worker)
+        worker.handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, handle_exit)
+    # signal.signal vuelve a hacer interrumpibles las llamadas al sistema;
+    # gunicorn no deja que SIGTERM corte las requests en curso
+    signal.siginterrupt(signal.SIGTERM, False)
+
+
+def post_request(worker, req, environ, resp):
+    """
+    Después de enviar cada respuesta, muestrea la memoria del worker. Si
+    supera el límite de RSS o de crecimiento, se marca el worker para
+    reciclarlo: termina las requests en curso y gunicorn levanta otro,
+    igual que con --max-requests.
+    """
+    monitor = getattr(worker, "memory_monitor", None)
+    if monitor is not None and monitor.after_request() is not None:
+        worker.alive = False
+    if not worker.alive:
+        # Reciclado por memoria o por --max-requests
+        _mark_shutdown(worker)
+
+
+def worker_int(worker):
+    """Registra el inicio del apagado con SIGINT/SIGQUIT."""
+    _mark_shutdown(worker)
+
+
+def worker_exit(server, worker):
+    """
+    Espera las tareas en segundo plano pendientes del worker antes de que
+    termine (SIGTERM, max-requests o reinicio). Las requests en curso ya
+    consumieron parte de graceful_timeout: solo se espera lo que queda
+    (menos DRAIN_MARGIN), así el arbiter no mata al worker a mitad de la
+    espera. Las tareas que no terminen se descartan y se registran en el log.
+    """
+    from core.tasks import drain_executors
+
+    started = getattr(worker, "shutdown_started", None) or time.monotonic()
+    remaining = graceful_timeout - (time.monotonic() - started) - DRAIN_MARGIN
+    drain_executors(timeout=max(remaining, 0))
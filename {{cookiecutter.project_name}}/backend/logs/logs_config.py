@@ -6,39 +6,13 @@ from datetime import date
 from dotenv import load_dotenv
 import logging
 
-load_dotenv()
-
-log_dir = os.getenv("LOG_DIR")
-log_file = os.getenv("LOG_FILE", "app.log")
-os.makedirs(log_dir, exist_ok=True)
-
-app_log_path = os.path.join(log_dir, f"{date.today()}-{log_file}")
-
-logger.remove()
-
-logger.add(
-    app_log_path,
-    level=os.getenv("LOG_LEVEL", "DEBUG"),
-    backtrace=True,
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name} | {message}",
-    rotation=os.getenv("LOG_MAX_MB", "100MB"),
-    retention=int(os.getenv("LOG_BACKUP_COUNT", 5)),
-    compression="gz",
-)
-
-logger.add(
-    sys.stdout,
-    level="INFO",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-    colorize=False
-)
 
 class InterceptHandler(logging.Handler):
     """
     Handler que intercepta logs del sistema estándar de Python y los redirige a Loguru
     """
     ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    
+
     def emit(self, record):
         try:
             level = logger.level(record.levelname).name
@@ -57,27 +31,71 @@ class InterceptHandler(logging.Handler):
 
 intercept_handler = InterceptHandler()
 
-root_logger = logging.getLogger()
-
-root_logger.handlers.clear()
-root_logger.addHandler(intercept_handler)
-root_logger.setLevel(logging.DEBUG)
-
 # Configurar loggers específicos y evitar propagación para prevenir duplicados
 loggers_to_configure = [
     "gunicorn",
-    "gunicorn.access", 
+    "gunicorn.access",
     "gunicorn.error",
     "werkzeug",
     "flask",
     "flask.app"
 ]
 
-for logger_name in loggers_to_configure:
-    specific_logger = logging.getLogger(logger_name)
-    specific_logger.handlers.clear()
-    specific_logger.addHandler(intercept_handler)
-    specific_logger.propagate = False
-    specific_logger.setLevel(logging.DEBUG)
+_initialized = False
+
 
-logging.getLogger().propagate = False
\ No newline at end of file
+def init_logging():
+    """
+    Configura los sinks de Loguru (archivo y stdout) y redirige el logging
+    estándar a Loguru.
+
+    Se llama desde create_app y no al importar el módulo, así importar
+    cualquier módulo que use `logger` no crea directorios ni archivos.
+    Solo la primera llamada tiene efecto.
+    """
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+
+    load_dotenv()
+
+    log_dir = os.getenv("LOG_DIR")
+    log_file = os.getenv("LOG_FILE", "app.log")
+    os.makedirs(log_dir, exist_ok=True)
+
+    app_log_path = os.path.join(log_dir, f"{date.today()}-{log_file}")
+
+    logger.remove()
+
+    logger.add(
+        app_log_path,
+        level=os.getenv("LOG_LEVEL", "DEBUG"),
+        backtrace=True,
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name} | {message}",
+        rotation=os.getenv("LOG_MAX_MB", "100MB"),
+        retention=int(os.getenv("LOG_BACKUP_COUNT", 5)),
+        compression="gz",
+    )
+
+    logger.add(
+        sys.stdout,
+        level="INFO",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+        colorize=False
+    )
+
+    root_logger = logging.getLogger()
+
+    root_logger.handlers.clear()
+    root_logger.addHandler(intercept_handler)
+    root_logger.setLevel(logging.DEBUG)
+
+    for logger_name in loggers_to_configure:
+        specific_logger = logging.getLogger(logger_name)
+        specific_logger.handlers.clear()
+        specific_logger.addHandler(intercept_handler)
+        specific_logger.propagate = False
+        specific_logger.setLevel(logging.DEBUG)
+
+    logging.getLogger().propagate = False
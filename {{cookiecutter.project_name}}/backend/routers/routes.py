@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify
 
+from core.metrics import metrics
 from core.middleware import token_required
 
 
@@ -13,3 +14,9 @@ def read_root():
         'msg': '{{ cookiecutter.project_name }} protected'
     }), 200
 
+
+@bp.route('/metrics', methods=['GET'])
+@token_required
+def read_metrics():
+    """In-process metrics of the worker that serves the request."""
+    return jsonify(metrics.snapshot()), 200
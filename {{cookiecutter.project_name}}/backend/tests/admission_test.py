@@ -0,0 +1,153 @@
+"""
+Tests for the admission control middleware.
+"""
+import threading
+import time
+
+from flask import Flask
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from core.admission import AdmissionMiddleware, init_admission_control, upstream_queue_delay
+
+
+def _slow_app(release: threading.Event):
+    def app(environ, start_response):
+        if environ["PATH_INFO"] == "/slow":
+            release.wait(5)
+        return Response("ok")(environ, start_response)
+    return app
+
+
+def _get(middleware, path, **kwargs):
+    # Closing the response calls the WSGI close() that frees the slot
+    response = Client(middleware).get(path, **kwargs)
+    response.close()
+    return response
+
+
+def _middleware(app, **overrides):
+    options = dict(max_concurrency=1, max_queue=0, max_wait=0.05, target=0.1, interval=0.2,
+                   retry_after=2, bypass_paths=("/health",))
+    options.update(overrides)
+    return AdmissionMiddleware(app, **options)
+
+
+class TestUpstreamQueueDelay:
+    """Test X-Request-Start parsing."""
+
+    def test_formats(self):
+        """Test seconds, milliseconds and microseconds timestamps."""
+        now = 1_700_000_000.0
+        assert upstream_queue_delay({"HTTP_X_REQUEST_START": "t=1699999999.5"}, now) == 0.5
+        assert round(upstream_queue_delay({"HTTP_X_REQUEST_START": "1699999999750"}, now), 3) == 0.25
+        assert round(upstream_queue_delay({"HTTP_X_REQUEST_START": "t=1699999999900000"}, now), 3) == 0.1
+
+    def test_missing_or_malformed(self):
+        """Test that bad headers count as no delay."""
+        assert upstream_queue_delay({}, 1.0) == 0.0
+        assert upstream_queue_delay({"HTTP_X_REQUEST_START": "soon"}, 1.0) == 0.0
+
+
+class TestAdmissionMiddleware:
+    """Test concurrency limiting and load shedding."""
+
+    def _occupy(self, middleware, release):
+        thread = threading.Thread(target=_get, args=(middleware, "/slow"))
+        thread.start()
+        time.sleep(0.05)
+        return thread
+
+    def test_sheds_when_full(self):
+        """Test 503 with Retry-After when the only slot is busy."""
+        release = threading.Event()
+        middleware = _middleware(_slow_app(release))
+        thread = self._occupy(middleware, release)
+
+        response = _get(middleware, "/fast")
+        release.set()
+        thread.join()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "2"
+
+    def test_health_bypasses_admission(self):
+        """Test that health checks are served while the worker is saturated."""
+        release = threading.Event()
+        middleware = _middleware(_slow_app(release))
+        thread = self._occupy(middleware, release)
+
+        response = _get(middleware, "/health")
+        release.set()
+        thread.join()
+
+        assert response.status_code == 200
+
+    def test_queued_request_admitted_when_slot_frees(self):
+        """Test that a queued request waits for a slot instead of failing."""
+        release = threading.Event()
+        middleware = _middleware(_slow_app(release), max_queue=1, max_wait=2)
+        thread = self._occupy(middleware, release)
+        threading.Timer(0.05, release.set).start()
+
+        response = _get(middleware, "/fast")
+        thread.join()
+
+        assert response.status_code == 200
+
+    def test_slot_released_after_response(self):
+        """Test that sequential requests never exhaust the limit."""
+        middleware = _middleware(_slow_app(threading.Event()))
+
+        assert [_get(middleware, "/fast").status_code for _ in range(5)] == [200] * 5
+
+    def test_slot_released_without_close(self):
+        """Test that responses read or dropped without close() free their slot."""
+        middleware = _middleware(_slow_app(threading.Event()))
+        client = Client(middleware)
+
+        assert client.get("/fast").get_data() == b"ok"
+        assert [client.get("/fast").status_code for _ in range(5)] == [200] * 5
+
+    def test_codel_sheds_persistent_delay_only(self):
+        """Test that delay over target is tolerated for one interval, then shed."""
+        middleware = _middleware(_slow_app(threading.Event()), max_concurrency=4, interval=0.05,
+                                 upstream_header=True)
+        delayed = {"X-Request-Start": f"t={time.time() - 0.5:.3f}"}
+
+        assert _get(middleware, "/fast", headers=delayed).status_code == 200
+        time.sleep(0.06)
+        assert _get(middleware, "/fast", headers=delayed).status_code == 503
+        # A request under target ends the shedding state
+        assert _get(middleware, "/fast").status_code == 200
+        assert _get(middleware, "/fast", headers=delayed).status_code == 200
+
+    def test_upstream_header_ignored_unless_enabled(self):
+        """Test that a client-sent X-Request-Start cannot trigger shedding by default."""
+        middleware = _middleware(_slow_app(threading.Event()), max_concurrency=4, interval=0.0)
+        delayed = {"X-Request-Start": f"t={time.time() - 60:.3f}"}
+
+        assert [_get(middleware, "/fast", headers=delayed).status_code for _ in range(3)] == [200] * 3
+
+
+class TestInitAdmissionControl:
+    """Test admission control settings checks."""
+
+    def _init(self, **config):
+        app = Flask(__name__)
+        app.config.update(ADMISSION_ENABLED=True, API_BASE_URL="", **config)
+        init_admission_control(app)
+
+    def test_warns_when_no_thread_can_wait(self, mocker):
+        """Test the warning when concurrency leaves no threads to queue."""
+        warning = mocker.patch("core.admission.logs_config.logger.warning")
+        self._init(ADMISSION_MAX_CONCURRENCY=4, GUNICORN_THREADS=4)
+
+        assert "never shed" in warning.call_args[0][0]
+
+    def test_no_warning_with_spare_threads(self, mocker):
+        """Test that the shipped split (half of the threads) does not warn."""
+        warning = mocker.patch("core.admission.logs_config.logger.warning")
+        self._init(ADMISSION_MAX_CONCURRENCY=4, GUNICORN_THREADS=8)
+
+        warning.assert_not_called()
@@ -0,0 +1,40 @@
+"""
+Tests for the asyncio helpers.
+"""
+import asyncio
+import time
+
+import pytest
+
+from core.aio import gather_with_timeout
+
+
+async def _sleep(delay, value):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TestGatherWithTimeout:
+    """Test concurrent awaits with a per-call timeout."""
+
+    def test_results_in_order(self):
+        """Test that calls run concurrently and keep their order."""
+        start = time.perf_counter()
+        results = asyncio.run(gather_with_timeout(_sleep(0.1, "a"), _sleep(0.05, "b"), timeout=1))
+
+        assert results == ["a", "b"]
+        assert time.perf_counter() - start < 0.18
+
+    def test_timeout_raises(self):
+        """Test that a slow call raises TimeoutError."""
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(gather_with_timeout(_sleep(1, "a"), timeout=0.05))
+
+    def test_timeout_isolated(self):
+        """Test that with return_exceptions a timeout does not discard other results."""
+        results = asyncio.run(gather_with_timeout(
+            _sleep(1, "slow"), _sleep(0, "fast"), timeout=0.05, return_exceptions=True
+        ))
+
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1] == "fast"
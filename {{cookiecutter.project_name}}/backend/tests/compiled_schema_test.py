@@ -0,0 +1,86 @@
+"""
+Tests for compiled marshmallow serialization.
+"""
+import datetime
+import uuid
+from types import SimpleNamespace
+
+from marshmallow import Schema, fields, post_dump
+
+from schemas.compiled import CompiledSchema, compile_schema
+
+
+class Upper(fields.Field):
+    """Custom field that must go through marshmallow."""
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return value.upper() if value else value
+
+
+class ItemSchema(Schema):
+    id = fields.Integer()
+    name = fields.String()
+    price = fields.Float()
+    active = fields.Boolean()
+    created = fields.DateTime()
+    ref = fields.UUID()
+    code = Upper(data_key="sku")
+    label = fields.Method("get_label")
+
+    def get_label(self, obj):
+        return f"{obj.name}#{obj.id}"
+
+
+def _item(**overrides):
+    values = dict(
+        id=1, name="widget", price=2, active=True,
+        created=datetime.datetime(2024, 1, 2, 3, 4, 5),
+        ref=uuid.UUID(int=7), code="ab",
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestCompiledSchema:
+    """Test that compiled dumps match marshmallow."""
+
+    def test_matches_marshmallow(self):
+        """Test fast and fallback fields against Schema.dump."""
+        items = [
+            _item(),
+            _item(id=2, name=None, price=None, created=None, code=None),
+            _item(id=3, name=b"bytes"),
+        ]
+
+        assert CompiledSchema(ItemSchema()).dump_many(items) == ItemSchema(many=True).dump(items)
+
+    def test_tuples_with_columns(self):
+        """Test dumping positional tuples."""
+        compiled = compile_schema(ItemSchema, only=("id", "name", "price"), columns=("name", "id", "price"))
+
+        assert compiled.dump_many([("a", "1", 1)]) == [{"id": 1, "name": "a", "price": 1.0}]
+
+    def test_missing_fallback_value_is_dropped(self):
+        """Test that marshmallow 'missing' results are omitted like Schema.dump."""
+        class OptionalSchema(Schema):
+            id = fields.Integer()
+            extra = fields.Function(lambda obj: obj.get("extra", fields.missing_))
+
+        compiled = CompiledSchema(OptionalSchema())
+
+        assert compiled.dump(SimpleNamespace(id=1, get=lambda key, default: default)) == {"id": 1}
+
+    def test_schema_with_hooks_uses_marshmallow(self):
+        """Test that schemas with dump hooks are not compiled."""
+        class HookedSchema(Schema):
+            id = fields.Integer()
+
+            @post_dump
+            def wrap(self, data, **kwargs):
+                return {"wrapped": data}
+
+        assert CompiledSchema(HookedSchema()).dump(SimpleNamespace(id=1)) == {"wrapped": {"id": 1}}
+
+    def test_compile_schema_is_cached(self):
+        """Test that compiled schemas are reused per arguments."""
+        assert compile_schema(ItemSchema) is compile_schema(ItemSchema)
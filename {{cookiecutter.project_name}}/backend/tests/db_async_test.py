@@ -0,0 +1,114 @@
+"""
+Tests for the async engine used by async def views.
+"""
+import asyncio
+import sqlite3
+import time
+from functools import partial
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from db.async_database import AsyncDatabase, async_database_uri
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_database(tmp_path):
+    """AsyncDatabase on a SQLite file with a small table."""
+    path = tmp_path / "async.sqlite3"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.executemany("INSERT INTO item VALUES (?, ?)", [(1, "hook"), (2, "line")])
+
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}", ASYNC_DB_TIMEOUT=5)
+    database = AsyncDatabase()
+    database.init_app(app)
+    yield database
+    database.shutdown()
+
+
+async def _names(session):
+    return (await session.execute(text("SELECT name FROM item ORDER BY id"))).scalars().all()
+
+
+async def _slow_count(session, delay):
+    await asyncio.sleep(delay)
+    return (await session.execute(text("SELECT count(*) FROM item"))).scalar()
+
+
+class TestAsyncDatabaseUri:
+    """Test the async driver selection."""
+
+    def test_postgres_uses_psycopg(self):
+        """Test that psycopg2 URIs are switched to psycopg 3."""
+        url = async_database_uri("postgresql+psycopg2://user:pass@db:5432/app")
+        assert url.drivername == "postgresql+psycopg"
+        assert url.database == "app"
+
+    def test_sqlite_uses_aiosqlite(self):
+        """Test that SQLite URIs use aiosqlite."""
+        assert async_database_uri("sqlite:///app.db").drivername == "sqlite+aiosqlite"
+
+
+    def test_prepare_threshold_only_for_psycopg(self):
+        """Test that the psycopg-only connect argument is not given to other drivers."""
+        options = {"SQLALCHEMY_ASYNC_ENGINE_OPTIONS": {"pool_size": 3}, "DB_PREPARE_THRESHOLD": 5}
+        engines = {}
+        for uri in ("postgresql+psycopg2://user:pass@db:5432/app", "sqlite:///app.db"):
+            app = Flask(__name__)
+            app.config.update(SQLALCHEMY_DATABASE_URI=uri, **options)
+            database = AsyncDatabase()
+            database.init_app(app)
+            engines[database.uri.get_driver_name()] = database.engine_options
+
+        assert engines["psycopg"] == {"pool_size": 3, "connect_args": {"prepare_threshold": 5}}
+        assert engines["aiosqlite"] == {"pool_size": 3}
+
+
+class TestAsyncDatabase:
+    """Test queries on the per-worker event loop."""
+
+    def test_run(self, async_database):
+        """Test that a query function gets a session and returns its result."""
+        assert asyncio.run(async_database.run(_names)) == ["hook", "line"]
+
+    def test_engine_shared_across_view_loops(self, async_database):
+        """Test that calls from different event loops reuse the worker loop."""
+        asyncio.run(async_database.run(_names))
+        engine = async_database._engine
+
+        assert asyncio.run(async_database.run(_names)) == ["hook", "line"]
+        assert async_database._engine is engine
+
+    def test_gather_runs_concurrently(self, async_database):
+        """Test that independent queries overlap instead of running serially."""
+        start = time.perf_counter()
+        results = asyncio.run(async_database.gather(
+            partial(_slow_count, delay=0.2), partial(_slow_count, delay=0.2), _names
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert results == [2, 2, ["hook", "line"]]
+        assert elapsed < 0.35
+
+    def test_per_call_timeout(self, async_database):
+        """Test that only the slow call times out."""
+        results = asyncio.run(async_database.gather(
+            partial(_slow_count, delay=2), _names, timeout=0.1, return_exceptions=True
+        ))
+
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1] == ["hook", "line"]
+
+    def test_not_initialized(self):
+        """Test that using the factory before init_app fails clearly."""
+        database = AsyncDatabase()
+        try:
+            with pytest.raises(RuntimeError):
+                asyncio.run(database.run(_names))
+        finally:
+            database.shutdown()
@@ -0,0 +1,104 @@
+"""
+Tests for bulk write helpers in db.database.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from sqlalchemy import Column, Integer, MetaData, String, Table, select
+
+from db.database import _CopyStream, copy_rows, db, insert_rows, upsert_rows
+
+
+metadata = MetaData()
+bulk_item = Table(
+    "bulk_item",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50)),
+    Column("stock", Integer),
+)
+
+
+@pytest.fixture
+def db_app():
+    """Flask app on in-memory SQLite with the bulk_item table."""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI="sqlite://")
+    db.init_app(app)
+    with app.app_context():
+        metadata.create_all(db.engine)
+        yield app
+        db.session.remove()
+
+
+def _all_rows():
+    return db.session.execute(select(bulk_item).order_by(bulk_item.c.id)).all()
+
+
+class TestCopyStream:
+    """Test COPY text encoding for the psycopg2 path."""
+
+    def test_encodes_nulls_and_escapes(self):
+        """Test NULL marker and escaping of special characters."""
+        stream = _CopyStream(iter([(1, None, "a\tb"), (2, "c\\d", "e\nf")]))
+
+        assert stream.read() == "1\t\\N\ta\\tb\n2\tc\\\\d\te\\nf\n"
+        assert stream.rows == 2
+
+    def test_encodes_json_bytes_and_scalars(self):
+        """Test that values are written as PostgreSQL input text, not repr()."""
+        row = ({"a": [1, "x"]}, [1, 2], b"\x00\xff", True, datetime(2024, 5, 1, 12, 30),
+               Decimal("1.50"))
+        stream = _CopyStream(iter([row]))
+
+        assert stream.read() == (
+            '{"a": [1, "x"]}\t[1, 2]\t\\\\x00ff\tt\t2024-05-01T12:30:00\t1.50\n'
+        )
+
+    def test_reads_in_chunks(self):
+        """Test that lines are generated lazily in chunks."""
+        stream = _CopyStream(iter([(1,), (2,), (3,)]))
+
+        assert stream.read(3) == "1\n2"
+        assert stream.rows == 2
+        assert stream.read(10) == "\n3\n"
+        assert stream.read(10) == ""
+
+
+class TestBulkHelpers:
+    """Test bulk helpers on SQLite (executemany path)."""
+
+    def test_insert_rows_batches(self, db_app):
+        """Test per-batch row counts from a generator of tuples."""
+        rows = ((i, f"item-{i}", i) for i in range(5))
+
+        results = insert_rows(bulk_item, rows, batch_size=2)
+
+        assert [result.rows for result in results] == [2, 2, 1]
+        assert all(result.seconds >= 0 for result in results)
+        assert len(_all_rows()) == 5
+
+    def test_copy_rows_falls_back_to_executemany(self, db_app):
+        """Test copy_rows on a non PostgreSQL engine."""
+        results = copy_rows(bulk_item, [{"id": 1, "name": "a", "stock": 3}])
+
+        assert [result.rows for result in results] == [1]
+        assert _all_rows() == [(1, "a", 3)]
+
+    def test_upsert_rows_updates_conflicts(self, db_app):
+        """Test ON CONFLICT update on the primary key."""
+        insert_rows(bulk_item, [(1, "a", 1), (2, "b", 2)])
+
+        upsert_rows(bulk_item, [(2, "b", 20), (3, "c", 30)], batch_size=1)
+
+        assert _all_rows() == [(1, "a", 1), (2, "b", 20), (3, "c", 30)]
+
+    def test_upsert_rows_do_nothing(self, db_app):
+        """Test that an empty update list ignores conflicting rows."""
+        insert_rows(bulk_item, [(1, "a", 1)])
+
+        upsert_rows(bulk_item, [{"id": 1, "name": "z", "stock": 9}], update_columns=[])
+
+        assert _all_rows() == [(1, "a", 1)]
@@ -0,0 +1,171 @@
+"""
+Tests for the query result cache.
+"""
+import pytest
+from flask import Flask
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select, text, update
+from sqlalchemy.orm import registry
+
+from db.cache import MemoryCacheBackend, SQLiteCacheBackend, cached_all, init_query_cache
+from db.database import copy_rows, db, written_tables
+
+
+metadata = MetaData()
+country = Table(
+    "country",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50)),
+)
+
+
+class Country:
+    """ORM mapping of the country table, for pending (unflushed) objects."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+registry().map_imperatively(Country, country)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache_app(request, tmp_path):
+    """Flask app on SQLite with the query cache enabled for each backend."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        QUERY_CACHE_ENABLED=True,
+        QUERY_CACHE_BACKEND=request.param,
+        QUERY_CACHE_PATH=str(tmp_path / "cache.sqlite3"),
+        QUERY_CACHE_LOG_EVERY=0,
+    )
+    db.init_app(app)
+    init_query_cache(app)
+    with app.app_context():
+        metadata.create_all(db.engine)
+        db.session.execute(insert(country), [{"id": 1, "name": "Chile"}])
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def _names():
+    return [row.name for row in cached_all(select(country.c.name).order_by(country.c.id))]
+
+
+class TestQueryCache:
+    """Test cache hits and invalidation."""
+
+    def test_hit_after_miss(self, cache_app):
+        """Test that a repeated query is served from the cache."""
+        assert _names() == ["Chile"]
+        # Change the table behind the session's back: a cached read is stale
+        with db.engine.begin() as connection:
+            connection.execute(update(country).values(name="Peru"))
+
+        assert _names() == ["Chile"]
+
+    def test_invalidated_on_commit(self, cache_app):
+        """Test that committing a write to the table invalidates the entry."""
+        assert _names() == ["Chile"]
+        db.session.execute(insert(country).values(id=2, name="Peru"))
+        db.session.commit()
+
+        assert _names() == ["Chile", "Peru"]
+
+    def test_invalidated_by_copy_rows(self, cache_app):
+        """Test that rows loaded with copy_rows are visible after commit."""
+        assert _names() == ["Chile"]
+        copy_rows(country, [(2, "Peru"), (3, "Bolivia")])
+        db.session.commit()
+
+        assert _names() == ["Chile", "Peru", "Bolivia"]
+
+    def test_invalidated_by_text_statement(self, cache_app):
+        """Test that text() writes run through the session invalidate too."""
+        assert _names() == ["Chile"]
+        db.session.execute(text("UPDATE country SET name = :name"), {"name": "Peru"})
+        db.session.commit()
+
+        assert _names() == ["Peru"]
+
+    def test_written_tables_from_sql(self):
+        """Test write targets found in raw SQL (as given to run_pipelined)."""
+        assert written_tables('INSERT INTO public."Item" (id) VALUES (%s)') == {"Item"}
+        assert written_tables("update country set name = %s; DELETE FROM city") == {"country", "city"}
+        assert written_tables("SELECT * FROM country") == set()
+
+    def test_bypass_inside_writing_transaction(self, cache_app):
+        """Test uncommitted writes are visible to reads in the same transaction."""
+        assert _names() == ["Chile"]
+        db.session.execute(update(country).values(name="Argentina"))
+
+        assert _names() == ["Argentina"]
+
+    def test_sees_pending_orm_objects(self, cache_app):
+        """Test that objects added but not flushed are visible, as with session.execute."""
+        assert _names() == ["Chile"]
+        db.session.add(Country(id=2, name="Peru"))
+
+        assert _names() == ["Chile", "Peru"]
+
+    def test_hit_returns_a_copy(self, cache_app):
+        """Test that mutating a returned list does not alter the cached entry."""
+        statement = select(country.c.name)
+        cached_all(statement).append(("Peru",))
+        cached_all(statement).clear()
+
+        assert [row.name for row in cached_all(statement)] == ["Chile"]
+
+    def test_zero_ttl_is_not_stored(self, cache_app):
+        """Test that ttl=0 is honored instead of falling back to the default."""
+        statement = select(country.c.name)
+        cached_all(statement, ttl=0)
+        with db.engine.begin() as connection:
+            connection.execute(update(country).values(name="Peru"))
+
+        assert [row.name for row in cached_all(statement, ttl=0)] == ["Peru"]
+
+    def test_rollback_keeps_entries(self, cache_app):
+        """Test that rolled back writes do not invalidate."""
+        _names()
+        db.session.execute(update(country).values(name="Bolivia"))
+        db.session.rollback()
+        with db.engine.begin() as connection:
+            connection.execute(update(country).values(name="Peru"))
+
+        assert _names() == ["Chile"]
+
+
+class TestCacheBackends:
+    """Test backend eviction and generation checks."""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def backend(self, request, tmp_path):
+        if request.param == "memory":
+            return MemoryCacheBackend(max_entries=2)
+        return SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=2)
+
+    def test_eviction(self, backend):
+        """Test that the cache is bounded."""
+        for key in ("a", "b", "c"):
+            backend.set(key, [key], ["t"], 60, backend.generations(["t"]))
+
+        assert backend.get("a") is None
+        assert backend.get("c") == ["c"]
+
+    def test_stale_snapshot_is_not_stored(self, backend):
+        """Test that results read before an invalidation are discarded."""
+        snapshot = backend.generations(["t"])
+        backend.invalidate(["t"])
+        backend.set("a", ["stale"], ["t"], 60, snapshot)
+
+        assert backend.get("a") is None
+
+    def test_expired_entries(self, backend):
+        """Test TTL expiration."""
+        backend.set("a", ["x"], ["t"], -1, backend.generations(["t"]))
+
+        assert backend.get("a") is None
@@ -0,0 +1,72 @@
+"""
+Tests for streaming query export.
+"""
+import json
+
+import pytest
+from flask import Flask
+from marshmallow import Schema, fields
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+
+from db.database import db
+from db.export import stream_query
+
+
+metadata = MetaData()
+export_item = Table(
+    "export_item",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50)),
+)
+
+
+class ExportItemSchema(Schema):
+    id = fields.Integer()
+    name = fields.String()
+
+
+@pytest.fixture
+def export_app():
+    """Flask app on SQLite with export routes over 5 rows."""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI="sqlite://")
+    db.init_app(app)
+    with app.app_context():
+        metadata.create_all(db.engine)
+        db.session.execute(insert(export_item), [{"id": i, "name": f"item-{i}"} for i in range(5)])
+        db.session.commit()
+
+    @app.route("/export/<fmt>")
+    def export(fmt):
+        statement = select(export_item).order_by(export_item.c.id)
+        return stream_query(statement, ExportItemSchema(), fmt=fmt, yield_per=2)
+
+    return app
+
+
+class TestStreamQuery:
+    """Test NDJSON and JSON array streaming."""
+
+    def test_ndjson(self, export_app):
+        """Test one JSON document per line."""
+        response = export_app.test_client().get("/export/ndjson")
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert "Content-Length" not in response.headers
+        assert response.mimetype == "application/x-ndjson"
+        assert [json.loads(line)["id"] for line in lines] == [0, 1, 2, 3, 4]
+
+    def test_json_array(self, export_app):
+        """Test chunked JSON array output is a valid document."""
+        response = export_app.test_client().get("/export/json")
+
+        assert json.loads(response.get_data(as_text=True)) == [
+            {"id": i, "name": f"item-{i}"} for i in range(5)
+        ]
+
+    def test_unsupported_format(self, export_app):
+        """Test that unknown formats are rejected."""
+        with export_app.test_request_context():
+            with pytest.raises(ValueError):
+                stream_query(select(export_item), ExportItemSchema(), fmt="csv")
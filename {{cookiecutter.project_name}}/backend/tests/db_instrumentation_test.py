@@ -0,0 +1,111 @@
+"""
+Tests for per-request SQL instrumentation.
+"""
+import pytest
+from flask import Flask, g
+from sqlalchemy import text
+
+from db.database import db
+from db.instrumentation import QueryStats, init_query_instrumentation
+
+
+def _instrumented_app(server_timing_header=True):
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        SQL_INSTRUMENTATION=True,
+        SQL_N_PLUS_ONE_THRESHOLD=3,
+        SERVER_TIMING_HEADER=server_timing_header,
+    )
+    db.init_app(app)
+    init_query_instrumentation(app)
+
+    @app.route("/items")
+    def items():
+        for item_id in range(4):
+            db.session.execute(text("SELECT :id"), {"id": item_id})
+        return {"queries": g.sql_stats.count}
+
+    return app
+
+
+@pytest.fixture
+def instrumented_app():
+    """Flask app on in-memory SQLite with SQL instrumentation enabled."""
+    return _instrumented_app()
+
+
+class TestQueryStats:
+    """Test QueryStats accumulation."""
+
+    def test_record_and_summary(self):
+        """Test statement count and DB time accumulation."""
+        stats = QueryStats()
+        stats.record("SELECT 1", 0.002)
+        stats.record("SELECT 1", 0.003)
+
+        assert stats.summary() == {"queries": 2, "time_ms": 5.0}
+
+    def test_repeated_shapes(self):
+        """Test that only shapes over the threshold are flagged."""
+        stats = QueryStats()
+        for _ in range(3):
+            stats.record("SELECT * FROM item WHERE id = ?", 0.001)
+        stats.record("SELECT * FROM owner", 0.001)
+
+        assert stats.repeated_shapes(3) == {"SELECT * FROM item WHERE id = ?": 3}
+
+
+class TestQueryInstrumentation:
+    """Test instrumentation wired into a Flask app."""
+
+    def test_counts_statements_and_sets_server_timing(self, instrumented_app):
+        """Test per-request statement count and Server-Timing header."""
+        response = instrumented_app.test_client().get("/items")
+
+        assert response.get_json() == {"queries": 4}
+        assert 'desc="4 queries"' in response.headers["Server-Timing"]
+
+    def test_server_timing_header_disabled(self):
+        """Test that DB timings are not sent to clients with SERVER_TIMING_HEADER off."""
+        response = _instrumented_app(server_timing_header=False).test_client().get("/items")
+
+        assert response.get_json() == {"queries": 4}
+        assert "Server-Timing" not in response.headers
+
+    def test_failed_statement_does_not_skew_later_timings(self, instrumented_app):
+        """Test that a DB error leaves no start time behind on the pooled connection."""
+        @instrumented_app.route("/fails")
+        def fails():
+            try:
+                db.session.execute(text("SELECT * FROM missing_table"))
+            except Exception:
+                db.session.rollback()
+            db.session.execute(text("SELECT 1"))
+            return g.sql_stats.summary()
+
+        response = instrumented_app.test_client().get("/fails")
+
+        assert response.get_json()["queries"] == 1
+        with instrumented_app.app_context():
+            assert "query_start_time" not in db.session.connection().info
+
+    def test_flags_n_plus_one(self, instrumented_app, mocker):
+        """Test that repeated statement shapes are logged as N+1."""
+        mock_logger = mocker.patch("db.instrumentation.logs_config.logger")
+
+        instrumented_app.test_client().get("/items")
+
+        mock_logger.warning.assert_called_once()
+        assert "executions=4" in mock_logger.warning.call_args[0][0]
+
+    def test_disabled_registers_nothing(self):
+        """Test that no hooks are registered when disabled."""
+        app = Flask(__name__)
+        app.config["SQL_INSTRUMENTATION"] = False
+
+        init_query_instrumentation(app)
+
+        assert not app.before_request_funcs
+        assert not app.after_request_funcs
@@ -0,0 +1,96 @@
+"""
+Tests for keyset pagination.
+"""
+import pytest
+from flask import Flask, jsonify, request
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+
+from db.database import db
+from db.pagination import InvalidCursor, encode_cursor, page_links, paginate_keyset
+
+
+metadata = MetaData()
+page_item = Table(
+    "page_item",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("category", String(10)),
+)
+
+
+@pytest.fixture
+def page_app():
+    """Flask app on SQLite with 7 rows."""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SECRET_KEY="test", SQLALCHEMY_DATABASE_URI="sqlite://")
+    db.init_app(app)
+    with app.app_context():
+        metadata.create_all(db.engine)
+        db.session.execute(
+            insert(page_item), [{"id": i, "category": "a" if i % 2 else "b"} for i in range(1, 8)]
+        )
+        db.session.commit()
+
+    @app.route("/items")
+    def items():
+        page = paginate_keyset(select(page_item), [page_item.c.id], request.args.get("cursor"), limit=3)
+        return jsonify({"ids": [row.id for row in page.items], "links": page_links(page)})
+
+    with app.test_request_context():
+        yield app
+
+
+def _ids(page):
+    return [row.id for row in page.items]
+
+
+class TestPaginateKeyset:
+    """Test forward and backward keyset paging."""
+
+    def test_forward_pages(self, page_app):
+        """Test walking forward until the last page."""
+        statement = select(page_item)
+        first = paginate_keyset(statement, [page_item.c.id], limit=3)
+        second = paginate_keyset(statement, [page_item.c.id], first.next_cursor, limit=3)
+        third = paginate_keyset(statement, [page_item.c.id], second.next_cursor, limit=3)
+
+        assert (_ids(first), _ids(second), _ids(third)) == ([1, 2, 3], [4, 5, 6], [7])
+        assert first.prev_cursor is None
+        assert third.next_cursor is None
+
+    def test_backward_page(self, page_app):
+        """Test that prev returns the preceding page in order."""
+        statement = select(page_item)
+        first = paginate_keyset(statement, [page_item.c.id], limit=3)
+        second = paginate_keyset(statement, [page_item.c.id], first.next_cursor, limit=3)
+        back = paginate_keyset(statement, [page_item.c.id], second.prev_cursor, limit=3)
+
+        assert _ids(back) == [1, 2, 3]
+        assert back.prev_cursor is None
+        assert back.next_cursor is not None
+
+    def test_descending_composite_key(self, page_app):
+        """Test descending order over a composite key with a filter."""
+        statement = select(page_item).where(page_item.c.category == "a")
+        columns = [page_item.c.category, page_item.c.id]
+        first = paginate_keyset(statement, columns, limit=2, descending=True)
+        second = paginate_keyset(statement, columns, first.next_cursor, limit=2, descending=True)
+
+        assert (_ids(first), _ids(second)) == ([7, 5], [3, 1])
+
+    def test_tampered_cursor(self, page_app):
+        """Test that modified cursors are rejected."""
+        cursor = encode_cursor("next", [3])
+
+        with pytest.raises(InvalidCursor):
+            paginate_keyset(select(page_item), [page_item.c.id], cursor[:-2] + "xx")
+
+    def test_page_links(self, page_app):
+        """Test next/prev links built for the current endpoint."""
+        client = page_app.test_client()
+        first = client.get("/items").get_json()
+        second = client.get(first["links"]["next"]).get_json()
+
+        assert first["links"]["prev"] is None
+        assert second["ids"] == [4, 5, 6]
+        assert client.get(second["links"]["prev"]).get_json()["ids"] == [1, 2, 3]
@@ -0,0 +1,142 @@
+"""
+Tests for the shared outbound HTTP client.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, g
+
+from core.http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.connections.add(self.client_address)
+        server.request_ids.append(self.headers.get("X-Request-ID"))
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Local keep-alive HTTP server recording connections and headers."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.connections, httpd.request_ids, httpd.statuses = set(), [], []
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestHttpClient:
+    """Test pooling, retries and request-id propagation."""
+
+    def test_connection_reused(self, server):
+        """Test that sequential calls reuse one keep-alive connection."""
+        client = HttpClient()
+        for _ in range(3):
+            assert client.get(server.url).status_code == 200
+
+        assert len(server.connections) == 1
+        client.close()
+
+    def test_request_id_propagated(self, server):
+        """Test that g.request_id is sent as X-Request-ID."""
+        client = HttpClient()
+        with Flask(__name__).test_request_context():
+            g.request_id = "req-123"
+            client.get(server.url)
+        client.get(server.url)
+
+        assert server.request_ids == ["req-123", None]
+        client.close()
+
+    def test_retries_idempotent_on_503(self, server):
+        """Test that a GET is retried after a 503."""
+        server.statuses = [503]
+        client = HttpClient(backoff_factor=0)
+
+        assert client.get(server.url).status_code == 200
+        assert len(server.request_ids) == 2
+        client.close()
+
+    def test_trial_released_on_unexpected_error(self, server):
+        """Test that a half-open trial raising a non-HTTP error does not block the host."""
+        server.statuses = [500]
+        client = HttpClient(retries=0, failure_threshold=1, reset_timeout=0.05)
+        client.get(server.url)
+        time.sleep(0.06)
+
+        with pytest.raises(TypeError):
+            client.post(server.url, json=object())
+
+        assert client.get(server.url).status_code == 200
+        assert client.breaker(server.url.split("/")[2]).is_open is False
+        client.close()
+
+    @patch("core.http_client.metrics")
+    def test_latency_recorded_per_host(self, mock_metrics, server):
+        """Test that each call is timed under its host."""
+        client = HttpClient()
+        client.get(server.url)
+
+        name, host, seconds = mock_metrics.observe.call_args[0]
+        assert (name, host) == ("http_client", server.url.split("/")[2])
+        assert seconds >= 0
+        client.close()
+
+    def test_circuit_opens_after_failures(self, server):
+        """Test that a failing host is short-circuited without being called."""
+        server.statuses = [500, 500]
+        client = HttpClient(retries=0, failure_threshold=2, reset_timeout=60)
+        client.get(server.url)
+        client.get(server.url)
+
+        with pytest.raises(CircuitOpenError):
+            client.get(server.url)
+        assert len(server.request_ids) == 2
+        client.close()
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_half_open_trial(self):
+        """Test that after the reset timeout one trial call is allowed."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        assert breaker.record_failure() is True
+        assert breaker.allow() is False
+
+        time.sleep(0.06)
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+
+        breaker.record_success()
+        assert breaker.is_open is False
+        assert breaker.allow() is True
+
+    def test_failed_trial_reopens(self):
+        """Test that a failed trial opens the circuit again."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.01)
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow() is True
+
+        breaker.record_failure()
+        assert breaker.allow() is False
@@ -0,0 +1,187 @@
+"""
+Tests for the Idempotency-Key response cache.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify, request
+
+from core.idempotency import IdempotencyStore, StoredResponse, idempotent, init_idempotency
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app with an idempotent endpoint counting its executions."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        IDEMPOTENCY_ENABLED=True,
+        IDEMPOTENCY_PATH=str(tmp_path / "idempotency.sqlite3"),
+        IDEMPOTENCY_WAIT_TIMEOUT=5,
+    )
+    init_idempotency(app)
+    app.calls = []
+    app.gate = threading.Event()
+    app.gate.set()
+
+    @app.route("/orders", methods=["POST"])
+    @idempotent
+    def create_order():
+        app.gate.wait(5)
+        app.calls.append(request.get_json())
+        if request.get_json().get("fail"):
+            return jsonify({"msg": "boom"}), 500
+        response = jsonify({"id": len(app.calls)})
+        response.set_cookie("session", "first")
+        return response, 201
+
+    return app
+
+
+def _post(client, key, payload=None):
+    headers = {"Idempotency-Key": key} if key else {}
+    return client.post("/orders", json=payload or {"item": 1}, headers=headers)
+
+
+class TestIdempotent:
+    """Test replay, mismatch and concurrency handling."""
+
+    def test_replays_stored_response(self, app):
+        """Test that a retry gets the first response without running the view."""
+        client = app.test_client()
+        first, retry = _post(client, "k1"), _post(client, "k1")
+
+        assert len(app.calls) == 1
+        assert (retry.status_code, retry.get_json()) == (201, {"id": 1})
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert "Set-Cookie" in first.headers
+        assert "Set-Cookie" not in retry.headers
+
+    def test_disabled(self, tmp_path):
+        """Test that with IDEMPOTENCY_ENABLED off no store is created."""
+        app = Flask(__name__)
+        app.config.update(IDEMPOTENCY_ENABLED=False, IDEMPOTENCY_PATH=str(tmp_path / "db"))
+        init_idempotency(app)
+
+        assert "idempotency" not in app.extensions
+        assert not (tmp_path / "db").exists()
+
+    def test_without_header_runs_every_time(self, app):
+        """Test that requests without a key are not deduplicated."""
+        client = app.test_client()
+        _post(client, None)
+        _post(client, None)
+
+        assert len(app.calls) == 2
+
+    def test_key_reused_with_other_payload(self, app):
+        """Test 422 when a key is reused for a different request."""
+        client = app.test_client()
+        _post(client, "k1", {"item": 1})
+
+        assert _post(client, "k1", {"item": 2}).status_code == 422
+
+    def test_keys_scoped_per_client(self, app):
+        """Test that the same key from another client runs the view again."""
+        _post(app.test_client(), "k1")
+        app.test_client().post(
+            "/orders", json={"item": 1}, headers={"Idempotency-Key": "k1"},
+            environ_base={"REMOTE_ADDR": "10.0.0.2"},
+        )
+
+        assert len(app.calls) == 2
+
+    def test_server_errors_not_stored(self, app):
+        """Test that a 5xx releases the key so the retry runs the view."""
+        client = app.test_client()
+        _post(client, "k1", {"fail": True})
+        _post(client, "k1", {"fail": True})
+
+        assert len(app.calls) == 2
+
+    def test_async_view(self, app):
+        """Test that an async view is awaited and its response replayed."""
+        @app.route("/async-orders", methods=["POST"])
+        @idempotent
+        async def create_async_order():
+            await asyncio.sleep(0)
+            app.calls.append(request.get_json())
+            return jsonify({"id": len(app.calls)}), 201
+
+        client = app.test_client()
+        first, retry = [
+            client.post("/async-orders", json={"item": 1}, headers={"Idempotency-Key": "k1"})
+            for _ in range(2)
+        ]
+
+        assert len(app.calls) == 1
+        assert (first.status_code, first.get_json()) == (201, {"id": 1})
+        assert (retry.status_code, retry.get_json()) == (201, {"id": 1})
+        assert retry.headers["Idempotent-Replayed"] == "true"
+
+    def test_concurrent_duplicate_waits(self, app):
+        """Test that a duplicate in flight waits and replays the first response."""
+        app.gate.clear()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(_post(app.test_client(), "k1")))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        app.gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(app.calls) == 1
+        assert sorted(response.status_code for response in results) == [201, 201]
+        assert sum("Idempotent-Replayed" in response.headers for response in results) == 1
+
+
+class TestIdempotencyStore:
+    """Test store expiry and eviction."""
+
+    def test_abandoned_pending_row_reclaimed(self, tmp_path):
+        """Test that a pending row past lock_timeout can be claimed again."""
+        store = IdempotencyStore(str(tmp_path / "db"), ttl=60, lock_timeout=0.01, max_entries=10)
+
+        assert store.claim("k", "f").state == "new"
+        assert store.claim("k", "f").state == "pending"
+        time.sleep(0.02)
+        assert store.claim("k", "f").state == "new"
+
+    def test_eviction(self, tmp_path):
+        """Test that purge keeps at most max_entries responses."""
+        store = IdempotencyStore(str(tmp_path / "db"), ttl=60, lock_timeout=60, max_entries=3)
+        for index in range(5):
+            store.claim(f"k{index}", "f")
+            store.complete(f"k{index}", "f", StoredResponse(200, [], b"{}"))
+        store.purge()
+
+        remaining = [store.get(f"k{index}").state for index in range(5)]
+        assert remaining.count("done") == 3
+
+    def test_opened_on_first_use(self, tmp_path):
+        """Test that creating the store does not create its file."""
+        store = IdempotencyStore(str(tmp_path / "db"), ttl=60, lock_timeout=60, max_entries=10)
+        assert not (tmp_path / "db").exists()
+
+        store.claim("k", "f")
+        assert (tmp_path / "db").exists()
+
+    def test_complete_only_own_pending_claim(self, tmp_path):
+        """Test that complete() leaves a row claimed by another request untouched."""
+        store = IdempotencyStore(str(tmp_path / "db"), ttl=60, lock_timeout=0.01, max_entries=10)
+        store.claim("k", "first")
+        time.sleep(0.02)
+        # The first request outlived lock_timeout: a different one reclaims the key
+        store.claim("k", "second")
+        store.complete("k", "first", StoredResponse(200, [], b"first"))
+
+        assert store.get("k").state == "pending"
+        store.complete("k", "second", StoredResponse(201, [], b"second"))
+        assert store.get("k").response.body == b"second"
@@ -1,8 +1,13 @@
+import asyncio
+import inspect
 import pytest
 from unittest.mock import patch, Mock
 import jwt
+import json
 import datetime
+from cryptography.hazmat.primitives.asymmetric import ed25519
 from flask import Flask
+from jwt.algorithms import HMACAlgorithm, OKPAlgorithm
 
 
 from core.middleware import (
@@ -12,6 +17,7 @@ from core.middleware import (
     token_required,
     ERROR_MESSAGES
 )
+from core.keys import load_verification_keys
 
 # Test constants
 TEST_JWT_SECRET_KEY = "test_secret_key_for_jwt_signing_12345"
@@ -422,4 +428,162 @@ class TestTokenRequiredDecorator:
         decorated_func = token_required(original_function)
         
         assert decorated_func.__name__ == "test_name"
-        assert decorated_func.__doc__ == "Original docstring."
\ No newline at end of file
+        assert decorated_func.__doc__ == "Original docstring."
+
+class TestKeyRotation:
+    """Test kid-indexed verification keys."""
+
+    @staticmethod
+    def _build_token(key, algorithm, kid):
+        payload = {
+            "sub": TEST_SUB,
+            "iss": TEST_ISS,
+            "iat": datetime.datetime.now(),
+            "type": "access",
+            "jti": f"jti-{kid}"
+        }
+        return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
+
+    @staticmethod
+    def _call(token, test_function):
+        mock_request = Mock()
+        mock_request.headers = Mock()
+        mock_request.headers.get = Mock(return_value=f"Bearer {token}")
+
+        with patch('core.middleware.request', mock_request), \
+             patch('core.middleware.jsonify', return_value=Mock()), \
+             patch('core.middleware.ACCEPTED_API_KEYS', frozenset({token})):
+            return token_required(test_function)()
+
+    def test_load_verification_keys(self, tmp_path):
+        """Test JWKS parsing into a kid-indexed table of key objects."""
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        jwks = {"keys": [
+            {**HMACAlgorithm.to_jwk(b"rotated-secret", as_dict=True), "kid": "hs-1"},
+            {**OKPAlgorithm.to_jwk(private_key.public_key(), as_dict=True), "kid": "ed-1"},
+        ]}
+        jwks_path = tmp_path / "jwks.json"
+        jwks_path.write_text(json.dumps(jwks))
+
+        keys = load_verification_keys(str(jwks_path))
+
+        assert set(keys) == {"hs-1", "ed-1"}
+        assert keys["hs-1"].algorithm_name == "HS256"
+        assert keys["ed-1"].algorithm_name == "EdDSA"
+
+    def test_load_verification_keys_rejects_duplicated_kid(self, tmp_path):
+        """Test that duplicated kids are rejected at startup."""
+        entry = {**HMACAlgorithm.to_jwk(b"secret", as_dict=True), "kid": "dup"}
+        jwks_path = tmp_path / "jwks.json"
+        jwks_path.write_text(json.dumps({"keys": [entry, entry]}))
+
+        with pytest.raises(ValueError):
+            load_verification_keys(str(jwks_path))
+
+    def test_load_verification_keys_disabled(self):
+        """Test that no JWKS file yields an empty key table."""
+        assert load_verification_keys(None) == {}
+
+    def test_eddsa_token_with_kid(self, request_context, test_function):
+        """Test EdDSA token verified with the key selected by kid."""
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        keys = {"ed-1": jwt.PyJWK({**OKPAlgorithm.to_jwk(private_key.public_key(), as_dict=True)})}
+        token = self._build_token(private_key, "EdDSA", "ed-1")
+
+        with patch('core.middleware.VERIFICATION_KEYS', keys):
+            assert self._call(token, test_function) == ({"message": "success"}, 200)
+
+    def test_hs256_token_with_kid(self, request_context, test_function):
+        """Test HS256 token verified with a rotated secret selected by kid."""
+        keys = {"hs-2": jwt.PyJWK(HMACAlgorithm.to_jwk(b"rotated-secret-key-0123456789abcdef", as_dict=True))}
+        token = self._build_token("rotated-secret-key-0123456789abcdef", "HS256", "hs-2")
+
+        with patch('core.middleware.VERIFICATION_KEYS', keys):
+            assert self._call(token, test_function) == ({"message": "success"}, 200)
+
+    def test_unknown_kid(self, request_context, test_function):
+        """Test token with a kid not present in the key table."""
+        token = self._build_token(TEST_JWT_SECRET_KEY, "HS256", "retired")
+
+        with patch('core.middleware.VERIFICATION_KEYS', {}):
+            _, status_code = self._call(token, test_function)
+
+        assert status_code == 403
+
+    def test_algorithm_pinned_to_key(self, request_context, test_function):
+        """Test that a token cannot switch the algorithm bound to its kid."""
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        keys = {"ed-1": jwt.PyJWK(OKPAlgorithm.to_jwk(private_key.public_key(), as_dict=True))}
+        token = self._build_token(TEST_JWT_SECRET_KEY, "HS256", "ed-1")
+
+        with patch('core.middleware.VERIFICATION_KEYS', keys):
+            _, status_code = self._call(token, test_function)
+
+        assert status_code == 403
+
+
+class TestTokenRequiredAsync:
+    """Test token_required on async def views."""
+
+    @staticmethod
+    async def protected_async_endpoint():
+        await asyncio.sleep(0)
+        return {"message": "success"}, 200
+
+    @staticmethod
+    def _mock_request(header):
+        mock_request = Mock()
+        mock_request.headers = Mock()
+        mock_request.headers.get = Mock(return_value=header)
+        return mock_request
+
+    def test_decorated_view_stays_async(self):
+        """Test that async views are wrapped in a coroutine function."""
+        decorated_func = token_required(self.protected_async_endpoint)
+
+        assert inspect.iscoroutinefunction(decorated_func)
+        assert decorated_func.__name__ == "protected_async_endpoint"
+
+    @patch('core.middleware.APP_CONFIG')
+    def test_successful_authentication(self, mock_config, request_context, valid_jwt_token):
+        """Test that an authenticated request awaits the async view."""
+        mock_config.JWT_SECRET_KEY = TEST_JWT_SECRET_KEY
+        mock_config.TOKEN_API_KEY = valid_jwt_token
+
+        with patch('core.middleware.request', self._mock_request(f"Bearer {valid_jwt_token}")):
+            result = asyncio.run(token_required(self.protected_async_endpoint)())
+
+        assert result == ({"message": "success"}, 200)
+
+    @patch('core.middleware.APP_CONFIG')
+    def test_missing_authorization_header(self, mock_config, request_context):
+        """Test that the async view is not awaited without credentials."""
+        view = Mock()
+
+        async def protected():
+            view()
+
+        with patch('core.middleware.request', self._mock_request(None)), \
+             patch('core.middleware.jsonify', return_value=Mock()):
+            _, status_code = asyncio.run(token_required(protected)())
+
+        assert status_code == 401
+        view.assert_not_called()
+
+    def test_async_view_through_flask(self, flask_app, valid_jwt_token):
+        """Test an async route end to end with Flask's async support."""
+        @flask_app.route("/async")
+        @token_required
+        async def async_view():
+            await asyncio.sleep(0)
+            return {"message": "success"}, 200
+
+        with patch('core.middleware.APP_CONFIG') as mock_config:
+            mock_config.JWT_SECRET_KEY = TEST_JWT_SECRET_KEY
+            mock_config.TOKEN_API_KEY = valid_jwt_token
+            response = flask_app.test_client().get(
+                "/async", headers={"Authorization": f"Bearer {valid_jwt_token}"}
+            )
+
+        assert response.status_code == 200
+        assert response.get_json() == {"message": "success"}
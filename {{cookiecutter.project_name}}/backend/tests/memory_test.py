@@ -0,0 +1,85 @@
+"""
+Tests for memory-based worker recycling.
+"""
+import sys
+import tracemalloc
+
+import pytest
+
+from core.memory import MB, MemoryMonitor, current_rss
+
+
+class FakeRss:
+    """RSS source returning a settable value in MB."""
+
+    def __init__(self, mb: float) -> None:
+        self.mb = mb
+
+    def __call__(self) -> int:
+        return int(self.mb * MB)
+
+
+def _run(monitor, requests):
+    return [monitor.after_request() for _ in range(requests)]
+
+
+class TestMemoryMonitor:
+    """Test recycle decisions from sampled RSS."""
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+    def test_current_rss(self):
+        """Test that the process RSS is read from /proc."""
+        assert current_rss() > 10 * MB
+
+    def test_recycles_over_max_rss_once(self):
+        """Test that crossing max_rss gives a reason once, at a sampled request."""
+        rss = FakeRss(100)
+        monitor = MemoryMonitor(max_rss=200 * MB, check_every=5, log_every=0, rss=rss)
+        assert _run(monitor, 10) == [None] * 10
+
+        rss.mb = 250
+        reasons = _run(monitor, 10)
+
+        assert reasons[:4] == [None] * 4
+        assert "over 200 MB" in reasons[4]
+        assert reasons[5:] == [None] * 5
+
+    def test_recycles_on_growth_after_warmup(self):
+        """Test that steady growth past the baseline recycles the worker."""
+        rss = FakeRss(100)
+        monitor = MemoryMonitor(max_rss=0, max_growth_per_1k=10 * MB, warmup_requests=20,
+                                check_every=1, log_every=0, rss=rss)
+        _run(monitor, 20)
+        assert monitor.baseline == 100 * MB
+
+        # 5 MB over 20 requests is 250 MB per 1000
+        rss.mb = 105
+        reasons = _run(monitor, 20)
+
+        assert reasons[:19] == [None] * 19
+        assert "per 1000 requests" in reasons[19]
+
+    def test_no_recycle_for_warmup_growth(self):
+        """Test that growth before the baseline is not counted."""
+        rss = FakeRss(50)
+        monitor = MemoryMonitor(max_rss=0, max_growth_per_1k=10 * MB, warmup_requests=20,
+                                check_every=1, log_every=0, rss=rss)
+        _run(monitor, 19)
+        rss.mb = 150
+
+        assert _run(monitor, 100) == [None] * 100
+
+    def test_tracemalloc_top_allocations(self):
+        """Test that top allocation sites are reported when tracemalloc is on."""
+        was_tracing = tracemalloc.is_tracing()
+        monitor = MemoryMonitor(max_rss=0, tracemalloc_top=3, rss=FakeRss(100))
+        try:
+            leak = [bytearray(1024) for _ in range(1000)]
+            top = monitor.top_allocations()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        assert "memory_test.py" in top
+        assert len(top.splitlines()) == 3
+        del leak
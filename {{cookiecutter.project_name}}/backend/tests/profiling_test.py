@@ -0,0 +1,96 @@
+"""
+Tests for on-demand request profiling.
+"""
+import os
+
+import pytest
+from flask import Flask, g
+
+from core.profiling import PROFILE_HEADER, RequestProfiler, init_profiling
+
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    """Flask app with header-triggered profiling enabled."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        PROFILING_ENABLED=True,
+        PROFILING_TOKEN="profile-secret",
+        PROFILING_DIR=str(tmp_path),
+        PROFILING_MAX_PER_WORKER=1,
+        PROFILING_MIN_INTERVAL=0,
+    )
+
+    @app.before_request
+    def set_request_id():
+        g.request_id = "req-123"
+
+    init_profiling(app)
+    app.route("/")(lambda: "ok")
+    return app
+
+
+class TestRequestProfiler:
+    """Test profiling limits."""
+
+    def test_single_active_profile(self):
+        """Test that only one profile can run at a time."""
+        profiler = RequestProfiler("unused", max_profiles=5, min_interval=0)
+
+        assert profiler.try_acquire() is True
+        assert profiler.try_acquire() is False
+        profiler.release()
+        assert profiler.try_acquire() is True
+
+    def test_min_interval(self):
+        """Test that profiles are spaced by the minimum interval."""
+        profiler = RequestProfiler("unused", max_profiles=5, min_interval=3600)
+
+        assert profiler.try_acquire() is True
+        profiler.release()
+        assert profiler.try_acquire() is False
+
+
+class TestProfilingHooks:
+    """Test profiling wired into a Flask app."""
+
+    def test_authorized_header_writes_profile(self, profiled_app, tmp_path):
+        """Test profile written under the request id."""
+        profiled_app.test_client().get("/", headers={PROFILE_HEADER: "profile-secret"})
+
+        assert os.listdir(tmp_path) == ["req-123.pstats"]
+
+    def test_wrong_token_is_ignored(self, profiled_app, tmp_path):
+        """Test that an invalid token does not trigger profiling."""
+        profiled_app.test_client().get("/", headers={PROFILE_HEADER: "guess"})
+
+        assert os.listdir(tmp_path) == []
+
+    def test_non_ascii_token_is_ignored(self, profiled_app, tmp_path):
+        """Test that a non-ASCII header value is rejected instead of raising."""
+        response = profiled_app.test_client().get("/", headers={PROFILE_HEADER: "\xe9"})
+
+        assert response.status_code == 200
+        assert os.listdir(tmp_path) == []
+
+    def test_failed_start_does_not_use_a_slot(self, profiled_app, tmp_path, mocker):
+        """Test that a profiler that cannot start does not count against the cap."""
+        client = profiled_app.test_client()
+        profile = mocker.patch("core.profiling.cProfile.Profile")
+        profile.return_value.enable.side_effect = ValueError("another profiler is active")
+        client.get("/", headers={PROFILE_HEADER: "profile-secret"})
+        mocker.stopall()
+
+        client.get("/", headers={PROFILE_HEADER: "profile-secret"})
+
+        assert os.listdir(tmp_path) == ["req-123.pstats"]
+
+    def test_per_worker_cap(self, profiled_app, tmp_path):
+        """Test that the per-worker profile cap is enforced."""
+        client = profiled_app.test_client()
+        client.get("/", headers={PROFILE_HEADER: "profile-secret"})
+        os.remove(tmp_path / "req-123.pstats")
+        client.get("/", headers={PROFILE_HEADER: "profile-secret"})
+
+        assert os.listdir(tmp_path) == []
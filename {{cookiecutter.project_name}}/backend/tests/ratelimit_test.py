@@ -0,0 +1,176 @@
+"""
+Tests for the shared token bucket rate limiter.
+"""
+import multiprocessing
+import time
+
+import jwt
+import pytest
+from flask import Flask, jsonify
+
+from core.middleware import token_required
+from core.ratelimit import SharedTokenBuckets, init_rate_limiting, parse_limit, rate_limit
+
+
+TEST_SECRET = "rate-limit-test-secret-0123456789abcdef"
+
+
+def _take_many(path, count, results):
+    buckets = SharedTokenBuckets(path, 1024)
+    limit = parse_limit("10/hour")
+    results.put(sum(buckets.take("shared", limit)[0] for _ in range(count)))
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app with rate limiting on a temporary bucket table."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_DEFAULT="3/minute",
+        RATE_LIMIT_ROUTES='{"limited_by_config": "1/minute"}',
+        RATE_LIMIT_PATH=str(tmp_path / "buckets"),
+        RATE_LIMIT_SLOTS=1024,
+    )
+    init_rate_limiting(app)
+
+    @app.route("/public")
+    def public():
+        return jsonify({"ok": True})
+
+    @app.route("/config")
+    def limited_by_config():
+        return jsonify({"ok": True})
+
+    @app.route("/decorated")
+    @rate_limit("2/minute")
+    def decorated():
+        return jsonify({"ok": True})
+
+    @app.route("/health")
+    def health():
+        return jsonify({"ok": True})
+
+    @app.route("/private")
+    @token_required
+    def private():
+        return jsonify({"ok": True})
+
+    return app
+
+
+def _token(jti):
+    payload = {"sub": "svc", "iss": "issuer", "iat": int(time.time()), "type": "access", "jti": jti}
+    return jwt.encode(payload, TEST_SECRET, algorithm="HS256")
+
+
+class TestParseLimit:
+    """Test limit parsing."""
+
+    def test_valid(self):
+        """Test rate and burst from a limit string."""
+        assert parse_limit("120/minute")[:2] == (2.0, 120)
+        assert parse_limit("5/seconds", burst=10)[:2] == (5.0, 10)
+
+    @pytest.mark.parametrize("text", ["10", "ten/second", "10/week", "0/second"])
+    def test_invalid(self, text):
+        """Test that malformed limits are rejected."""
+        with pytest.raises(ValueError):
+            parse_limit(text)
+
+
+class TestSharedTokenBuckets:
+    """Test the mmap'd bucket table."""
+
+    def test_burst_then_refill(self, tmp_path):
+        """Test that a bucket empties and refills at the configured rate."""
+        buckets = SharedTokenBuckets(str(tmp_path / "buckets"), 64)
+        limit = parse_limit("20/second", burst=2)
+
+        assert [buckets.take("k", limit)[0] for _ in range(3)] == [True, True, False]
+        time.sleep(0.06)
+        assert buckets.take("k", limit)[0] is True
+
+    def test_keys_are_independent(self, tmp_path):
+        """Test that one key exhausting its bucket does not affect another."""
+        buckets = SharedTokenBuckets(str(tmp_path / "buckets"), 64)
+        limit = parse_limit("1/hour")
+
+        assert buckets.take("a", limit)[0] is True
+        assert buckets.take("a", limit)[0] is False
+        assert buckets.take("b", limit)[0] is True
+
+    def test_shared_across_processes(self, tmp_path):
+        """Test that worker processes draw from the same bucket."""
+        path = str(tmp_path / "buckets")
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_take_many, args=(path, 8, results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(10)
+
+        assert sum(results.get(timeout=5) for _ in workers) == 10
+
+    def test_table_full_reuses_oldest_slot(self, tmp_path):
+        """Test that a full probe window evicts instead of failing."""
+        buckets = SharedTokenBuckets(str(tmp_path / "buckets"), 4)
+        limit = parse_limit("1/hour")
+
+        assert all(buckets.take(f"key-{index}", limit)[0] for index in range(20))
+
+
+class TestRateLimitedRoutes:
+    """Test route limits, headers and principal keying."""
+
+    def test_default_limit_by_ip(self, app):
+        """Test 429 with RateLimit headers once the default quota is spent."""
+        client = app.test_client()
+        responses = [client.get("/public") for _ in range(4)]
+
+        assert [response.status_code for response in responses] == [200, 200, 200, 429]
+        assert responses[0].headers["RateLimit-Limit"] == "3"
+        assert responses[0].headers["RateLimit-Remaining"] == "2"
+        assert int(responses[3].headers["Retry-After"]) > 0
+
+    def test_route_limits(self, app):
+        """Test limits from the decorator and from RATE_LIMIT_ROUTES."""
+        client = app.test_client()
+
+        assert [client.get("/decorated").status_code for _ in range(3)] == [200, 200, 429]
+        assert [client.get("/config").status_code for _ in range(2)] == [200, 429]
+        # Route limits have their own buckets: the default one is untouched
+        assert client.get("/public").headers["RateLimit-Remaining"] == "2"
+
+    def test_exempt_path(self, app):
+        """Test that health checks are never limited."""
+        client = app.test_client()
+        assert all(client.get("/health").status_code == 200 for _ in range(5))
+
+    def test_limited_per_principal(self, app, monkeypatch):
+        """Test that authenticated routes are keyed by the token's jti."""
+        first, second = _token("key-1"), _token("key-2")
+        monkeypatch.setattr("core.middleware.APP_CONFIG.JWT_SECRET_KEY", TEST_SECRET)
+        monkeypatch.setattr("core.middleware.ACCEPTED_API_KEYS", frozenset({first, second}))
+        client = app.test_client()
+
+        def call(token):
+            return client.get("/private", headers={"Authorization": f"Bearer {token}"}).status_code
+
+        assert [call(first) for _ in range(4)] == [200, 200, 200, 429]
+        assert call(second) == 200
+
+    def test_failed_auth_limited_by_ip(self, app, monkeypatch):
+        """Test that requests with a missing or invalid token use the IP bucket."""
+        monkeypatch.setattr("core.middleware.APP_CONFIG.JWT_SECRET_KEY", TEST_SECRET)
+        monkeypatch.setattr("core.middleware.ACCEPTED_API_KEYS", frozenset({_token("key-1")}))
+        client = app.test_client()
+
+        statuses = [client.get("/private").status_code for _ in range(2)]
+        statuses += [client.get("/private", headers={"Authorization": "Bearer forged"}).status_code
+                     for _ in range(2)]
+
+        assert statuses == [401, 401, 403, 429]
+        # Same client IP: public routes share the spent bucket
+        assert client.get("/public").status_code == 429
@@ -0,0 +1,131 @@
+"""
+Tests for the adaptive Sentry traces sampler.
+"""
+from unittest.mock import patch
+
+from flask import Flask
+from werkzeug.routing import Map, Rule
+from werkzeug.test import EnvironBuilder
+
+from core import sampling
+from core.sampling import RouteHealth, TraceBudget, TracesSampler, build_traces_sampler, init_trace_sampling
+
+
+def _context(path, parent_sampled=None):
+    return {"wsgi_environ": EnvironBuilder(path=path).get_environ(), "parent_sampled": parent_sampled}
+
+
+def _sampler(default_rate=0.0, route_rates=None, budget=None):
+    sampler = TracesSampler(
+        default_rate, route_rates or {}, {"/health", "/metrics"}, RouteHealth(1.0, 60), budget
+    )
+    sampler.url_map = Map([Rule("/items/<int:item_id>"), Rule("/fast"), Rule("/broken")])
+    return sampler
+
+
+class TestTracesSampler:
+    """Test per-request sampling decisions."""
+
+    def test_ignored_paths_never_sampled(self):
+        """Test that health checks are dropped even with rate 1."""
+        sampler = _sampler(default_rate=1.0)
+        assert sampler(_context("/health")) == 0.0
+        assert sampler(_context("/metrics", parent_sampled=True)) == 0.0
+
+    def test_parent_decision_kept(self):
+        """Test that upstream sampling decisions are honored."""
+        sampler = _sampler(default_rate=0.0)
+        assert sampler(_context("/items", parent_sampled=True)) == 1.0
+        assert _sampler(default_rate=1.0)(_context("/items", parent_sampled=False)) == 0.0
+
+    def test_route_rates_longest_prefix(self):
+        """Test that the most specific route prefix wins."""
+        sampler = _sampler(default_rate=0.1, route_rates={"/api": 0.0, "/api/reports": 1.0})
+        assert sampler.rate_for("/api/reports/7") == 1.0
+        assert sampler.rate_for("/api/items") == 0.0
+        assert sampler.rate_for("/other") == 0.1
+        assert sampler(_context("/api/reports/7")) == 1.0
+        assert sampler(_context("/api/items")) == 0.0
+
+    def test_hot_routes_always_sampled(self):
+        """Test that every path of a recently slow or failing route is sampled despite rate 0."""
+        sampler = _sampler(default_rate=0.0)
+        sampler.health.record("/items/<int:item_id>", 2.5, 200)
+        sampler.health.record("/broken", 0.01, 503)
+        sampler.health.record("/fast", 0.01, 200)
+
+        assert sampler(_context("/items/123")) == 1.0
+        assert sampler(_context("/items/456")) == 1.0
+        assert sampler(_context("/broken")) == 1.0
+        assert sampler(_context("/fast")) == 0.0
+        assert sampler(_context("/unknown")) == 0.0
+
+    def test_budget_caps_sampled_transactions(self):
+        """Test that the per-second budget bounds sampled transactions."""
+        sampler = _sampler(default_rate=1.0, budget=TraceBudget(3))
+        decisions = [sampler(_context("/items")) for _ in range(10)]
+
+        assert decisions.count(1.0) == 3
+
+
+class TestTraceBudget:
+    """Test the per-second token bucket."""
+
+    def test_rate_below_one_per_second(self):
+        """Test that a budget under 1/s still samples one transaction per period."""
+        clock = [100.0]
+        with patch("core.sampling.time.monotonic", side_effect=lambda: clock[0]):
+            budget = TraceBudget(0.5)
+            decisions = []
+            for _ in range(30):
+                decisions.append(budget.take())
+                clock[0] += 0.1
+
+        # 3 s at 0.5/s: the initial token plus one refill after 2 s
+        assert decisions.count(True) == 2
+
+
+class TestRouteHealth:
+    """Test hot path tracking."""
+
+    def test_window_expires(self):
+        """Test that a path stops being hot after the window."""
+        health = RouteHealth(slow_threshold=1.0, window=10)
+        with patch("core.sampling.time.monotonic", return_value=100.0):
+            health.record("/slow", 5.0, 200)
+        with patch("core.sampling.time.monotonic", return_value=105.0):
+            assert health.is_hot("/slow") is True
+        with patch("core.sampling.time.monotonic", return_value=111.0):
+            assert health.is_hot("/slow") is False
+
+    def test_bounded(self):
+        """Test that only max_paths hot paths are kept."""
+        health = RouteHealth(slow_threshold=0.0, window=60, max_paths=2)
+        for index in range(3):
+            health.record(f"/p{index}", 1.0, 200)
+
+        assert [health.is_hot(f"/p{index}") for index in range(3)] == [False, True, True]
+
+
+class TestInitTraceSampling:
+    """Test feeding response outcomes to the active sampler."""
+
+    def test_records_failing_route_with_base_url(self):
+        """Test that a 5xx marks its URL rule hot, matched with and without the API prefix."""
+        sampler = build_traces_sampler(0.0, {}, ["/health"], 1.0, 60, 0, base_url="/services/app")
+        app = Flask(__name__)
+
+        @app.route("/boom/<int:item_id>")
+        def boom(item_id):
+            return "error", 500
+
+        try:
+            init_trace_sampling(app)
+            app.test_client().get("/boom/1", environ_overrides={"SCRIPT_NAME": "/services/app"})
+        finally:
+            sampling._active_sampler = None
+
+        assert sampler.health.is_hot("/boom/<int:item_id>")
+        assert sampler(_context("/services/app/boom/2")) == 1.0
+        assert sampler(_context("/boom/3")) == 1.0
+        assert sampler(_context("/services/app/health")) == 0.0
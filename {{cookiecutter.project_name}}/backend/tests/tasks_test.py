@@ -0,0 +1,121 @@
+"""
+Tests for the in-process background task executor.
+"""
+import threading
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, current_app, g
+
+from core.tasks import TaskExecutor, TaskRejected, background, drain_executors
+
+
+@pytest.fixture
+def app():
+    """Flask app with a single-thread executor and no queue."""
+    app = Flask(__name__)
+    app.extensions["task_executor"] = TaskExecutor(app, max_workers=1, max_queue=0)
+    return app
+
+
+def _blocking_executor(app, policy):
+    executor = TaskExecutor(app, max_workers=1, max_queue=0, policy=policy)
+    release = threading.Event()
+    executor.submit(release.wait, 5)
+    return executor, release
+
+
+class TestTaskExecutor:
+    """Test task execution, context propagation and backpressure."""
+
+    def test_runs_in_app_context_with_request_id(self, app):
+        """Test that tasks see the app and the submitting request's id."""
+        def task():
+            return current_app.name, g.request_id
+
+        with app.test_request_context():
+            g.request_id = "req-42"
+            future = app.extensions["task_executor"].submit(task)
+
+        assert future.result(timeout=5) == (app.name, "req-42")
+
+    def test_background_decorator(self, app):
+        """Test that calling a decorated function returns a Future."""
+        @background
+        def add(a, b):
+            return a + b
+
+        with app.app_context():
+            future = add(2, 3)
+
+        assert future.result(timeout=5) == 5
+        assert add.__wrapped__(1, 1) == 2
+
+    def test_reject_policy(self, app):
+        """Test that a full queue raises TaskRejected."""
+        executor, release = _blocking_executor(app, "reject")
+        with pytest.raises(TaskRejected):
+            executor.submit(print)
+        release.set()
+
+    def test_drop_policy(self, app):
+        """Test that a full queue discards the task."""
+        executor, release = _blocking_executor(app, "drop")
+        assert executor.submit(print) is None
+        release.set()
+
+    def test_caller_runs_policy(self, app):
+        """Test that a full queue runs the task in the calling thread."""
+        executor, release = _blocking_executor(app, "caller_runs")
+        future = executor.submit(threading.get_ident)
+
+        assert future.result(timeout=0) == threading.get_ident()
+        release.set()
+
+    @patch("core.tasks.logs_config")
+    def test_failure_logged(self, mock_logs_config, app):
+        """Test that a failing task is logged and its Future holds the error."""
+        def fail():
+            raise ValueError("boom")
+
+        future = app.extensions["task_executor"].submit(fail)
+
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+        assert "ValueError: boom" in mock_logs_config.logger.error.call_args[0][0]
+
+    def test_slot_released_after_completion(self, app):
+        """Test that finished tasks free their queue slot."""
+        executor = app.extensions["task_executor"]
+        for value in range(3):
+            assert executor.submit(abs, -value).result(timeout=5) == value
+
+    def test_invalid_policy(self, app):
+        """Test that an unknown queue policy is rejected."""
+        with pytest.raises(ValueError):
+            TaskExecutor(app, policy="block")
+
+
+class TestDrain:
+    """Test draining on worker exit."""
+
+    def test_waits_for_pending_tasks(self, app):
+        """Test that shutdown waits for running tasks and then rejects new ones."""
+        executor = TaskExecutor(app, max_workers=2, max_queue=10)
+        done = []
+        executor.submit(lambda: done.append(threading.Event().wait(0.1)))
+
+        drain_executors(timeout=5)
+
+        assert done == [False]
+        with pytest.raises(TaskRejected):
+            executor.submit(print)
+
+    @patch("core.tasks.logs_config")
+    def test_timeout_reports_unfinished(self, mock_logs_config, app):
+        """Test that tasks still running after the timeout are reported."""
+        executor, release = _blocking_executor(app, "reject")
+
+        assert executor.shutdown(timeout=0.05) is False
+        mock_logs_config.logger.warning.assert_called_once()
+        release.set()
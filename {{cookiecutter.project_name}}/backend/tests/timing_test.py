@@ -0,0 +1,82 @@
+"""
+Tests for per-request phase timing.
+"""
+import pytest
+from flask import Flask, g
+
+from core.timing import StartupTimings, init_phase_timing, phase, server_timing_value, timed
+
+
+@pytest.fixture
+def timed_app():
+    """Flask app with phase timing and Server-Timing header enabled."""
+    app = Flask(__name__)
+    app.config.update(TESTING=True, PHASE_TIMING_ENABLED=True, SERVER_TIMING_HEADER=True)
+    init_phase_timing(app)
+
+    @timed('lookup')
+    def lookup():
+        return 'value'
+
+    @app.route('/work')
+    def work():
+        with phase('compute'):
+            lookup()
+            lookup()
+        return {'phases': sorted(g.phase_timings)}
+
+    return app
+
+
+class TestPhaseTiming:
+    """Test phase recording and Server-Timing emission."""
+
+    def test_records_phases(self, timed_app):
+        """Test context manager and decorator phases recorded in the view."""
+        response = timed_app.test_client().get('/work')
+
+        assert response.get_json() == {'phases': ['compute', 'lookup']}
+
+    def test_server_timing_header(self, timed_app):
+        """Test header includes view, serialize and total phases."""
+        header = timed_app.test_client().get('/work').headers['Server-Timing']
+        names = [entry.split(';')[0] for entry in header.split(', ')]
+
+        assert {'compute', 'lookup', 'view', 'serialize', 'total'} <= set(names)
+
+    def test_header_disabled(self):
+        """Test that the header can be disabled per environment."""
+        app = Flask(__name__)
+        app.config.update(PHASE_TIMING_ENABLED=True, SERVER_TIMING_HEADER=False)
+        init_phase_timing(app)
+        app.route('/')(lambda: 'ok')
+
+        assert 'Server-Timing' not in app.test_client().get('/').headers
+
+    def test_phase_outside_request(self):
+        """Test phases outside a request context are ignored."""
+        with phase('startup'):
+            pass
+
+    def test_server_timing_value(self):
+        """Test Server-Timing formatting in milliseconds."""
+        assert server_timing_value({'db': 1_500_000, 'view': 250_000}) == 'db;dur=1.500, view;dur=0.250'
+
+
+class TestStartupTimings:
+    """Test create_app step timing."""
+
+    def test_steps_in_order_with_total(self):
+        """Test that steps keep their order, accumulate and sum into total."""
+        startup = StartupTimings()
+        with startup.step('sentry'):
+            pass
+        with startup.step('db'):
+            pass
+        with startup.step('sentry'):
+            pass
+
+        timings = startup.as_ms()
+
+        assert list(timings) == ['sentry', 'db', 'total']
+        assert timings['total'] == pytest.approx(timings['sentry'] + timings['db'], abs=0.002)
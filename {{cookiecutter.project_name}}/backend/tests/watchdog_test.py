@@ -0,0 +1,73 @@
+"""
+Tests for the slow-request watchdog and metrics registry.
+"""
+import threading
+from unittest.mock import patch
+
+from core.metrics import MetricsRegistry
+from core.watchdog import RequestWatchdog
+
+
+class TestMetricsRegistry:
+    """Test MetricsRegistry counters and timers."""
+
+    def test_counters_and_timers(self):
+        """Test counter increments and timer aggregation by label."""
+        registry = MetricsRegistry()
+        registry.increment("slow_requests", "/items")
+        registry.increment("slow_requests", "/items")
+        registry.observe("http_client", "api.example.com", 0.010)
+        registry.observe("http_client", "api.example.com", 0.030)
+
+        snapshot = registry.snapshot()
+
+        assert snapshot["counters"] == {"slow_requests": {"/items": 2}}
+        timer = snapshot["timers"]["http_client"]["api.example.com"]
+        assert timer["count"] == 2
+        assert round(timer["total_ms"]) == 40
+        assert round(timer["max_ms"]) == 30
+
+
+class TestRequestWatchdog:
+    """Test RequestWatchdog reporting."""
+
+    @patch("core.watchdog.metrics")
+    @patch("core.watchdog.logs_config")
+    def test_reports_slow_request_once(self, mock_logs_config, mock_metrics):
+        """Test slow request logged once with its stack and counted by route."""
+        watchdog = RequestWatchdog(threshold=0, interval=3600)
+        watchdog.start_request("req-1", "GET", "/items")
+
+        watchdog.check()
+        watchdog.check()
+
+        mock_logs_config.logger.warning.assert_called_once()
+        message = mock_logs_config.logger.warning.call_args[0][0]
+        assert "request_id=req-1" in message
+        assert "test_reports_slow_request_once" in message
+        mock_metrics.increment.assert_called_once_with("slow_requests", "/items")
+
+    @patch("core.watchdog.logs_config")
+    def test_ignores_fast_and_finished_requests(self, mock_logs_config):
+        """Test requests under the threshold or finished are not reported."""
+        watchdog = RequestWatchdog(threshold=3600, interval=3600)
+        watchdog.start_request("req-1", "GET", "/items")
+        watchdog.check()
+        watchdog.end_request()
+
+        watchdog.threshold = 0
+        watchdog.check()
+
+        mock_logs_config.logger.warning.assert_not_called()
+
+    def test_starts_one_thread_per_process(self):
+        """Test that the scanning thread is started once per process."""
+        def watchdog_threads():
+            return [t for t in threading.enumerate() if t.name == "request-watchdog"]
+
+        watchdog = RequestWatchdog(threshold=3600, interval=3600)
+        before = len(watchdog_threads())
+        watchdog.start_request("req-1", "GET", "/")
+        watchdog.start_request("req-2", "GET", "/")
+
+        assert len(watchdog_threads()) == before + 1
@@ -1,29 +1,43 @@
 """
 Para crear un token JWT (JSON Web Token) a manera de API KEY
+
+Uso:
+    python keygen.py
+        Genera una clave HS256 y su API KEY (modo original).
+
+    python keygen.py --batch 3 --alg EdDSA --jwks backend/keys/jwks.json
+        Genera 3 claves con 'kid', agrega las claves de verificación al
+        archivo JWKS (JWT_JWKS_FILE) y emite una API KEY por clave.
 """
 
+import argparse
 import datetime
+import json
+import os
 import secrets
 import uuid
 
 import jwt
+from jwt.algorithms import ECAlgorithm, HMACAlgorithm, OKPAlgorithm
 
 
-def set_jwt_token() -> tuple:
-    secret_key = secrets.token_urlsafe(nbytes=32)
-
-    jti = str(uuid.uuid4())
-
-    payload = {
+def _build_payload(sub: str = "nombre-api", iss: str = "nombre-api") -> dict:
+    return {
         "fresh": False,  # Previene revalidación
         "iat": datetime.datetime.now(),  # Emisión del token
-        "jti": jti,  # Identificador único para el token
+        "jti": str(uuid.uuid4()),  # Identificador único para el token
         "type": "access",  # Tipo de token
-        "sub": "nombre-api",  # Identificador del usuario
+        "sub": sub,  # Identificador del usuario
         "nbf": datetime.datetime.now(),  # No aceptar antes
-        "iss": "nombre-api",  # Identifica quién emitió el token
+        "iss": iss,  # Identifica quién emitió el token
     }
 
+
+def set_jwt_token() -> tuple:
+    secret_key = secrets.token_urlsafe(nbytes=32)
+
+    payload = _build_payload()
+
     # Crea el token con clave
     secure_token = jwt.encode(payload, secret_key, algorithm="HS256")
 
@@ -33,8 +47,77 @@ def set_jwt_token() -> tuple:
     return secret_key, secure_token, token
 
 
+def _generate_key(alg: str) -> tuple:
+    """
+    Genera una clave de firma y su JWK público (o secreto para HS256).
+    """
+    if alg == "HS256":
+        secret_key = secrets.token_urlsafe(nbytes=32)
+        return secret_key, HMACAlgorithm.to_jwk(secret_key.encode(), as_dict=True), secret_key
+
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if alg == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        public_jwk = OKPAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        public_jwk = ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode()
+    return private_key, public_jwk, private_pem
+
+
+def issue_batch(count: int, alg: str, jwks_path: str, sub: str, iss: str) -> list:
+    """
+    Emite 'count' API KEYS, cada una firmada con una clave nueva e
+    identificada por 'kid', y agrega las claves de verificación al JWKS.
+    """
+    jwks = {"keys": []}
+    if os.path.exists(jwks_path):
+        with open(jwks_path, encoding="utf-8") as jwks_file:
+            jwks = json.load(jwks_file)
+
+    issued = []
+    for _ in range(count):
+        kid = secrets.token_hex(8)
+        signing_key, jwk, exported_key = _generate_key(alg)
+        jwks["keys"].append({**jwk, "kid": kid, "alg": alg, "use": "sig"})
+
+        token = jwt.encode(_build_payload(sub, iss), signing_key, algorithm=alg, headers={"kid": kid})
+        issued.append((kid, exported_key, token))
+
+    os.makedirs(os.path.dirname(os.path.abspath(jwks_path)), exist_ok=True)
+    with open(jwks_path, "w", encoding="utf-8") as jwks_file:
+        json.dump(jwks, jwks_file, indent=2)
+
+    return issued
+
+
 if __name__ == "__main__":
-    secret_key, secure_token, token = set_jwt_token()
-    print(f"Clave segura -> {secret_key}\n")
-    print(f"API KEY con clave segura -> {secure_token}\n")
-    print(f"API KEY sin clave ->{token}")
+    parser = argparse.ArgumentParser(description="Genera API KEYS firmadas como JWT")
+    parser.add_argument("--batch", type=int, help="Cantidad de claves con 'kid' a emitir")
+    parser.add_argument("--alg", choices=["HS256", "EdDSA", "ES256"], default="HS256")
+    parser.add_argument("--jwks", default="jwks.json", help="Archivo JWKS (JWT_JWKS_FILE)")
+    parser.add_argument("--sub", default="nombre-api")
+    parser.add_argument("--iss", default="nombre-api")
+    args = parser.parse_args()
+
+    if args.batch:
+        issued = issue_batch(args.batch, args.alg, args.jwks, args.sub, args.iss)
+        for kid, exported_key, token in issued:
+            print(f"kid -> {kid}")
+            print(f"Clave de firma ({args.alg}) -> {exported_key}\n")
+            print(f"API KEY -> {token}\n")
+        print(f"JWKS actualizado -> {args.jwks}")
+        print(f"TOKEN_API_KEYS={','.join(token for _, _, token in issued)}")
+    else:
+        secret_key, secure_token, token = set_jwt_token()
+        print(f"Clave segura -> {secret_key}\n")
+        print(f"API KEY con clave segura -> {secure_token}\n")
+        print(f"API KEY sin clave ->{token}")